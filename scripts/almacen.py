@@ -0,0 +1,152 @@
+# --------------------  ALMACENAMIENTO DE clean_data  ---------------------
+# etapa1 exporta el dataset limpio en dos formatos:
+#   – clean_data.csv      : export de texto (se mantiene por compatibilidad)
+#   – clean_data.parquet  : columnar y tipado; conserva los tipos creados
+#                           en etapa1 (categorías, Hours_cat / MH_level como
+#                           categorías ordenadas, Likert Int8, Timestamp
+#                           datetime64)
+# Las etapas posteriores leen con leer_limpio(columnas=[...]) y solo cargan
+# las columnas que usan. Si el Parquet no existe o no hay motor Parquet
+# (pyarrow) instalado, se cae al CSV.
+#
+# Los lotes nuevos que limpia el reentrenamiento incremental se añaden con
+# anadir_limpio: filas al final del CSV y un Parquet por lote en
+# clean_data_lotes/, sin reescribir el histórico. leer_limpio concatena el
+# Parquet principal y los lotes; guardar_limpio (export completo) los borra.
+#
+# La limpieza en streaming (limpieza_streaming.py) exporta con
+# guardar_limpio_por_bloques: cada bloque limpio se añade al CSV y como row
+# group al Parquet (pyarrow.parquet.ParquetWriter), así que los dos
+# formatos se reescriben juntos con memoria acotada por el bloque. En ese
+# Parquet las categorías quedan en orden de aparición, no alfabético.
+import glob
+import os
+import warnings
+
+import pandas as pd
+
+CSV_PATH     = "../data/clean_data.csv"
+PARQUET_PATH = "../data/clean_data.parquet"
+
+
+def _parquet_disponible():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _dir_lotes(parquet_path):
+    """clean_data.parquet -> clean_data_lotes/ (junto al Parquet principal)."""
+    return os.path.splitext(parquet_path)[0] + "_lotes"
+
+
+def _lotes(parquet_path):
+    return sorted(glob.glob(os.path.join(_dir_lotes(parquet_path), "*.parquet")))
+
+
+def guardar_limpio(df, csv_path=CSV_PATH, parquet_path=PARQUET_PATH):
+    """Escribe el CSV y, si hay pyarrow, el Parquet tipado (sin lotes)."""
+    df.to_csv(csv_path, index=False)
+    if parquet_path is None:
+        return
+    if not _parquet_disponible():
+        warnings.warn("pyarrow no está instalado: solo se exporta el CSV")
+        return
+    df.to_parquet(parquet_path, index=False)
+    for ruta in _lotes(parquet_path):
+        os.remove(ruta)
+
+
+def _indices_int32(schema):
+    """Índices int32 en las columnas diccionario: un bloque posterior puede traer más categorías."""
+    import pyarrow as pa
+
+    return pa.schema([pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type,
+                                                     f.type.ordered), f.nullable)
+                      if pa.types.is_dictionary(f.type) else f for f in schema],
+                     metadata=schema.metadata)
+
+
+def guardar_limpio_por_bloques(bloques, csv_path=CSV_PATH, parquet_path=PARQUET_PATH):
+    """
+    guardar_limpio para un iterable de DataFrames ya limpios: cada bloque se
+    añade al CSV y como row group al Parquet, sin tener todo en memoria.
+    Se escribe en ficheros temporales que sustituyen a los anteriores al
+    terminar (y se borran los lotes). Devuelve el nº de filas escritas.
+    """
+    parquet = parquet_path is not None and _parquet_disponible()
+    if parquet_path is not None and not parquet:
+        warnings.warn("pyarrow no está instalado: solo se exporta el CSV")
+    tmp_csv, tmp_parquet = csv_path + ".tmp", (parquet_path or "") + ".tmp"
+    escritor, n = None, 0
+    try:
+        for bloque in bloques:
+            bloque.to_csv(tmp_csv, mode="a" if n else "w", header=not n, index=False)
+            if parquet:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                if escritor is None:
+                    esquema = _indices_int32(pa.Schema.from_pandas(bloque, preserve_index=False))
+                    escritor = pq.ParquetWriter(tmp_parquet, esquema)
+                escritor.write_table(pa.Table.from_pandas(bloque, schema=escritor.schema,
+                                                          preserve_index=False))
+            n += len(bloque)
+    except BaseException:
+        if escritor is not None:
+            escritor.close()
+        for ruta in (tmp_csv, tmp_parquet):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+        raise
+    if escritor is not None:
+        escritor.close()
+    os.replace(tmp_csv, csv_path)
+    if parquet:
+        os.replace(tmp_parquet, parquet_path)
+        for ruta in _lotes(parquet_path):
+            os.remove(ruta)
+    return n
+
+
+def anadir_limpio(df_lote, csv_path=CSV_PATH, parquet_path=PARQUET_PATH):
+    """
+    Añade un lote ya limpio sin reescribir lo anterior: filas al final del
+    CSV y un Parquet más en el directorio de lotes. Coste O(tamaño del lote).
+    """
+    df_lote.to_csv(csv_path, mode="a", header=not os.path.exists(csv_path), index=False)
+    if parquet_path is None or not _parquet_disponible():
+        return
+    os.makedirs(_dir_lotes(parquet_path), exist_ok=True)
+    n = len(_lotes(parquet_path))
+    df_lote.to_parquet(os.path.join(_dir_lotes(parquet_path), f"lote_{n:06d}.parquet"),
+                       index=False)
+
+
+def leer_limpio(columnas=None, csv_path=CSV_PATH, parquet_path=PARQUET_PATH):
+    """
+    Lee clean_data con proyección de columnas. Prefiere el Parquet; el CSV
+    solo se usa como respaldo (y entonces se pierden los tipos de etapa1).
+    """
+    if parquet_path and os.path.exists(parquet_path) and _parquet_disponible():
+        df = pd.read_parquet(parquet_path, columns=columnas)
+        lotes = _lotes(parquet_path)
+        if not lotes:
+            return df
+        return concatenar_limpio([df] + [pd.read_parquet(r, columns=columnas) for r in lotes])
+    return pd.read_csv(csv_path, usecols=columnas)[columnas or slice(None)]
+
+
+def concatenar_limpio(partes):
+    """
+    pd.concat de trozos de clean_data. Con categorías distintas entre trozos
+    una columna 'category' pasa a object: se recategoriza como en etapa1
+    (categorías ordenadas alfabéticamente).
+    """
+    completo = pd.concat(partes, ignore_index=True)
+    for c in partes[0].select_dtypes("category").columns:
+        if completo[c].dtype != "category":
+            completo[c] = completo[c].astype("category")
+    return completo
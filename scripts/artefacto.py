@@ -0,0 +1,242 @@
+# --------------------  ARTEFACTO COMPACTO DE MODELO  ---------------------
+# Formato de exportación alternativo a <nombre>_best.pkl: un directorio
+#
+#   modelos/artefactos/<nombre>/
+#       modelo.joblib   pipeline sin comprimir: joblib.load(mmap_mode="r")
+#                       mapea los arrays numpy en memoria en vez de copiarlos
+#       manifest.json   esquema de features, hiperparámetros, métricas,
+#                       hash de los datos de entrenamiento, arrays reducidos
+#                       a float32 y paridad de predicciones con el original
+#
+# Reducción a float32 "donde la precisión lo permite": cada array float64
+# grande de los estimadores ajustados (vectores soporte, matriz de
+# entrenamiento del kNN, ...) se prueba en float32 y solo se mantiene si
+# el pipeline sigue prediciendo y la diferencia máxima con las
+# predicciones originales sobre X_ref es ≤ tolerancia. Los estimadores
+# que exigen float64 (libsvm en SVR) fallan en la prueba y conservan el
+# array original.
+#
+# Los árboles de GradientBoosting / RandomForest se reconstruyen al
+# cargar (sklearn copia nodos y valores a memoria propia), así que para
+# ellos el mapeo no evita la copia.
+#
+# Uso (desde scripts/), para convertir los pickles existentes:
+#   python artefacto.py ../modelos/SVR_best.pkl ../modelos/kNN_best.pkl
+import argparse
+import copy
+import hashlib
+import json
+import os
+import platform
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+
+from esquema import (TARGET, FEATURES, NUM_COLS, FREQ_COLS, ORD_COLS, CAT_COLS,
+                     EXCLUIDAS)
+
+ARTEFACTOS_DIR = "../modelos/artefactos"
+FICHERO_MODELO = "modelo.joblib"
+FICHERO_MANIFIESTO = "manifest.json"
+VERSION_FORMATO = 1
+
+TOLERANCIA = 1e-3          # máx |Δ predicción| admitido al pasar a float32
+MIN_ELEMENTOS = 1_000      # arrays más pequeños no merecen la reducción
+
+
+def hash_datos(X, y=None):
+    """sha1 del contenido (sin índice) y de los nombres de columna de X / y."""
+    h = hashlib.sha1("|".join(map(str, X.columns)).encode())
+    h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    if y is not None:
+        h.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _sha1_fichero(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _estimadores(est, ruta="modelo"):
+    """Recorre el pipeline y devuelve (ruta, estimador) de cada paso ajustado."""
+    yield ruta, est
+    if isinstance(est, Pipeline):
+        for nombre, paso in est.steps:
+            yield from _estimadores(paso, f"{ruta}.{nombre}")
+    elif isinstance(est, ColumnTransformer):
+        for nombre, paso, _ in getattr(est, "transformers_", []):
+            if hasattr(paso, "get_params"):
+                yield from _estimadores(paso, f"{ruta}.{nombre}")
+
+
+def _candidatos_float32(modelo):
+    """(ruta, estimador, atributo) de cada array float64 con ≥ MIN_ELEMENTOS."""
+    for ruta, est in _estimadores(modelo):
+        for attr, valor in vars(est).items():
+            if (isinstance(valor, np.ndarray) and valor.dtype == np.float64
+                    and valor.size >= MIN_ELEMENTOS):
+                yield ruta, est, attr
+
+
+def _json_seguro(valor):
+    """Hiperparámetros serializables: lo que no es JSON se guarda como repr."""
+    if isinstance(valor, (str, int, float, bool)) or valor is None:
+        return valor
+    if isinstance(valor, (list, tuple)):
+        return [_json_seguro(v) for v in valor]
+    if isinstance(valor, dict):
+        return {str(k): _json_seguro(v) for k, v in valor.items()}
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return repr(valor)
+
+
+def reducir_float32(modelo, X_ref, tolerancia=TOLERANCIA):
+    """
+    Pasa a float32 (en el sitio) los arrays que superan la prueba de
+    paridad sobre X_ref. Devuelve una lista con la decisión de cada array.
+    """
+    referencia = modelo.predict(X_ref)
+    decisiones = []
+    for ruta, est, attr in list(_candidatos_float32(modelo)):
+        original = getattr(est, attr)
+        setattr(est, attr, np.ascontiguousarray(original, dtype=np.float32))
+        try:
+            delta = float(np.max(np.abs(modelo.predict(X_ref) - referencia)))
+            motivo = None if delta <= tolerancia else f"máx |Δ| {delta:.2e} > {tolerancia:g}"
+        except (ValueError, TypeError) as exc:
+            delta, motivo = None, f"el estimador exige float64 ({type(exc).__name__})"
+        if motivo is not None:
+            setattr(est, attr, original)
+        decisiones.append({"array": f"{ruta}.{attr}", "shape": list(original.shape),
+                           "dtype": "float64" if motivo else "float32",
+                           "max_delta": delta, "motivo": motivo})
+    return decisiones
+
+
+def exportar_artefacto(modelo, directorio, X_ref=None, y_ref=None, metricas=None,
+                       tolerancia=TOLERANCIA):
+    """
+    Escribe el artefacto compacto de 'modelo' en 'directorio'.
+
+    X_ref, y_ref : datos de entrenamiento (o cualquier muestra representativa)
+                   usados para el hash y la prueba de paridad float32. Sin
+                   X_ref no se reduce ningún array.
+    metricas     : dict de métricas (CV / test) que se copian al manifiesto.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    compacto = copy.deepcopy(modelo)
+    decisiones = reducir_float32(compacto, X_ref, tolerancia) if X_ref is not None else []
+
+    path_modelo = os.path.join(directorio, FICHERO_MODELO)
+    joblib.dump(compacto, path_modelo)            # sin compresión: mapeable
+
+    paridad = None
+    if X_ref is not None:
+        paridad = float(np.max(np.abs(compacto.predict(X_ref) - modelo.predict(X_ref))))
+
+    final = compacto.steps[-1][1] if isinstance(compacto, Pipeline) else compacto
+    manifiesto = {
+        "formato": VERSION_FORMATO,
+        "creado": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "estimador": type(final).__name__,
+        "versiones": {"python": platform.python_version(), "sklearn": sklearn.__version__,
+                      "numpy": np.__version__, "pandas": pd.__version__},
+        "esquema": {"target": TARGET, "features": FEATURES, "num_cols": NUM_COLS,
+                    "freq_cols": FREQ_COLS, "ord_cols": ORD_COLS, "cat_cols": CAT_COLS,
+                    "excluidas": EXCLUIDAS},
+        "hiperparametros": _json_seguro(final.get_params(deep=False)),
+        "metricas": _json_seguro(metricas or {}),
+        "datos": None if X_ref is None else {
+            "filas": len(X_ref), "sha1": hash_datos(X_ref, y_ref)},
+        "arrays": decisiones,
+        "tolerancia_float32": tolerancia,
+        "paridad_max_delta": paridad,
+        "modelo": {"fichero": FICHERO_MODELO, "bytes": os.path.getsize(path_modelo),
+                   "sha1": _sha1_fichero(path_modelo)}
+    }
+    with open(os.path.join(directorio, FICHERO_MANIFIESTO), "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    return manifiesto
+
+
+def leer_manifiesto(directorio):
+    with open(os.path.join(directorio, FICHERO_MANIFIESTO), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def filas_split(nombres, artefactos_dir=ARTEFACTOS_DIR):
+    """
+    Filas de clean_data que repartió el split train/test de etapa3 de los
+    modelos 'nombres' (metricas["filas_split"]; None = todas, como antes de
+    que clean_data creciera). Los modelos deben compartir split.
+    """
+    valores = set()
+    for nombre in nombres:
+        try:
+            valores.add(leer_manifiesto(os.path.join(artefactos_dir, nombre))
+                        ["metricas"].get("filas_split"))
+        except FileNotFoundError:
+            valores.add(None)
+    if len(valores) > 1:
+        raise ValueError(f"Los modelos {list(nombres)} no comparten el split de test: {valores}")
+    return valores.pop() if valores else None
+
+
+def cargar_artefacto(directorio, mmap=True, verificar=False):
+    """
+    Carga el pipeline de un artefacto. Con mmap=True los arrays quedan
+    mapeados en modo solo lectura. verificar=True comprueba el sha1 del
+    fichero (lo lee entero, así que anula la carga perezosa) y que el
+    esquema del manifiesto coincide con el actual.
+    """
+    path_modelo = os.path.join(directorio, FICHERO_MODELO)
+    if verificar:
+        manifiesto = leer_manifiesto(directorio)
+        if _sha1_fichero(path_modelo) != manifiesto["modelo"]["sha1"]:
+            raise ValueError(f"{path_modelo} no coincide con su manifiesto")
+        if manifiesto["esquema"]["features"] != FEATURES:
+            raise ValueError(f"el esquema de {directorio} no coincide con esquema.FEATURES")
+    return joblib.load(path_modelo, mmap_mode="r" if mmap else None)
+
+
+if __name__ == "__main__":
+    from sklearn.metrics import mean_absolute_error, mean_squared_error
+    from sklearn.model_selection import train_test_split
+
+    from esquema import cargar_datos, separar_xy
+    from config_modelos import RANDOM_STATE
+
+    parser = argparse.ArgumentParser(description="Convierte <nombre>_best.pkl en artefactos")
+    parser.add_argument("pickles", nargs="+")
+    parser.add_argument("--salida", default=ARTEFACTOS_DIR)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = parser.parse_args()
+
+    # Mismo split que etapa3 para el hash de datos y las métricas de test
+    X, y = separar_xy(cargar_datos())
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.20, random_state=RANDOM_STATE)
+
+    for path in args.pickles:
+        nombre = os.path.basename(path).replace("_best.pkl", "")
+        modelo = joblib.load(path)
+        y_pred = modelo.predict(X_test)
+        metricas = {"test_mae": mean_absolute_error(y_test, y_pred),
+                    "test_rmse": float(np.sqrt(mean_squared_error(y_test, y_pred))),
+                    "test_r2": modelo.score(X_test, y_test)}
+        man = exportar_artefacto(modelo, os.path.join(args.salida, nombre),
+                                 X_train, y_train, metricas, args.tolerancia)
+        reducidos = [a["array"] for a in man["arrays"] if a["dtype"] == "float32"]
+        print(f"✔ {nombre}: {man['modelo']['bytes'] / 1e3:.0f} kB, "
+              f"float32 en {reducidos or 'ningún array'}, "
+              f"paridad máx |Δ| = {man['paridad_max_delta']:.2e}")
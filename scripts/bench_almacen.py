@@ -0,0 +1,86 @@
+# --------------------  BENCHMARK: CSV vs PARQUET (clean_data)  -----------
+# Escala clean_data (filas muestreadas con reemplazo), lo guarda en CSV y
+# en Parquet tipado con almacen.guardar_limpio y mide la carga de cada
+# formato con las proyecciones que usan las etapas:
+#   – todas las columnas
+#   – esquema (etapa3 / entrenamiento / etapa4): FEATURES + TARGET
+#   – etapa2: Hours per day + Anxiety
+# Cada lectura corre en un subproceso para medir su memoria pico
+# (ru_maxrss) por separado; también se reporta la memoria del DataFrame.
+#
+# Uso (desde scripts/):  python bench_almacen.py [n_filas]
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+warnings.filterwarnings("ignore")
+
+PROYECCIONES = {
+    "todas":   None,
+    "esquema": "FEATURES",
+    "etapa2":  ["Hours per day", "Anxiety"],
+}
+
+
+def _hijo(formato, proyeccion, csv_path, parquet_path):
+    """Lee con leer_limpio y emite tiempo, memoria pico y memoria del df."""
+    from almacen import leer_limpio
+    from esquema import FEATURES, TARGET
+
+    columnas = PROYECCIONES[proyeccion]
+    if columnas == "FEATURES":
+        columnas = FEATURES + [TARGET]
+    t0 = time.perf_counter()
+    df = leer_limpio(columnas=columnas, csv_path=csv_path,
+                     parquet_path=parquet_path if formato == "parquet" else None)
+    print(json.dumps({
+        "segundos": time.perf_counter() - t0,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "df_mb": df.memory_usage(deep=True).sum() / 1e6,
+    }))
+
+
+if len(sys.argv) > 1 and sys.argv[1] == "--hijo":
+    _hijo(*sys.argv[2:6])
+    sys.exit()
+
+N_FILAS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+from almacen import guardar_limpio, leer_limpio  # noqa: E402
+
+tmp = tempfile.mkdtemp(prefix="bench_almacen_")
+csv_path = os.path.join(tmp, "clean_data.csv")
+parquet_path = os.path.join(tmp, "clean_data.parquet")
+
+base = leer_limpio()
+t0 = time.perf_counter()
+guardar_limpio(base.sample(N_FILAS, replace=True, random_state=0),
+               csv_path=csv_path, parquet_path=parquet_path)
+print(f"clean_data sintético: {N_FILAS:,} filas  (escritura CSV + Parquet: "
+      f"{time.perf_counter() - t0:.1f} s)")
+print(f"Tamaño en disco: CSV {os.path.getsize(csv_path) / 1e6:.0f} MB, "
+      f"Parquet {os.path.getsize(parquet_path) / 1e6:.0f} MB\n")
+
+filas = []
+for proyeccion in PROYECCIONES:
+    for formato in ["csv", "parquet"]:
+        out = subprocess.run([sys.executable, __file__, "--hijo", formato, proyeccion,
+                              csv_path, parquet_path],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        filas.append({"Columnas": proyeccion, "Formato": formato,
+                      "carga (s)": r["segundos"], "RSS pico (MB)": r["rss_mb"],
+                      "DataFrame (MB)": r["df_mb"]})
+
+res = pd.DataFrame(filas)
+print(res.round(2).to_string(index=False))
+t = res.pivot(index="Columnas", columns="Formato", values="carga (s)")
+print("\nspeedup de carga (CSV / Parquet):")
+print((t["csv"] / t["parquet"]).round(1).to_string())
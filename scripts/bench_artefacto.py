@@ -0,0 +1,108 @@
+# --------------------  BENCHMARK: PICKLE vs ARTEFACTO COMPACTO  ----------
+# Para cada modelo con pickle y artefacto (modelos/artefactos/<nombre>)
+# mide, en un proceso nuevo por formato (carga en frío respecto al
+# intérprete; la caché de páginas del SO no se vacía):
+#   – tiempo de carga (los módulos de sklearn se importan antes de medir)
+#   – memoria residente añadida tras cargar y tras predecir clean_data
+#     (RSS actual de /proc/self/statm, no el pico)
+#   – tamaño en disco
+# y la paridad de predicciones del artefacto frente al pickle.
+#
+# Con el esquema actual los modelos guardados ocupan ~250 kB, así que se
+# añade un kNN con los hiperparámetros de etapa3 ajustado sobre una
+# población sintética de N filas (clean_data muestreado con reemplazo),
+# que es donde el kNN guarda toda la matriz de entrenamiento.
+#
+# Uso (desde scripts/):  python bench_artefacto.py [n_filas_knn]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+warnings.filterwarnings("ignore")
+
+MODELOS_DIR = "../modelos"
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+def _hijo(formato, ruta, ruta_pickle):
+    import joblib
+    import numpy as np
+    import sklearn.ensemble, sklearn.neighbors, sklearn.svm  # noqa: E401,F401
+    from artefacto import cargar_artefacto
+    from esquema import cargar_datos, separar_xy
+
+    X, _ = separar_xy(cargar_datos())
+    rss0 = _rss_mb()
+    t0 = time.perf_counter()
+    modelo = joblib.load(ruta) if formato == "pickle" else cargar_artefacto(ruta)
+    t_carga = time.perf_counter() - t0
+    rss_carga = _rss_mb() - rss0
+    preds = modelo.predict(X)
+    rss_pred = _rss_mb() - rss0
+
+    referencia = joblib.load(ruta_pickle).predict(X)
+    print(json.dumps({"carga_ms": t_carga * 1000, "rss_carga_mb": rss_carga,
+                      "rss_pred_mb": rss_pred,
+                      "max_delta": float(np.max(np.abs(preds - referencia)))}))
+
+
+if len(sys.argv) > 1 and sys.argv[1] == "--hijo":
+    _hijo(*sys.argv[2:5])
+    sys.exit()
+
+N_KNN = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+import joblib  # noqa: E402
+from sklearn.base import clone  # noqa: E402
+
+from artefacto import ARTEFACTOS_DIR, exportar_artefacto, leer_manifiesto  # noqa: E402
+from esquema import cargar_datos, separar_xy  # noqa: E402
+
+casos = {d: (os.path.join(MODELOS_DIR, f"{d}_best.pkl"), os.path.join(ARTEFACTOS_DIR, d))
+         for d in sorted(os.listdir(ARTEFACTOS_DIR))
+         if os.path.exists(os.path.join(MODELOS_DIR, f"{d}_best.pkl"))}
+
+# kNN sobre población sintética
+tmp = tempfile.mkdtemp(prefix="bench_artefacto_")
+X, y = separar_xy(cargar_datos())
+grande = X.assign(_y=y).sample(N_KNN, replace=True, random_state=0)
+knn = clone(joblib.load(os.path.join(MODELOS_DIR, "kNN_best.pkl")))
+knn.fit(grande[X.columns], grande["_y"])
+nombre_grande = f"kNN ({N_KNN:,} filas)"
+casos[nombre_grande] = (os.path.join(tmp, "kNN_grande.pkl"), os.path.join(tmp, "kNN_grande"))
+joblib.dump(knn, casos[nombre_grande][0])
+exportar_artefacto(knn, casos[nombre_grande][1], X, y)
+
+filas = []
+for nombre, (ruta_pickle, ruta_artefacto) in casos.items():
+    manifiesto = leer_manifiesto(ruta_artefacto)
+    tamanos = {"pickle": os.path.getsize(ruta_pickle),
+               "artefacto": manifiesto["modelo"]["bytes"]}
+    for formato, ruta in [("pickle", ruta_pickle), ("artefacto", ruta_artefacto)]:
+        out = subprocess.run([sys.executable, __file__, "--hijo", formato, ruta, ruta_pickle],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        filas.append({"Modelo": nombre, "Formato": formato,
+                      "disco (MB)": tamanos[formato] / 1e6,
+                      "carga (ms)": r["carga_ms"],
+                      "RSS carga (MB)": r["rss_carga_mb"],
+                      "RSS + predict (MB)": r["rss_pred_mb"],
+                      "máx |Δ| vs pickle": r["max_delta"]})
+    reducidos = [a["array"].split(".")[-1] for a in manifiesto["arrays"]
+                 if a["dtype"] == "float32"]
+    print(f"{nombre}: float32 en {reducidos or '—'}")
+
+res = pd.DataFrame(filas)
+res["máx |Δ| vs pickle"] = res["máx |Δ| vs pickle"].map("{:.1e}".format)
+print()
+print(res.round(2).to_string(index=False))
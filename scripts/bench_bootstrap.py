@@ -0,0 +1,66 @@
+# --------------------  BENCHMARK: BOOTSTRAP VECTORIZADO  ------------------
+# Compara, sobre Hours per day / Anxiety de clean_data:
+#   – bucle: por cada remuestreo, pandas .agg (descriptivos),
+#     stats.pearsonr, stats.spearmanr y sm.OLS; se mide sobre N_BUCLE
+#     remuestreos y se extrapola a N_BOOT;
+#   – vectorizado: bootstrap.intervalos_bootstrap con N_BOOT remuestreos
+#     (percentil y BCa).
+# Además comprueba que, para los mismos remuestreos, los estadísticos por
+# lotes coinciden con los de scipy/statsmodels/pandas.
+#
+# Uso (desde scripts/):  python bench_bootstrap.py [n_boot]
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+
+from almacen import leer_limpio
+from bootstrap import conteos_lote, estadisticos_lote, intervalos_bootstrap
+
+warnings.filterwarnings("ignore")
+
+N_BOOT  = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+N_BUCLE = 300
+COLS    = ("Hours per day", "Anxiety")
+
+data = leer_limpio(columnas=list(COLS)).dropna()
+x = data[COLS[0]].to_numpy(float)
+y = data[COLS[1]].to_numpy(float)
+n = len(x)
+idx = np.random.default_rng(0).integers(n, size=(N_BUCLE, n))
+
+
+def estadisticos_bucle(xb, yb):
+    desc = pd.DataFrame({COLS[0]: xb, COLS[1]: yb}).agg(
+        ["mean", "var", "std", "skew", "kurtosis"])
+    res = {f"{est} – {c}": desc.loc[est, c] for est in desc.index for c in COLS}
+    res["Pearson r"] = stats.pearsonr(xb, yb)[0]
+    res["Spearman ρ"] = stats.spearmanr(xb, yb)[0]
+    res["OLS const"], res["OLS pendiente"] = sm.OLS(yb, sm.add_constant(xb)).fit().params
+    return res
+
+
+# Bucle por remuestreo
+t0 = time.perf_counter()
+bucle = pd.DataFrame([estadisticos_bucle(x[i], y[i]) for i in idx])
+t_bucle = (time.perf_counter() - t0) * N_BOOT / N_BUCLE
+
+# Mismos remuestreos por lotes
+lotes = pd.DataFrame(estadisticos_lote(x, y, conteos_lote(idx, n), COLS))
+err = ((lotes - bucle).abs() / bucle.abs().clip(lower=1)).max().max()
+
+filas = [{"método": f"bucle (extrapolado de {N_BUCLE})", "tiempo (s)": t_bucle}]
+for metodo in ["percentil", "bca"]:
+    t0 = time.perf_counter()
+    intervalos_bootstrap(x, y, n_boot=N_BOOT, metodo=metodo, random_state=0)
+    filas.append({"método": f"vectorizado ({metodo})", "tiempo (s)": time.perf_counter() - t0})
+tabla = pd.DataFrame(filas)
+tabla["speedup"] = t_bucle / tabla["tiempo (s)"]
+
+print(f"n = {n} filas, {N_BOOT} remuestreos")
+print(tabla.round(2).to_string(index=False))
+print(f"\nError relativo máximo lotes vs bucle ({N_BUCLE} remuestreos): {err:.1e}")
@@ -0,0 +1,61 @@
+# --------------------  BENCHMARK: ESTRATEGIAS DE BÚSQUEDA  ---------------
+# Ejecuta las tres estrategias de busqueda.py sobre cada modelo de
+# config_modelos.MODELOS y compara el mejor MAE de CV con los segundos
+# sumados de los fits (fit_s_), los segundos de CPU del proceso y el
+# tiempo de reloj total. Se ejecuta con n_jobs=1 para que los segundos de
+# CPU del proceso cuenten todos los fits.
+#
+# Uso (desde scripts/):  python bench_busqueda.py [modelo ...]
+import sys
+import time
+import warnings
+import pandas as pd
+from sklearn.model_selection import train_test_split, KFold
+from sklearn.pipeline import Pipeline
+
+from esquema import cargar_datos, separar_xy, construir_preprocesador
+from busqueda import ESTRATEGIAS, crear_busqueda
+from config_modelos import (MODELOS, RANDOM_STATE, CV_FOLDS, N_ITER_RANDOM,
+                            PRESUPUESTO_RANDOM_S)
+
+warnings.filterwarnings("ignore")
+
+X, y = separar_xy(cargar_datos())
+preprocessor = construir_preprocesador(X)
+X_train, X_test, y_train, y_test = train_test_split(
+    X, y, test_size=0.20, random_state=RANDOM_STATE)
+cv = KFold(n_splits=CV_FOLDS, shuffle=True, random_state=RANDOM_STATE)
+
+seleccion = set(sys.argv[1:])
+filas = []
+for cfg in MODELOS:
+    if seleccion and cfg["nombre"] not in seleccion:
+        continue
+    for estrategia in ESTRATEGIAS:
+        prep = cfg["preprocesador"](X) if "preprocesador" in cfg else preprocessor
+        pipe = Pipeline([("prep", prep), ("model", cfg["estimator"])])
+        gs = crear_busqueda(estrategia, pipe, cfg["param_grid"], cv,
+                            n_jobs=1, random_state=RANDOM_STATE, n_iter=N_ITER_RANDOM,
+                            presupuesto_s=PRESUPUESTO_RANDOM_S)
+        t0, c0 = time.perf_counter(), time.process_time()
+        gs.fit(X_train, y_train)
+        cpu = time.process_time() - c0
+        filas.append({
+            "Modelo": cfg["nombre"],
+            "Búsqueda": estrategia,
+            "CV MAE": -gs.best_score_,
+            "Fits (s)": gs.fit_s_,
+            "CPU (s)": cpu,
+            "Reloj (s)": time.perf_counter() - t0,
+            "Params": gs.best_params_
+        })
+        print(f"{cfg['nombre']:>16} | {estrategia:<7} | CV MAE {-gs.best_score_:.3f} "
+              f"| CPU {cpu:.1f}s | {gs.best_params_}")
+
+res = pd.DataFrame(filas)
+grid = res[res["Búsqueda"] == "grid"].set_index("Modelo")
+res["CPU vs grid"] = res["CPU (s)"] / res["Modelo"].map(grid["CPU (s)"])
+res["ΔMAE vs grid"] = res["CV MAE"] - res["Modelo"].map(grid["CV MAE"])
+
+print("\n===== Best CV MAE vs CPU-seconds =====")
+print(res.drop(columns="Params").round(3).to_string(index=False))
@@ -0,0 +1,59 @@
+# --------------------  BENCHMARK: CACHE DEL PREPROCESADO  ----------------
+# Arnés de tiempos para cache_preprocesado.py: ejecuta la búsqueda de
+# etapa3 (grid exhaustivo, para que ambas versiones evalúen exactamente
+# las mismas configuraciones) con el preprocesador normal y con el
+# cacheado, y compara tiempo de reloj, CV MAE e hits del cache.
+#
+# Uso (desde scripts/):  python bench_cache_preprocesado.py [modelo ...]
+import sys
+import time
+import warnings
+import pandas as pd
+from sklearn.model_selection import train_test_split, KFold
+from sklearn.pipeline import Pipeline
+
+from esquema import cargar_datos, separar_xy, construir_preprocesador
+from busqueda import crear_busqueda
+from cache_preprocesado import PreprocesadorCacheado, limpiar_cache
+from config_modelos import MODELOS, RANDOM_STATE, CV_FOLDS
+
+warnings.filterwarnings("ignore")
+
+X, y = separar_xy(cargar_datos())
+preprocessor = construir_preprocesador(X)
+X_train, X_test, y_train, y_test = train_test_split(
+    X, y, test_size=0.20, random_state=RANDOM_STATE)
+cv = KFold(n_splits=CV_FOLDS, shuffle=True, random_state=RANDOM_STATE)
+
+seleccion = set(sys.argv[1:])
+modelos = [cfg for cfg in MODELOS if not seleccion or cfg["nombre"] in seleccion]
+
+filas = []
+for version, envolver in [("sin cache", lambda p: p),
+                          ("con cache", PreprocesadorCacheado)]:
+    limpiar_cache()
+    for cfg in modelos:
+        base = cfg["preprocesador"](X) if "preprocesador" in cfg else preprocessor
+        pipe = Pipeline([("prep", envolver(base)), ("model", cfg["estimator"])])
+        gs = crear_busqueda("grid", pipe, cfg["param_grid"], cv)
+        t0 = time.perf_counter()
+        gs.fit(X_train, y_train)
+        filas.append({
+            "Modelo": cfg["nombre"],
+            "Versión": version,
+            "Reloj (s)": time.perf_counter() - t0,
+            "CV MAE": -gs.best_score_
+        })
+    stats = limpiar_cache()
+    if version == "con cache":
+        print(f"Cache: {stats['hits']} hits / {stats['misses']} misses, "
+              f"{stats['items']} entradas, {stats['bytes'] / 1e6:.1f} MB")
+
+res = pd.DataFrame(filas)
+tabla = res.pivot(index="Modelo", columns="Versión", values="Reloj (s)")
+tabla.loc["TOTAL"] = tabla.sum()
+tabla["speedup"] = tabla["sin cache"] / tabla["con cache"]
+print(tabla[["sin cache", "con cache", "speedup"]].round(3))
+print("\nCV MAE idéntico:",
+      res.pivot(index="Modelo", columns="Versión", values="CV MAE")
+         .apply(lambda r: r["sin cache"] == r["con cache"], axis=1).all())
@@ -0,0 +1,70 @@
+# --------------------  BENCHMARK: CORRELACIONES + FDR  --------------------
+# Pearson y Spearman con p-valores y Benjamini-Hochberg para todas las
+# parejas de columnas:
+#   – bucle: stats.pearsonr / stats.spearmanr por pareja + multipletests;
+#   – vectorizado: correlaciones.analisis_correlaciones (rangos una vez,
+#     Zᵀ Z, p-valores y BH sobre arrays).
+# Con las 23 columnas de etapa1 y con matrices más anchas: columnas de
+# etapa1 repetidas con ruido (mismas filas de clean_data). Para los anchos
+# grandes el bucle se mide sobre MAX_PAREJAS_BUCLE parejas y se extrapola.
+# Comprueba que r y p coinciden con scipy en las parejas medidas.
+#
+# Uso (desde scripts/):  python bench_correlaciones.py [columnas ...]
+import itertools
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from almacen import leer_limpio
+from correlaciones import analisis_correlaciones
+from permutacion import COLUMNAS_CORR
+
+warnings.filterwarnings("ignore")
+
+ANCHOS            = [int(a) for a in sys.argv[1:]] or [len(COLUMNAS_CORR), 100, 300]
+MAX_PAREJAS_BUCLE = 2_000
+
+base = leer_limpio(columnas=COLUMNAS_CORR).dropna().astype(float)
+rng = np.random.default_rng(0)
+
+
+def ancho(p):
+    """p columnas: las de etapa1 y copias con ruido."""
+    cols = {c: base[c] for c in COLUMNAS_CORR}
+    for k in range(p - len(COLUMNAS_CORR)):
+        c = COLUMNAS_CORR[k % len(COLUMNAS_CORR)]
+        cols[f"{c} #{k}"] = base[c] + rng.normal(0, base[c].std(), len(base))
+    return pd.DataFrame(cols)
+
+
+filas = []
+for p in ANCHOS:
+    X = ancho(p)
+    pares = list(itertools.combinations(X.columns, 2))
+    medidas = pares[:MAX_PAREJAS_BUCLE]
+
+    t0 = time.perf_counter()
+    _, tabla = analisis_correlaciones(X)
+    t_vec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ref = {m: np.array([f(X[a], X[b]) for a, b in medidas])
+           for m, f in [("pearson", stats.pearsonr), ("spearman", stats.spearmanr)]}
+    for m in ref:
+        multipletests(ref[m][:, 1], method="fdr_bh")
+    t_bucle = (time.perf_counter() - t0) * len(pares) / len(medidas)
+
+    err = max(np.abs(tabla.loc[tabla["Método"] == m, ["r", "p"]].to_numpy()[:len(medidas)]
+                     - ref[m]).max() for m in ref)
+    filas.append({"columnas": p, "parejas": len(pares),
+                  "bucle (s)": t_bucle, "vectorizado (s)": t_vec,
+                  "speedup": t_bucle / t_vec, "error máx r/p": f"{err:.1e}",
+                  "bucle extrapolado": len(medidas) < len(pares)})
+
+print(f"n = {len(base)} filas; Pearson + Spearman + BH")
+print(pd.DataFrame(filas).round(3).to_string(index=False))
@@ -0,0 +1,83 @@
+# --------------------  BENCHMARK: DEPENDENCIA PARCIAL / ICE  --------------
+# PD + ICE de Hours per day (rejilla de N_PUNTOS) y superficie 2D
+# Hours per day × BPM (N_2D × N_2D) sobre todo clean_data:
+#   – bucle de escenarios: una copia de X y un pipeline.predict por punto
+#     de la rejilla (lo que haría un escenario por valor);
+#   – sklearn.inspection.partial_dependence(method="brute", kind="both");
+#   – dependencia_parcial.py: matriz filas × rejilla preprocesada una vez
+#     y predicha por bloques de ≤ MAX_FILAS_LOTE filas.
+# Se informa la diferencia máxima de la PD con el bucle. El bucle y
+# dependencia_parcial.py recalculan Hours_cat con cada Hours per day;
+# partial_dependence la deja fija, así que su curva difiere en Hours per day.
+#
+# Uso (desde scripts/):  python bench_dependencia_parcial.py [modelo ...]
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.inspection import partial_dependence
+
+from dependencia_parcial import dependencia_2d, dependencia_parcial, rejilla
+from esquema import FEATURES, cargar_datos
+from limpieza import con_derivadas
+
+warnings.filterwarnings("ignore")
+
+MODELOS  = sys.argv[1:] or ["SVR", "HistGradientBoosting", "kNN"]
+N_PUNTOS = 50
+N_2D     = 20
+
+X = cargar_datos()[FEATURES]
+f1, f2 = "Hours per day", "BPM"
+valores = rejilla(X[f1], N_PUNTOS)
+v1, v2 = rejilla(X[f1], N_2D), rejilla(X[f2], N_2D)
+
+
+def dif(a, b):
+    return f"{np.abs(a - b).max():.1e}" if a.shape == b.shape else "rejilla distinta"
+
+
+def bucle(modelo, asignaciones):
+    medias = []
+    for punto in asignaciones:
+        Xs = X.copy()
+        punto = {f: np.full(len(X), v) for f, v in punto.items()}
+        for f, v in con_derivadas(punto, X.columns).items():
+            Xs[f] = v
+        medias.append(modelo.predict(Xs).mean())
+    return np.array(medias)
+
+
+filas = []
+for nombre in MODELOS:
+    modelo = joblib.load(f"../modelos/{nombre}_best.pkl")
+    casos = {
+        f"PD+ICE {f1} ({len(valores)} pts)": (
+            lambda: bucle(modelo, [{f1: v} for v in valores]),
+            lambda: partial_dependence(modelo, X, [f1], kind="both", method="brute",
+                                       grid_resolution=N_PUNTOS)["average"][0],
+            lambda: dependencia_parcial(modelo, X, f1, valores=valores)[0]["PD"].to_numpy()),
+        f"2D {f1} × {f2} ({N_2D}×{N_2D})": (
+            lambda: bucle(modelo, [{f1: a, f2: b} for a in v1 for b in v2]),
+            lambda: partial_dependence(modelo, X, [f1, f2], kind="average", method="brute",
+                                       grid_resolution=N_2D)["average"][0].ravel(),
+            lambda: dependencia_2d(modelo, X, f1, f2, v1, v2).to_numpy().ravel()),
+    }
+    for caso, (fn_bucle, fn_sk, fn_vec) in casos.items():
+        tiempos, curvas = [], []
+        for fn in (fn_bucle, fn_sk, fn_vec):
+            t0 = time.perf_counter()
+            curvas.append(np.asarray(fn()))
+            tiempos.append(time.perf_counter() - t0)
+        filas.append({"modelo": nombre, "caso": caso,
+                      "bucle (s)": tiempos[0], "sklearn (s)": tiempos[1],
+                      "vectorizado (s)": tiempos[2],
+                      "vs bucle": tiempos[0] / tiempos[2], "vs sklearn": tiempos[1] / tiempos[2],
+                      "dif. PD bucle": dif(curvas[0], curvas[2]),
+                      "dif. PD sklearn": dif(curvas[1], curvas[2])})
+
+print(f"{len(X)} filas")
+print(pd.DataFrame(filas).round(2).to_string(index=False))
@@ -0,0 +1,60 @@
+# --------------------  BENCHMARK: BARRIDO DE ESCENARIOS  -----------------
+# Compara, para el barrido de etapa4 (incremento de Hours per day 0..12 ×
+# While working Yes/No, o una rejilla de incrementos más fina):
+#   – una simulación por escenario (simulacion.simular_vectorizado con el
+#     Escenario compilado como función: copia, transforma y predice cada vez)
+#   – escenarios_dsl.simular_barrido: matriz base compartida y una sola
+#     pasada de predicción
+# con la misma semilla, comprueba que las estadísticas coinciden y mide el
+# tiempo total y por escenario.
+#
+# Uso (desde scripts/):  python bench_escenarios_dsl.py [pasos_por_hora] [n_iter] [modelo]
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from esquema import FEATURES, cargar_datos
+from simulacion import simular_vectorizado
+from escenarios_dsl import BARRIDO_HORAS_TRABAJO, barrido, simular_barrido
+
+warnings.filterwarnings("ignore")
+
+PASOS      = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+N_ITER     = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+MODEL_PATH = sys.argv[3] if len(sys.argv) > 3 else "../modelos/SVR_best.pkl"
+BATCH_SIZE = 200
+SEED       = 42
+
+df = cargar_datos()
+modelo = joblib.load(MODEL_PATH)
+spec = dict(BARRIDO_HORAS_TRABAJO,
+            rejilla={"incremento": list(np.arange(12 * PASOS + 1) / PASOS),
+                     "trabajando": ["Yes", "No"]})
+escenarios = barrido(spec)
+print(f"Modelo: {MODEL_PATH}  |  {len(escenarios)} escenarios × {N_ITER} iteraciones × "
+      f"{BATCH_SIZE} filas\n")
+
+t0 = time.perf_counter()
+separados = {nombre: simular_vectorizado(modelo, df, esc, FEATURES, n_iter=N_ITER,
+                                         batch_size=BATCH_SIZE, random_state=SEED)
+             for nombre, esc in escenarios.items()}
+t_separados = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+juntos = simular_barrido(modelo, df, escenarios, FEATURES, n_iter=N_ITER,
+                         batch_size=BATCH_SIZE, random_state=SEED)
+t_juntos = time.perf_counter() - t0
+
+iguales = all(np.allclose(separados[e], juntos[e]) for e in escenarios)
+res = pd.DataFrame([
+    {"Versión": "una simulación por escenario", "tiempo (s)": t_separados,
+     "ms/escenario": 1000 * t_separados / len(escenarios), "llamadas predict": len(escenarios)},
+    {"Versión": "simular_barrido", "tiempo (s)": t_juntos,
+     "ms/escenario": 1000 * t_juntos / len(escenarios), "llamadas predict": 1},
+])
+print(res.round(3).to_string(index=False))
+print(f"\nSpeedup: {t_separados / t_juntos:.1f}×   |   mismas estadísticas: {iguales}")
@@ -0,0 +1,101 @@
+# --------------------  BENCHMARK: PREPROCESADO ANTES vs DESPUÉS  ---------
+# Compara el preprocesador antiguo (select_dtypes, que one-hot-codifica
+# 'Timestamp' y 'Permissions') con el esquema declarado en esquema.py.
+# Para SVR y kNN (mejores hiperparámetros de Etapa 3) mide:
+#   – número de columnas tras el preprocesado,
+#   – tiempo de ajuste del pipeline,
+#   – latencia de predicción (test completo y fila a fila),
+#   – tamaño del artefacto serializado con joblib.
+#
+# Uso (desde scripts/):  python bench_esquema.py
+import io
+import time
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.metrics import mean_absolute_error
+from sklearn.svm import SVR
+from sklearn.neighbors import KNeighborsRegressor
+
+from esquema import TARGET, OTRAS_MH, cargar_datos, separar_xy, construir_preprocesador
+
+warnings.filterwarnings("ignore")
+
+RANDOM_STATE = 42
+N_REPS       = 5
+
+df = cargar_datos(columnas=None)
+
+
+def preprocesador_antiguo(X):
+    """Preprocesador de etapa3 antes del esquema (detección por dtype)."""
+    num_cols = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    cat_cols = X.select_dtypes(include=["object", "bool"]).columns.tolist()
+    all_categories = [X[col].unique().tolist() for col in cat_cols]
+    return ColumnTransformer(
+        [("num", Pipeline([("scaler", StandardScaler())]), num_cols),
+         ("cat", Pipeline([("ohe", OneHotEncoder(categories=all_categories,
+                                                 drop="first",
+                                                 sparse_output=False))]),
+          cat_cols)],
+        remainder="passthrough"
+    )
+
+
+def tamano_mb(obj):
+    buf = io.BytesIO()
+    joblib.dump(obj, buf)
+    return buf.tell() / 1e6
+
+
+def mejor_tiempo(fn):
+    tiempos = []
+    for _ in range(N_REPS):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+# Con los tipos de la época del CSV (texto como object, sin category ni
+# datetime), que es lo que veía select_dtypes
+X_old = pd.read_csv(io.StringIO(df.drop(columns=[TARGET] + OTRAS_MH).to_csv(index=False)))
+X_new, y = separar_xy(df)
+variantes = {
+    "antes":   (X_old, preprocesador_antiguo(X_old)),
+    "después": (X_new, construir_preprocesador(X_new)),
+}
+modelos = {
+    "SVR": lambda: SVR(C=10, epsilon=0.2, gamma=0.01),
+    "kNN": lambda: KNeighborsRegressor(weights="distance"),
+}
+
+filas = []
+for nombre, crear in modelos.items():
+    for version, (X, prep) in variantes.items():
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.20, random_state=RANDOM_STATE)
+        pipe = Pipeline([("prep", prep), ("model", crear())])
+
+        t_fit = mejor_tiempo(lambda: pipe.fit(X_train, y_train))
+        t_pred = mejor_tiempo(lambda: pipe.predict(X_test))
+        fila = X_test.iloc[[0]]
+        t_fila = mejor_tiempo(lambda: pipe.predict(fila))
+
+        filas.append({
+            "Modelo": nombre,
+            "Versión": version,
+            "n_cols": pipe.named_steps["prep"].transform(X_test).shape[1],
+            "fit (ms)": 1e3 * t_fit,
+            "predict test (ms)": 1e3 * t_pred,
+            "predict 1 fila (ms)": 1e3 * t_fila,
+            "artefacto (MB)": tamano_mb(pipe),
+            "MAE test": mean_absolute_error(y_test, pipe.predict(X_test))
+        })
+
+print(pd.DataFrame(filas).round(3).to_string(index=False))
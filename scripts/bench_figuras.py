@@ -0,0 +1,72 @@
+# --------------------  BENCHMARK: ETAPA DE FIGURAS  -----------------------
+# Tiempo de regenerar las figuras de etapa1, etapa2 y etapa3-2 (matrices
+# de confusión de los *_best.pkl) con figuras.renderizar:
+#   – todas, en serie (equivale al render incondicional de antes);
+#   – todas, con el pool de procesos (--workers, por defecto nº de CPUs);
+#   – preview (dpi bajo, sin bandas bootstrap);
+#   – sin cambios (todas omitidas por hash);
+#   – tras un cambio pequeño de datos: se corrige el BPM de una fila, lo
+#     que solo afecta a bpm_vs_anxiety y a la matriz de correlación.
+# Las figuras y el manifiesto van a un directorio temporal: figs/ no se toca.
+#
+# Uso (desde scripts/):  python bench_figuras.py [workers]
+import os
+import shutil
+import sys
+import tempfile
+import warnings
+
+import pandas as pd
+
+import figuras
+from almacen import leer_limpio
+from correlaciones import matriz_correlacion
+from limpieza import MH_COLS
+
+warnings.filterwarnings("ignore")
+
+N_WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+
+tmp = tempfile.mkdtemp()
+figuras.FIGS_DIR = os.path.join(tmp, "figs")
+figuras.DIR_PREVIEW = os.path.join(tmp, "figs", "preview")
+manifiesto = os.path.join(tmp, "figuras.json")
+
+df = leer_limpio()
+confusion = figuras.specs_confusion()
+
+
+def specs(df):
+    """Especificaciones de las tres etapas sobre df, redirigidas a tmp."""
+    freq_cols = [c for c in df.columns if c.startswith("Frequency")]
+    corr, _ = matriz_correlacion(df[["Age", "Hours per day", "BPM"] + MH_COLS + freq_cols])
+    cols = ["Hours per day", "Anxiety"]
+    todas = (figuras.figuras_etapa1(df, corr) + figuras.figuras_etapa2(df[cols].dropna(), cols)
+             + confusion)
+    return [dict(s, ruta=os.path.join(figuras.FIGS_DIR, os.path.relpath(s["ruta"], "../figs")))
+            for s in todas]
+
+
+def medir(nombre, specs, **kwargs):
+    info = figuras.renderizar(specs, manifiesto=manifiesto, **kwargs)
+    filas.append({"caso": nombre, "renderizadas": len(info["renderizadas"]),
+                  "omitidas": len(info["omitidas"]), "workers": info["workers"],
+                  "tiempo (s)": info["segundos"]})
+
+
+filas = []
+base = specs(df)
+medir("todas, en serie", base, forzar=True, n_workers=1)
+medir(f"todas, pool ({N_WORKERS} workers)", base, forzar=True, n_workers=N_WORKERS)
+medir("preview (todas)", base, preview=True, forzar=True, n_workers=1)
+medir("sin cambios", base, n_workers=N_WORKERS)
+
+df_cambio = df.copy()
+df_cambio.loc[df_cambio.index[0], "BPM"] += 1
+medir("cambio de 1 BPM", specs(df_cambio), n_workers=N_WORKERS)
+shutil.rmtree(tmp)
+
+tabla = pd.DataFrame(filas)
+tabla["fracción"] = tabla["tiempo (s)"] / tabla["tiempo (s)"].iloc[0]
+print(f"{len(base)} figuras (etapa1, etapa2 y matrices de confusión), {os.cpu_count()} CPU")
+print(tabla.round(3).to_string(index=False))
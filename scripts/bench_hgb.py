@@ -0,0 +1,79 @@
+# --------------------  BENCHMARK: GradientBoosting vs HistGradientBoosting  --
+# Compara GradientBoosting_best.pkl (one-hot + GradientBoostingRegressor)
+# con HistGradientBoosting_best.pkl (categóricas nativas + early stopping)
+# con sus mejores hiperparámetros de etapa3:
+#   – MAE / RMSE / R² sobre el test real (20 % de clean_data)
+#   – tiempo de reajuste y throughput de predicción
+#   – nº de árboles (fijo en GB; el que decide el early stopping en HGB)
+# sobre el train real y sobre poblaciones sintéticas mayores (filas del
+# train muestreadas con reemplazo).
+#
+# En las poblaciones sintéticas cada fila está repetida muchas veces, así
+# que la validación interna del early stopping ve copias del train y no
+# para nunca. Ahí HGB se reajusta con early stopping desactivado y el nº
+# de iteraciones que eligió sobre el train real: se compara el coste de
+# ajustar el mismo modelo con más filas.
+#
+# Uso (desde scripts/):  python bench_hgb.py [tamaño ...]
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from esquema import cargar_datos, separar_xy
+from config_modelos import RANDOM_STATE
+
+warnings.filterwarnings("ignore")
+
+TAMANOS   = [int(a) for a in sys.argv[1:]] or [0, 20_000, 100_000]   # 0 = train real
+N_PREDICT = 100_000
+
+X, y = separar_xy(cargar_datos())
+X_train, X_test, y_train, y_test = train_test_split(
+    X, y, test_size=0.20, random_state=RANDOM_STATE)
+X_pred = X_train.sample(N_PREDICT, replace=True, random_state=0)
+
+modelos = {"GradientBoosting": joblib.load("../modelos/GradientBoosting_best.pkl"),
+           "HistGradientBoosting": joblib.load("../modelos/HistGradientBoosting_best.pkl")}
+
+
+def n_arboles(modelo):
+    final = modelo.named_steps["model"]
+    return getattr(final, "n_iter_", None) or final.n_estimators_
+
+
+iter_real = clone(modelos["HistGradientBoosting"]).fit(X_train, y_train).named_steps["model"].n_iter_
+
+filas = []
+for n in TAMANOS:
+    if n == 0:
+        Xn, yn = X_train, y_train
+    else:
+        idx = np.random.default_rng(0).integers(len(X_train), size=n)
+        Xn, yn = X_train.iloc[idx], y_train.iloc[idx]
+    for nombre, base in modelos.items():
+        modelo = clone(base)
+        if n and nombre == "HistGradientBoosting":
+            modelo.set_params(model__early_stopping=False, model__max_iter=iter_real)
+        t0 = time.perf_counter()
+        modelo.fit(Xn, yn)
+        t_fit = time.perf_counter() - t0
+        pred = modelo.predict(X_test)
+        t0 = time.perf_counter()
+        modelo.predict(X_pred)
+        t_pred = time.perf_counter() - t0
+        filas.append({"n train": len(Xn), "Modelo": nombre,
+                      "MAE": mean_absolute_error(y_test, pred),
+                      "RMSE": np.sqrt(mean_squared_error(y_test, pred)),
+                      "R²": r2_score(y_test, pred),
+                      "árboles": n_arboles(modelo),
+                      "fit (s)": t_fit,
+                      "predict (filas/s)": N_PREDICT / t_pred})
+
+print(pd.DataFrame(filas).round(3).to_string(index=False))
@@ -0,0 +1,84 @@
+# --------------------  BENCHMARK: IMPORTANCIA POR PERMUTACIÓN  ------------
+# Sobre el split de test de etapa3 y todos los modelos/*_best.pkl, con
+# N_REP repeticiones por feature:
+#   – sklearn: permutation_importance(pipeline, X_test, ...) por modelo
+#     (preprocesa y predice cada permutación por separado);
+#   – motor por lotes (importancia.py), un modelo por llamada y todos los
+#     modelos en una sola llamada (con 1 y con --workers procesos).
+# Comprueba la agrupación de columnas: con las mismas permutaciones
+# aplicadas a las columnas crudas de X_test y pipeline.predict, las
+# importancias coinciden con las del motor (con Hours_cat recalculada al
+# permutar Hours per day, limpieza.con_derivadas). Y que el resultado no depende
+# del nº de workers.
+#
+# Uso (desde scripts/):  python bench_importancia.py [workers]
+import os
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.inspection import permutation_importance
+
+from importancia import datos_test, importancia_permutacion, permutacion, rutas_modelos
+from config_modelos import RANDOM_STATE
+from limpieza import con_derivadas
+
+warnings.filterwarnings("ignore")
+
+N_REP     = 30
+N_WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else max(2, os.cpu_count())
+
+X_test, y_test = datos_test()
+rutas = rutas_modelos()
+n = len(X_test)
+
+filas = []
+for nombre, ruta in rutas.items():
+    pipe = joblib.load(ruta)
+
+    t0 = time.perf_counter()
+    permutation_importance(pipe, X_test, y_test, n_repeats=N_REP,
+                           scoring="neg_mean_absolute_error", random_state=0)
+    t_sk = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    tabla, _ = importancia_permutacion({nombre: ruta}, X_test, y_test,
+                                       n_repeticiones=N_REP, n_workers=1)
+    t_motor = time.perf_counter() - t0
+
+    # Referencia: mismas permutaciones sobre las columnas crudas
+    base = np.abs(pipe.predict(X_test) - y_test).mean()
+    ref = {}
+    for f, col in enumerate(X_test.columns):
+        deltas = []
+        for r in range(N_REP):
+            Xr = X_test.copy()
+            permutada = {col: X_test[col].to_numpy()[permutacion(RANDOM_STATE, f, r, n)]}
+            for c, v in con_derivadas(permutada, X_test.columns).items():
+                Xr[c] = v
+            deltas.append(np.abs(pipe.predict(Xr) - y_test).mean() - base)
+        ref[col] = np.mean(deltas)
+    err = (tabla.set_index("Feature")["Importancia"] - pd.Series(ref)).abs().max()
+
+    filas.append({"modelo": nombre, "sklearn (s)": t_sk, "motor (s)": t_motor,
+                  "speedup": t_sk / t_motor, "error vs columnas crudas": f"{err:.1e}"})
+
+tabla_modelos = pd.DataFrame(filas)
+print(f"{n} filas de test, {len(X_test.columns)} features, {N_REP} repeticiones")
+print(tabla_modelos.round(2).to_string(index=False))
+
+t_sk_total = tabla_modelos["sklearn (s)"].sum()
+print(f"\nTodos los modelos ({len(rutas)}) en una llamada; sklearn en serie: {t_sk_total:.1f} s")
+resultados = {}
+for w in [1, N_WORKERS]:
+    t0 = time.perf_counter()
+    resultados[w], info = importancia_permutacion(rutas, X_test, y_test,
+                                                  n_repeticiones=N_REP, n_workers=w)
+    t = time.perf_counter() - t0
+    print(f"  {w} workers: {t:.1f} s ({t_sk_total / t:.1f}×), {info['lotes']} lotes, "
+          f"{info['filas_predichas']:,} filas predichas")
+dif = (resultados[1]["Importancia"] - resultados[N_WORKERS]["Importancia"]).abs().max()
+print(f"Diferencia máxima 1 vs {N_WORKERS} workers: {dif:.1e}  ({os.cpu_count()} CPU)")
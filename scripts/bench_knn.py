@@ -0,0 +1,73 @@
+# --------------------  BENCHMARK: kNN EXACTO vs ÍNDICES  -----------------
+# Recall frente a latencia de consulta de:
+#   – KNeighborsRegressor brute (el kNN actual)
+#   – KNeighborsRegressor ball_tree (índice exacto)
+#   – KNNAproximado con 1..32 árboles de proyecciones aleatorias
+# sobre una población sintética de N filas en el espacio preprocesado
+# (filas de clean_data transformadas, muestreadas con reemplazo y con
+# ruido gaussiano pequeño para que no haya duplicados exactos). Los
+# hiperparámetros son los del mejor kNN de etapa3 (k = 9, p = 1,
+# weights = "distance").
+#
+# recall@k = fracción de los k vecinos exactos que devuelve el índice.
+# "|Δ| vs exacto" compara la predicción con la del kNN brute.
+#
+# Uso (desde scripts/):  python bench_knn.py [n_filas] [n_consultas]
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KNeighborsRegressor
+
+from esquema import cargar_datos, separar_xy, construir_preprocesador
+from knn_aproximado import KNNAproximado
+
+warnings.filterwarnings("ignore")
+
+N_FILAS     = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+N_CONSULTAS = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+K, P, PESOS = 9, 1, "distance"
+ARBOLES     = [1, 2, 4, 8, 16, 32]
+RUIDO       = 0.05
+
+X, y = separar_xy(cargar_datos())
+Z = construir_preprocesador(X).fit_transform(X)
+rng = np.random.default_rng(0)
+idx = rng.integers(len(Z), size=N_FILAS + N_CONSULTAS)
+Zs = Z[idx] + rng.normal(0, RUIDO, size=(len(idx), Z.shape[1]))
+ys = y.to_numpy()[idx]
+Z_fit, y_fit, Z_q = Zs[:N_FILAS], ys[:N_FILAS], Zs[N_FILAS:]
+print(f"Población: {N_FILAS:,} filas × {Z.shape[1]} features, {N_CONSULTAS:,} consultas, "
+      f"k = {K}, p = {P}, weights = {PESOS}\n")
+
+
+def medir(modelo):
+    t0 = time.perf_counter()
+    modelo.fit(Z_fit, y_fit)
+    t_fit = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    _, ind = modelo.kneighbors(Z_q, K)
+    t_q = time.perf_counter() - t0
+    return t_fit, t_q, ind, modelo.predict(Z_q)
+
+
+variantes = [("brute (actual)", KNeighborsRegressor(K, weights=PESOS, p=P, algorithm="brute")),
+             ("ball_tree", KNeighborsRegressor(K, weights=PESOS, p=P, algorithm="ball_tree"))]
+variantes += [(f"aprox {a} árboles", KNNAproximado(K, weights=PESOS, p=P, n_arboles=a,
+                                                   random_state=0)) for a in ARBOLES]
+
+filas = []
+ref_ind = ref_pred = t_ref = None
+for nombre, modelo in variantes:
+    t_fit, t_q, ind, pred = medir(modelo)
+    if ref_ind is None:
+        ref_ind, ref_pred, t_ref = ind, pred, t_q
+    recall = np.mean([len(np.intersect1d(a, b)) / K for a, b in zip(ref_ind, ind)])
+    filas.append({"Variante": nombre, "build (s)": t_fit,
+                  "ms / consulta": t_q / N_CONSULTAS * 1000,
+                  "speedup": t_ref / t_q, f"recall@{K}": recall,
+                  "|Δ| medio vs exacto": np.abs(pred - ref_pred).mean()})
+
+print(pd.DataFrame(filas).round(4).to_string(index=False))
@@ -0,0 +1,96 @@
+# --------------------  BENCHMARK: LIMPIEZA ETAPA 1  ----------------------
+# Compara la limpieza original de etapa1 (df.apply fila a fila para BPM,
+# fillna por columna, replace sobre object) con LimpiezaEncuesta sobre un
+# dataset escalado sintéticamente (filas de data.csv muestreadas con
+# reemplazo). Antes comprueba que ambas dan el mismo resultado sobre
+# data.csv.
+#
+# Uso (desde scripts/):  python bench_limpieza.py [n_filas]
+import sys
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+from limpieza import LimpiezaEncuesta, LIKERT, CAT_COLS, MH_COLS
+
+warnings.filterwarnings("ignore")
+
+N_FILAS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+
+def limpieza_original(df):
+    """Secciones 3-4 de etapa1.py antes de la vectorización."""
+    df = df.copy()
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+    df["Age"]       = pd.to_numeric(df["Age"], errors="coerce")
+    df["Age"] = df["Age"].fillna(df["Age"].median())
+
+    genre_bpm_median  = df.groupby("Fav genre")["BPM"].median()
+    global_bpm_median = df["BPM"].median()
+
+    def fill_bpm(row):
+        if np.isnan(row["BPM"]):
+            genre_val = genre_bpm_median.get(row["Fav genre"], np.nan)
+            return genre_val if not np.isnan(genre_val) else global_bpm_median
+        return row["BPM"]
+
+    df["BPM"] = df.apply(fill_bpm, axis=1)
+
+    for c in CAT_COLS:
+        df[c] = df[c].fillna(df[c].mode()[0])
+
+    df["Fav genre"]                 = df["Fav genre"].str.strip().str.title()
+    df["Primary streaming service"] = df["Primary streaming service"].str.strip().str.title()
+
+    for c in ["Age", "Hours per day", "BPM"]:
+        p1, p99 = np.percentile(df[c], [1, 99])
+        df[c] = np.clip(df[c], p1, p99)
+
+    df["submit_wday"] = df["Timestamp"].dt.day_name()
+    df["submit_hour"] = df["Timestamp"].dt.hour
+    df["Hours_cat"] = pd.cut(df["Hours per day"], bins=[0, 1, 3, 6, 12],
+                             labels=["≤1 h", "1-3 h", "3-6 h", ">6 h"])
+    df["MH_avg"]   = df[MH_COLS].mean(axis=1)
+    df["MH_level"] = pd.cut(df["MH_avg"], bins=[-0.1, 3, 6, 10],
+                            labels=["Baja", "Moderada", "Alta"])
+    freq_cols = [c for c in df.columns if c.startswith("Frequency")]
+    df[freq_cols] = df[freq_cols].replace(LIKERT)
+    return df
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+base = pd.read_csv("../data/data.csv")
+
+# 1) Equivalencia sobre el dataset real (comparando el CSV exportado)
+ref = limpieza_original(base)
+nuevo = LimpiezaEncuesta().fit_transform(base)
+print("Mismo clean_data.csv que la versión original:",
+      ref.to_csv(index=False) == nuevo.to_csv(index=False))
+
+# 2) Dataset escalado
+grande = base.sample(N_FILAS, replace=True, random_state=0).reset_index(drop=True)
+print(f"\nDataset sintético: {len(grande):,} filas, "
+      f"{grande['BPM'].isna().sum():,} BPM faltantes")
+
+t0 = time.perf_counter()
+ref = limpieza_original(grande)
+t_orig = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+limpieza = LimpiezaEncuesta().fit(grande)
+t_fit = time.perf_counter() - t0
+t0 = time.perf_counter()
+nuevo = limpieza.transform(grande)
+t_trans = time.perf_counter() - t0
+
+print(pd.DataFrame([
+    {"Versión": "original (apply)", "fit (s)": np.nan, "transform (s)": t_orig,
+     "total (s)": t_orig, "memoria (MB)": memoria_mb(ref)},
+    {"Versión": "LimpiezaEncuesta", "fit (s)": t_fit, "transform (s)": t_trans,
+     "total (s)": t_fit + t_trans, "memoria (MB)": memoria_mb(nuevo)},
+]).round(2).to_string(index=False))
+print(f"speedup: {t_orig / (t_fit + t_trans):.1f}x")
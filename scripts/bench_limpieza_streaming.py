@@ -0,0 +1,93 @@
+# --------------------  BENCHMARK: LIMPIEZA EN MEMORIA vs STREAMING  ------
+# Genera un CSV sintético (filas de data.csv muestreadas con reemplazo) y
+# lo limpia con el camino en memoria (read_csv + LimpiezaEncuesta +
+# guardar_limpio) y con limpieza_streaming; los dos escriben el CSV y el
+# Parquet tipado. Cada modo corre en un subproceso para medir su
+# memoria pico (ru_maxrss) por separado. Después compara las estadísticas
+# aprendidas y las celdas del CSV resultante.
+#
+# Uso (desde scripts/):  python bench_limpieza_streaming.py [n_filas] [chunksize]
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings("ignore")
+
+
+def _hijo(modo, entrada, salida, chunksize):
+    """Ejecuta un modo y emite tiempo, memoria pico y estadísticas en JSON."""
+    from almacen import guardar_limpio
+    from limpieza import LimpiezaEncuesta
+    from limpieza_streaming import limpiar_csv_streaming, parquet_de
+
+    t0 = time.perf_counter()
+    if modo == "memoria":
+        df = pd.read_csv(entrada)
+        limpieza = LimpiezaEncuesta().fit(df)
+        guardar_limpio(limpieza.transform(df), salida, parquet_de(salida))
+    else:
+        limpieza = limpiar_csv_streaming(entrada, salida, chunksize=chunksize)
+    print(json.dumps({
+        "segundos": time.perf_counter() - t0,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "age_median": float(limpieza.age_median_),
+        "global_bpm_median": float(limpieza.global_bpm_median_),
+        "limites": {c: list(map(float, v)) for c, v in limpieza.limites_.items()},
+        "genre_bpm_median": {str(k): float(v) for k, v in limpieza.genre_bpm_median_.items()}
+    }))
+
+
+if len(sys.argv) > 1 and sys.argv[1] == "--hijo":
+    _hijo(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]))
+    sys.exit()
+
+N_FILAS   = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+CHUNKSIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+
+tmp = tempfile.mkdtemp(prefix="bench_streaming_")
+entrada = os.path.join(tmp, "data_grande.csv")
+base = pd.read_csv("../data/data.csv", dtype=str)
+base.sample(N_FILAS, replace=True, random_state=0).to_csv(entrada, index=False)
+print(f"CSV sintético: {N_FILAS:,} filas, {os.path.getsize(entrada) / 1e6:.0f} MB, "
+      f"chunksize = {CHUNKSIZE:,}")
+
+res = {}
+for modo in ["memoria", "streaming"]:
+    salida = os.path.join(tmp, f"clean_{modo}.csv")
+    out = subprocess.run([sys.executable, __file__, "--hijo", modo, entrada, salida,
+                          str(CHUNKSIZE)], capture_output=True, text=True, check=True)
+    res[modo] = json.loads(out.stdout.strip().splitlines()[-1])
+
+print(pd.DataFrame({m: {"tiempo (s)": r["segundos"], "RSS pico (MB)": r["rss_mb"]}
+                    for m, r in res.items()}).T.round(1))
+
+# Diferencias en las estadísticas
+m, s = res["memoria"], res["streaming"]
+filas = [("Age mediana", m["age_median"], s["age_median"]),
+         ("BPM mediana global", m["global_bpm_median"], s["global_bpm_median"])]
+for c in m["limites"]:
+    for i, p in enumerate(["p1", "p99"]):
+        filas.append((f"{c} {p}", m["limites"][c][i], s["limites"][c][i]))
+dif_genero = max(abs(m["genre_bpm_median"][g] - s["genre_bpm_median"].get(g, np.nan))
+                 for g in m["genre_bpm_median"])
+print("\nEstadística               memoria    streaming    |Δ|")
+for nombre, a, b in filas:
+    print(f"{nombre:<24} {a:>9.3f} {b:>12.3f} {abs(a - b):>9.4f}")
+print(f"máx |Δ| mediana BPM por género: {dif_genero:.4f}")
+
+# Diferencias en el CSV limpio
+a = pd.read_csv(os.path.join(tmp, "clean_memoria.csv"))
+b = pd.read_csv(os.path.join(tmp, "clean_streaming.csv"))
+num = a.select_dtypes("number").columns
+print(f"\nCeldas numéricas distintas: {(a[num] != b[num]).to_numpy().mean():.4%}  "
+      f"(máx |Δ| = {np.nanmax(np.abs(a[num].to_numpy() - b[num].to_numpy())):.4f})")
+obj = a.columns.difference(num)
+print(f"Celdas de texto distintas:  {(a[obj].fillna('') != b[obj].fillna('')).to_numpy().mean():.4%}")
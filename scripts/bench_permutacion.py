@@ -0,0 +1,69 @@
+# --------------------  BENCHMARK: TESTS DE PERMUTACIÓN  -------------------
+# Todas las parejas de la matriz de correlación de etapa1 (COLUMNAS_CORR),
+# N_PERM permutaciones como máximo por pareja:
+#   – bucle: por pareja y permutación, stats.pearsonr / stats.spearmanr
+#     sobre y permutada; se mide con N_BUCLE permutaciones en PAREJAS_BUCLE
+#     parejas y se extrapola;
+#   – por bloques sin parada temprana (todas las parejas, N_PERM cada una);
+#   – por bloques con parada temprana.
+# Comprueba que los r observados coinciden con scipy y que las decisiones
+# (p < alfa) de los dos modos por bloques son las mismas.
+#
+# Uso (desde scripts/):  python bench_permutacion.py [n_perm]
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from almacen import leer_limpio
+from permutacion import COLUMNAS_CORR, test_permutacion
+
+warnings.filterwarnings("ignore")
+
+N_PERM        = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+N_BUCLE       = 200
+PAREJAS_BUCLE = 5
+
+df = leer_limpio(columnas=COLUMNAS_CORR).dropna()
+rng = np.random.default_rng(0)
+
+filas = []
+for metodo in ["pearson", "spearman"]:
+    f = getattr(stats, f"{metodo}r")
+    pares = [(a, b) for i, a in enumerate(COLUMNAS_CORR) for b in COLUMNAS_CORR[i + 1:]]
+
+    t0 = time.perf_counter()
+    for a, b in pares[:PAREJAS_BUCLE]:
+        x, y = df[a].to_numpy(float), df[b].to_numpy(float)
+        r = f(x, y)[0]
+        extremos = sum(abs(f(x, rng.permutation(y))[0]) >= abs(r) for _ in range(N_BUCLE))
+    t_bucle = (time.perf_counter() - t0) * (len(pares) / PAREJAS_BUCLE) * (N_PERM / N_BUCLE)
+
+    tiempos, tablas = {}, {}
+    for parada in [False, True]:
+        t0 = time.perf_counter()
+        tablas[parada] = test_permutacion(df, metodo, n_perm=N_PERM,
+                                          parada_temprana=parada, random_state=0)
+        tiempos[parada] = time.perf_counter() - t0
+
+    completo, temprano = tablas[False], tablas[True]
+    err_r = max(abs(f(df[a], df[b])[0] - r) for a, b, r in
+                zip(completo["Variable 1"], completo["Variable 2"], completo["r"]))
+    filas.append({"método": metodo, "parejas": len(pares),
+                  "bucle (s, extrap.)": t_bucle,
+                  "bloques (s)": tiempos[False],
+                  "bloques + parada (s)": tiempos[True],
+                  "permutaciones con parada": temprano["Permutaciones"].sum(),
+                  "decisiones distintas": (completo["Significativo"]
+                                           != temprano["Significativo"]).sum(),
+                  "error r máx": err_r})
+
+tabla = pd.DataFrame(filas)
+tabla["speedup bloques"] = tabla["bucle (s, extrap.)"] / tabla["bloques (s)"]
+tabla["speedup parada"] = tabla["bucle (s, extrap.)"] / tabla["bloques + parada (s)"]
+print(f"n = {len(df)} filas, hasta {N_PERM} permutaciones por pareja")
+tabla["error r máx"] = tabla["error r máx"].map("{:.1e}".format)
+print(tabla.round(2).to_string(index=False))
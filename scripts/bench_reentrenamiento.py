@@ -0,0 +1,159 @@
+# --------------------  BENCHMARK: REENTRENAMIENTO INCREMENTAL  -----------
+# Mide la latencia de incorporar un lote de respuestas nuevas:
+#   – incremental: ReentrenadorIncremental.actualizar() (leer solo las
+#     filas nuevas, actualizar estadísticas, limpiar y añadir el lote,
+#     warm start de GradientBoosting y HistGradientBoosting, reajuste de
+#     SVR_nystroem y kNN sobre la ventana reservoir sample + lote);
+#   – completo: etapa1 sobre todo el CSV (LimpiezaEncuesta fit + transform
+#     + guardar_limpio) y reajuste de los modelos con sus mejores
+#     hiperparámetros sobre todo clean_data (sin contar la búsqueda, que
+#     cuesta bastante más). SVR (libsvm, cuadrático en filas) no entra: su
+#     reajuste completo con 50 000 filas no es viable.
+# El histórico es sintético: filas de data.csv muestreadas con reemplazo y
+# Timestamps crecientes, para varios tamaños de histórico y de lote. Los
+# umbrales de deriva se desactivan para medir siempre el camino
+# incremental. Todo se escribe en un directorio temporal.
+#
+# Con filas repetidas el MAE no dice nada (HGB memoriza las copias), así
+# que la calidad se mide aparte sobre data.csv real en orden temporal:
+# MAE precuencial de cada lote antes de incorporarlo.
+#
+# Uso (desde scripts/):  python bench_reentrenamiento.py [historico ...]
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error
+
+from almacen import guardar_limpio
+from esquema import cargar_datos, separar_xy
+from limpieza import LimpiezaEncuesta
+from reentrenamiento import ReentrenadorIncremental
+
+warnings.filterwarnings("ignore")
+
+HISTORICOS = [int(a) for a in sys.argv[1:]] or [10_000, 50_000]
+LOTES      = [100, 1_000]
+MODELOS    = ["GradientBoosting", "HistGradientBoosting", "SVR_nystroem", "kNN"]
+
+base = pd.read_csv("../data/data.csv")
+rng = np.random.default_rng(0)
+inicio = pd.Timestamp("2023-01-01")
+
+
+def respuestas(n, desde):
+    """n filas de data.csv con reemplazo y Timestamps crecientes desde 'desde'."""
+    df = base.iloc[rng.integers(len(base), size=n)].reset_index(drop=True)
+    ts = inicio + pd.to_timedelta(desde + np.arange(n), unit="min")
+    df["Timestamp"] = ts.strftime("%m/%d/%Y %H:%M:%S")
+    return df
+
+
+filas = []
+for n_hist in HISTORICOS:
+    for n_lote in LOTES:
+        tmp = tempfile.mkdtemp()
+        rutas = {"ruta_raw": os.path.join(tmp, "data.csv"),
+                 "ruta_estado": os.path.join(tmp, "estado.joblib"),
+                 "modelos_dir": os.path.join(tmp, "modelos"),
+                 "artefactos_dir": os.path.join(tmp, "artefactos"),
+                 "csv_limpio": os.path.join(tmp, "clean_data.csv"),
+                 "parquet_limpio": os.path.join(tmp, "clean_data.parquet"),
+                 "limpieza_path": os.path.join(tmp, "limpieza.pkl")}
+        os.makedirs(rutas["modelos_dir"])
+        for m in MODELOS:
+            shutil.copy(f"../modelos/{m}_best.pkl", rutas["modelos_dir"])
+
+        historico = respuestas(n_hist, 0)
+        historico.to_csv(rutas["ruta_raw"], index=False)
+        guardar_limpio(LimpiezaEncuesta().fit(historico).transform(historico),
+                       rutas["csv_limpio"], rutas["parquet_limpio"])
+        ReentrenadorIncremental(MODELOS, umbral_psi=np.inf, **rutas).inicializar()
+
+        lote = respuestas(n_lote, n_hist)
+        lote.to_csv(rutas["ruta_raw"], mode="a", header=False, index=False)
+
+        # Incremental
+        t0 = time.perf_counter()
+        informe = ReentrenadorIncremental(MODELOS, umbral_psi=np.inf,
+                                          umbral_degradacion=np.inf, **rutas).actualizar()
+        t_inc = time.perf_counter() - t0
+        assert not informe["busqueda"], informe
+
+        # Completo: etapa1 sobre todo + reajuste con los mismos hiperparámetros
+        t0 = time.perf_counter()
+        raw = pd.read_csv(rutas["ruta_raw"])
+        guardar_limpio(LimpiezaEncuesta().fit(raw).transform(raw),
+                       rutas["csv_limpio"], rutas["parquet_limpio"])
+        X, y = separar_xy(cargar_datos(csv_path=rutas["csv_limpio"],
+                                       parquet_path=rutas["parquet_limpio"]))
+        completos = {m: clone(joblib.load(f"../modelos/{m}_best.pkl")).fit(X, y)
+                     for m in MODELOS}
+        t_full = time.perf_counter() - t0
+
+        filas.append({"histórico": n_hist, "lote": n_lote, "incremental (s)": t_inc,
+                      "completo (s)": t_full, "speedup": t_full / t_inc})
+        shutil.rmtree(tmp)
+
+print(pd.DataFrame(filas).round(2).to_string(index=False))
+
+# --------------------  Calidad sobre los datos reales  --------------------
+# data.csv en orden temporal: los modelos se ajustan (mejores
+# hiperparámetros) sobre las primeras N_INICIAL respuestas y el resto llega
+# en lotes. MAE precuencial: cada lote se predice antes de incorporarlo,
+# con los modelos incrementales y con los reajustados sobre todo lo previo.
+N_INICIAL, N_LOTES = 500, 4
+tmp = tempfile.mkdtemp()
+rutas = {"ruta_raw": os.path.join(tmp, "data.csv"),
+         "ruta_estado": os.path.join(tmp, "estado.joblib"),
+         "modelos_dir": os.path.join(tmp, "modelos"),
+         "artefactos_dir": os.path.join(tmp, "artefactos"),
+         "csv_limpio": os.path.join(tmp, "clean_data.csv"),
+         "parquet_limpio": os.path.join(tmp, "clean_data.parquet"),
+         "limpieza_path": os.path.join(tmp, "limpieza.pkl")}
+os.makedirs(rutas["modelos_dir"])
+X_real, y_real = separar_xy(cargar_datos())        # limpieza de etapa1 sobre todo
+base.iloc[:N_INICIAL].to_csv(rutas["ruta_raw"], index=False)
+inicial = base.iloc[:N_INICIAL]
+guardar_limpio(LimpiezaEncuesta().fit(inicial).transform(inicial),
+               rutas["csv_limpio"], rutas["parquet_limpio"])
+completos = {m: clone(joblib.load(f"../modelos/{m}_best.pkl"))
+                .fit(X_real.iloc[:N_INICIAL], y_real.iloc[:N_INICIAL]) for m in MODELOS}
+for m, modelo in completos.items():
+    joblib.dump(modelo, os.path.join(rutas["modelos_dir"], f"{m}_best.pkl"))
+reent = ReentrenadorIncremental(MODELOS, umbral_psi=np.inf, umbral_degradacion=np.inf,
+                                **rutas).inicializar()
+# Los encoders se construyeron con las categorías de todo X (como en
+# entrenamiento.main): ninguna categoría del resto es nueva para el modelo.
+reent.estado["categorias"] = {c: set(X_real[c].dropna()) for c in reent.estado["categorias"]}
+
+calidad = []
+cortes = np.linspace(N_INICIAL, len(base), N_LOTES + 1).astype(int)
+for a, b in zip(cortes[:-1], cortes[1:]):
+    base.iloc[a:b].to_csv(rutas["ruta_raw"], mode="a", header=False, index=False)
+    t0 = time.perf_counter()
+    informe = reent.actualizar()
+    t_inc = time.perf_counter() - t0
+    for r in informe["modelos"]:
+        calidad.append({"lote": f"{a}-{b}", "Modelo": r["Modelo"], "Acción": r["Acción"],
+                        "MAE incremental": r["MAE lote antes"],
+                        "MAE reajuste": mean_absolute_error(
+                            y_real.iloc[a:b], completos[r["Modelo"]].predict(X_real.iloc[a:b])),
+                        "incremental (s)": t_inc})
+    t0 = time.perf_counter()
+    completos = {m: clone(modelo).fit(X_real.iloc[:b], y_real.iloc[:b])
+                 for m, modelo in completos.items()}
+    for c in calidad[-len(MODELOS):]:
+        c["reajuste (s)"] = time.perf_counter() - t0
+shutil.rmtree(tmp)
+
+print(f"\nMAE precuencial sobre data.csv ({N_INICIAL} filas iniciales, "
+      f"{N_LOTES} lotes en orden temporal):")
+print(pd.DataFrame(calidad).round(3).to_string(index=False))
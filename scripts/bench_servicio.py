@@ -0,0 +1,117 @@
+# --------------------  BENCHMARK: SERVICIO DE INFERENCIA  ----------------
+# Generador de carga para servicio_inferencia.py. Arranca el servidor en
+# un subproceso (puerto libre, solo localhost) y lo bombardea con filas de
+# clean_data enviadas una a una desde N clientes concurrentes con conexión
+# keep-alive. Compara el servidor sin micro-lotes (max_batch = 1) con
+# micro-lotes, mide latencia p50/p99 y throughput en el cliente, lee
+# /metricas del servidor y comprueba que las predicciones coinciden con
+# modelo.predict sobre el mismo lote.
+#
+# Uso (desde scripts/):  python bench_servicio.py [peticiones_por_config] [modelo.pkl]
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from esquema import FEATURES, cargar_datos
+
+warnings.filterwarnings("ignore")
+
+N_PETICIONES = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+MODEL_PATH   = sys.argv[2] if len(sys.argv) > 2 else "../modelos/SVR_best.pkl"
+CONCURRENCIAS = [1, 8, 32]
+MAX_BATCH     = [1, 64]
+
+X = cargar_datos()[FEATURES]
+# Filas JSON tal como las mandaría un cliente (NaN -> null)
+filas = X.astype(object).where(X.notna(), None).to_dict("records")
+cuerpos = [json.dumps(f).encode() for f in filas]
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def arrancar(max_batch):
+    port = puerto_libre()
+    proc = subprocess.Popen([sys.executable, "servicio_inferencia.py", "--modelo", MODEL_PATH,
+                             "--port", str(port), "--max-batch", str(max_batch)],
+                            stdout=subprocess.DEVNULL)
+    for _ in range(200):
+        try:
+            con = http.client.HTTPConnection("127.0.0.1", port)
+            con.request("GET", "/salud")
+            con.getresponse().read()
+            return proc, port
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("el servidor no arrancó")
+
+
+def get(port, ruta):
+    con = http.client.HTTPConnection("127.0.0.1", port)
+    con.request("GET", ruta)
+    return json.loads(con.getresponse().read())
+
+
+def cliente(port, indices, latencias, preds):
+    con = http.client.HTTPConnection("127.0.0.1", port)
+    for i in indices:
+        t0 = time.perf_counter()
+        con.request("POST", "/predict", body=cuerpos[i],
+                    headers={"Content-Type": "application/json"})
+        resp = json.loads(con.getresponse().read())
+        latencias.append(time.perf_counter() - t0)
+        preds[i] = resp["predicciones"][0]
+
+
+rng = np.random.default_rng(0)
+resultados = []
+referencia = joblib.load(MODEL_PATH).predict(X)
+
+for max_batch in MAX_BATCH:
+    proc, port = arrancar(max_batch)
+    try:
+        for conc in CONCURRENCIAS:
+            indices = rng.integers(len(cuerpos), size=N_PETICIONES)
+            latencias, preds = [], np.full(len(cuerpos), np.nan)
+            antes = get(port, "/metricas")
+            hilos = [threading.Thread(target=cliente,
+                                      args=(port, indices[k::conc], latencias, preds))
+                     for k in range(conc)]
+            t0 = time.perf_counter()
+            for h in hilos:
+                h.start()
+            for h in hilos:
+                h.join()
+            total = time.perf_counter() - t0
+            despues = get(port, "/metricas")
+
+            lat = np.array(latencias) * 1000
+            vistos = ~np.isnan(preds)
+            llamadas = despues["llamadas_predict"] - antes["llamadas_predict"]
+            resultados.append({
+                "max_batch": max_batch, "clientes": conc,
+                "p50 (ms)": np.percentile(lat, 50), "p99 (ms)": np.percentile(lat, 99),
+                "filas/s": N_PETICIONES / total,
+                "lote medio": N_PETICIONES / llamadas if llamadas else np.nan,
+                "máx |Δ| vs predict": np.abs(preds[vistos] - referencia[vistos]).max()
+            })
+        print(f"/metricas (max_batch={max_batch}):", get(port, "/metricas"))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+print(f"\nModelo: {MODEL_PATH}  |  {N_PETICIONES:,} peticiones de 1 fila por configuración")
+print(pd.DataFrame(resultados).round(3).to_string(index=False))
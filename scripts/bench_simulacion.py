@@ -0,0 +1,64 @@
+# --------------------  BENCHMARK: MONTE CARLO BUCLE vs VECTORIZADO  --------
+# Compara el bucle original de etapa4 (una predicción por iteración) con
+# simulacion.simular_vectorizado para la misma semilla: comprueba que las
+# estadísticas coinciden y mide el tiempo de cada versión por escenario.
+#
+# Uso (desde scripts/):  python bench_simulacion.py [n_iter]
+import sys
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+from esquema import FEATURES, cargar_datos
+from simulacion import ESCENARIOS, simular_vectorizado
+
+SEED       = 42
+N_ITER     = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+BATCH_SIZE = 200
+MODEL_PATH = "../modelos/SVR_best.pkl"
+
+df = cargar_datos()
+svr_pipeline = joblib.load(MODEL_PATH)
+
+
+def simular_bucle(scenario_fn, n_iter, batch_size, random_state):
+    """Réplica del bucle original de etapa4 con semilla fija."""
+    rs = np.random.RandomState(random_state)
+    stats = []
+    for _ in range(n_iter):
+        sample = df.sample(batch_size, replace=True, random_state=rs)
+        X_sim = scenario_fn(sample)[FEATURES]
+        preds = svr_pipeline.predict(X_sim)
+        stats.append({
+            "mean": np.mean(preds),
+            "median": np.median(preds),
+            "p95": np.percentile(preds, 95),
+            "p05": np.percentile(preds, 5),
+            "std": np.std(preds)
+        })
+    return pd.DataFrame(stats)
+
+
+filas = []
+for nombre, fn in ESCENARIOS.items():
+    t0 = time.perf_counter()
+    ref = simular_bucle(fn, N_ITER, BATCH_SIZE, SEED)
+    t_bucle = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vec = simular_vectorizado(svr_pipeline, df, fn, FEATURES,
+                              n_iter=N_ITER, batch_size=BATCH_SIZE,
+                              random_state=SEED)
+    t_vec = time.perf_counter() - t0
+
+    filas.append({
+        "Escenario": nombre,
+        "bucle (s)": t_bucle,
+        "vectorizado (s)": t_vec,
+        "speedup": t_bucle / t_vec,
+        "máx |Δ|": np.abs(ref.values - vec.values).max()
+    })
+
+print(f"n_iter = {N_ITER}, batch_size = {BATCH_SIZE}, semilla = {SEED}")
+print(pd.DataFrame(filas).round(4).to_string(index=False))
@@ -0,0 +1,99 @@
+# --------------------  BENCHMARK: MONTE CARLO ADAPTATIVO  -----------------
+# Precisión de las diferencias escenario − Baseline de etapa4 (ESCENARIOS_DSL)
+# frente a iteraciones y predicciones:
+#   – muestras independientes por escenario (simular_vectorizado con una
+#     semilla por escenario, 500 iteraciones): IC de la diferencia con
+#     varianzas sumadas, e iteraciones que harían falta para ANCHO;
+#   – números aleatorios comunes con 500 iteraciones fijas (simular_barrido,
+#     lo que hace simular() en etapa4);
+#   – simular_adaptativo hasta IC ≤ ANCHO: CRN simple, antitéticas,
+#     estratificado por Fav genre / Hours_cat y combinaciones.
+# Para cada configuración adaptativa se repite con N_SEMILLAS semillas y se
+# informa la media de iteraciones y la cobertura del IC sobre la diferencia
+# "verdadera" (media de todas las filas, sin Monte Carlo).
+#
+# Uso (desde scripts/):  python bench_simulacion_adaptativa.py [ancho] [modelo]
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from escenarios_dsl import ESCENARIOS_DSL, matriz_escenarios, simular_barrido
+from esquema import FEATURES, cargar_datos
+from simulacion import simular_vectorizado
+from simulacion_adaptativa import intervalo_diferencias, simular_adaptativo
+
+warnings.filterwarnings("ignore")
+
+ANCHO      = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+MODEL_PATH = sys.argv[2] if len(sys.argv) > 2 else "../modelos/SVR_best.pkl"
+N_ITER     = 500
+N_SEMILLAS = 20
+BATCH_SIZE = 200
+
+df = cargar_datos()
+modelo = joblib.load(MODEL_PATH)
+nombres = list(ESCENARIOS_DSL)
+t = stats.t.ppf(0.975, N_ITER - 1)
+
+# Diferencia exacta: cada escenario sobre todas las filas
+todas = modelo.predict(matriz_escenarios(df, ESCENARIOS_DSL, FEATURES, np.arange(len(df))))
+exactas = todas.reshape(len(nombres), len(df)).mean(axis=1)
+exactas = pd.Series(exactas[1:] - exactas[0], index=nombres[1:])
+
+filas = []
+t0 = time.perf_counter()
+indep = {nombre: simular_vectorizado(modelo, df, esc, FEATURES, n_iter=N_ITER,
+                                     batch_size=BATCH_SIZE, random_state=42 + j)["mean"]
+         for j, (nombre, esc) in enumerate(ESCENARIOS_DSL.items())}
+t_indep = time.perf_counter() - t0
+ancho_indep = max(2 * t * np.sqrt((indep[e].var() + indep[nombres[0]].var()) / N_ITER)
+                  for e in nombres[1:])
+filas.append({"configuración": "independientes, 500 iter", "iteraciones": N_ITER,
+              "ancho IC máx": ancho_indep, "filas predichas": len(df) * len(nombres),
+              "tiempo (s)": t_indep,
+              f"iter. para {ANCHO}": N_ITER * (ancho_indep / ANCHO) ** 2})
+
+t0 = time.perf_counter()
+crn = simular_barrido(modelo, df, ESCENARIOS_DSL, FEATURES, n_iter=N_ITER,
+                      batch_size=BATCH_SIZE, random_state=42)
+t_crn = time.perf_counter() - t0
+medias = np.array([crn[e]["mean"].to_numpy() for e in nombres])
+ancho_crn = intervalo_diferencias(medias, nombres, nombres[0])["Ancho IC"].max()
+filas.append({"configuración": "CRN, 500 iter (simular)", "iteraciones": N_ITER,
+              "ancho IC máx": ancho_crn, "filas predichas": len(df) * len(nombres),
+              "tiempo (s)": t_crn,
+              f"iter. para {ANCHO}": N_ITER * (ancho_crn / ANCHO) ** 2})
+
+configs = {
+    "adaptativo CRN":                     {},
+    "adaptativo + antitéticas":           {"antitetico": True},
+    "adaptativo + estratos Fav genre":    {"estratos": "Fav genre"},
+    "adaptativo + estratos Hours_cat":    {"estratos": "Hours_cat"},
+    "adaptativo + Fav genre + antitéticas": {"estratos": "Fav genre", "antitetico": True},
+}
+for nombre, kwargs in configs.items():
+    iters, anchos, tiempos, predichas, cubre = [], [], [], [], []
+    for semilla in range(N_SEMILLAS):
+        _, dif, info = simular_adaptativo(modelo, df, ESCENARIOS_DSL, FEATURES,
+                                          batch_size=BATCH_SIZE, ancho_objetivo=ANCHO,
+                                          bloque=10, min_iter=20, random_state=semilla,
+                                          **kwargs)
+        dif = dif.set_index("Escenario")
+        iters.append(info["iteraciones"])
+        anchos.append(info["ancho_max"])
+        tiempos.append(info["segundos"])
+        predichas.append(info["filas_predichas"])
+        cubre.append(((dif["IC inf"] <= exactas) & (exactas <= dif["IC sup"])).mean())
+    filas.append({"configuración": nombre, "iteraciones": np.mean(iters),
+                  "ancho IC máx": np.mean(anchos), "filas predichas": np.mean(predichas),
+                  "tiempo (s)": np.mean(tiempos), f"iter. para {ANCHO}": np.mean(iters),
+                  "cobertura IC": np.mean(cubre)})
+
+print(f"{len(nombres)} escenarios, muestras de {BATCH_SIZE} filas, IC 95 % objetivo ≤ {ANCHO}; "
+      f"adaptativos: media de {N_SEMILLAS} semillas")
+print(pd.DataFrame(filas).round(4).to_string(index=False))
@@ -0,0 +1,56 @@
+# --------------------  BENCHMARK: SIMULACIÓN EN PARALELO  ----------------
+# Ejecuta simulacion_paralela.simular_paralelo con 1..N workers sobre los
+# escenarios de etapa4 y mide el throughput: muestras Monte Carlo
+# (predicciones servidas) por segundo y filas pasadas por el modelo por
+# segundo. Comprueba además que las estadísticas son idénticas con
+# cualquier nº de workers (semillas por shard). Con n_poblacion > 0 se
+# simula sobre una población sintética de ese tamaño (filas de clean_data
+# muestreadas con reemplazo), donde el coste lo domina predict.
+#
+# Uso (desde scripts/):
+#   python bench_simulacion_paralela.py [max_workers] [n_iter] [n_poblacion] [modelo]
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from esquema import cargar_datos
+from simulacion import ESCENARIOS
+from simulacion_paralela import simular_paralelo
+
+warnings.filterwarnings("ignore")
+
+MAX_WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+N_ITER      = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+N_POBLACION = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+MODELO      = sys.argv[4] if len(sys.argv) > 4 else "../modelos/artefactos/SVR"
+BATCH_SIZE  = 200
+
+df = cargar_datos()
+if N_POBLACION:
+    df = df.sample(N_POBLACION, replace=True, random_state=0).reset_index(drop=True)
+workers = sorted({1, 2, 4, 8, 16, MAX_WORKERS} & set(range(1, MAX_WORKERS + 1)))
+print(f"Modelo: {MODELO}  |  {len(ESCENARIOS)} escenarios × {N_ITER} iteraciones × "
+      f"{BATCH_SIZE} filas  |  población {len(df):,}  |  CPUs: {os.cpu_count()}\n")
+
+filas, referencia = [], None
+for n in workers:
+    resultados, info = simular_paralelo(MODELO, ESCENARIOS, df, n_iter=N_ITER,
+                                        batch_size=BATCH_SIZE, n_workers=n)
+    if referencia is None:
+        referencia = resultados
+    identico = all(np.array_equal(resultados[e].to_numpy(), referencia[e].to_numpy())
+                   for e in ESCENARIOS)
+    filas.append({"workers": n, "shards": info["shards"], "reloj (s)": info["segundos"],
+                  "muestras/s": info["muestras_por_s"],
+                  "filas modelo": info["filas_modelo"],
+                  "filas modelo/s": info["predicciones_por_s"],
+                  "mismo resultado": identico})
+
+res = pd.DataFrame(filas)
+res["speedup"] = res["reloj (s)"].iloc[0] / res["reloj (s)"]
+print(res.round(2).to_string(index=False))
+print("\nMedia de la media por escenario:")
+print(pd.Series({e: r["mean"].mean() for e, r in referencia.items()}).round(3).to_string())
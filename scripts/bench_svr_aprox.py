@@ -0,0 +1,87 @@
+# --------------------  BENCHMARK: SVR EXACTO vs SVR NYSTROEM  ------------
+# Compara el SVR RBF exacto (hiperparámetros de SVR_best.pkl) con el SVR
+# aproximado (Nystroem + LinearSVR, hiperparámetros de
+# SVR_nystroem_best.pkl) entrenando sobre poblaciones de distinto tamaño:
+#   – n = train real (80 % de clean_data)
+#   – n sintético: filas del train preprocesado muestreadas con reemplazo
+#     con ruido gaussiano pequeño (mismo target que la fila de origen)
+# y mide:
+#   – MAE / RMSE / R² sobre el test real (20 % de clean_data)
+#   – tiempo de entrenamiento
+#   – throughput de predicción (filas/s) sobre 100k filas
+# El SVR exacto solo se entrena hasta MAX_EXACTO filas (coste ~cuadrático).
+#
+# Uso (desde scripts/):  python bench_svr_aprox.py [tamaño ...]
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from esquema import cargar_datos, separar_xy
+from config_modelos import RANDOM_STATE
+
+warnings.filterwarnings("ignore")
+
+TAMANOS    = [int(a) for a in sys.argv[1:]] or [0, 5_000, 20_000, 100_000]   # 0 = train real
+MAX_EXACTO = 20_000
+N_PREDICT  = 100_000
+RUIDO      = 0.05
+
+X, y = separar_xy(cargar_datos())
+X_train, X_test, y_train, y_test = train_test_split(
+    X, y, test_size=0.20, random_state=RANDOM_STATE)
+
+exacto = joblib.load("../modelos/SVR_best.pkl")
+aprox = joblib.load("../modelos/SVR_nystroem_best.pkl")
+prep = exacto.named_steps["prep"]                 # mismo preprocesador ajustado
+Z_train, Z_test = prep.transform(X_train), prep.transform(X_test)
+modelos = {"SVR exacto": exacto.named_steps["model"],
+           "SVR Nystroem": aprox.named_steps["model"]}
+print("Hiperparámetros:")
+for nombre, m in modelos.items():
+    params = {k: v for k, v in m.get_params().items()
+              if k.split("__")[-1] in ("C", "gamma", "epsilon", "n_components")}
+    print(f"  {nombre}: {params}")
+
+rng = np.random.default_rng(0)
+Z_pred = Z_train[rng.integers(len(Z_train), size=N_PREDICT)]
+
+
+def poblacion(n):
+    if n == 0:
+        return Z_train, y_train.to_numpy()
+    idx = rng.integers(len(Z_train), size=n)
+    return (Z_train[idx] + rng.normal(0, RUIDO, size=(n, Z_train.shape[1])),
+            y_train.to_numpy()[idx])
+
+
+filas = []
+for n in TAMANOS:
+    Z, yz = poblacion(n)
+    for nombre, base in modelos.items():
+        if nombre == "SVR exacto" and len(Z) > MAX_EXACTO:
+            continue
+        modelo = clone(base)
+        t0 = time.perf_counter()
+        modelo.fit(Z, yz)
+        t_fit = time.perf_counter() - t0
+        pred = modelo.predict(Z_test)
+        t0 = time.perf_counter()
+        modelo.predict(Z_pred)
+        t_pred = time.perf_counter() - t0
+        filas.append({"n train": len(Z), "Modelo": nombre,
+                      "MAE": mean_absolute_error(y_test, pred),
+                      "RMSE": np.sqrt(mean_squared_error(y_test, pred)),
+                      "R²": r2_score(y_test, pred),
+                      "fit (s)": t_fit,
+                      "predict (filas/s)": N_PREDICT / t_pred,
+                      "vect. soporte": len(getattr(modelo, "support_", []))})
+
+print()
+print(pd.DataFrame(filas).round(3).to_string(index=False))
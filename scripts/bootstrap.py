@@ -0,0 +1,175 @@
+# --------------------  BOOTSTRAP VECTORIZADO (Etapa 2)  -------------------
+# Intervalos de confianza bootstrap para los estadísticos de etapa2:
+# descriptivos (media, varianza, desviación, asimetría y curtosis con las
+# mismas fórmulas que pandas), Pearson, Spearman y la OLS
+# Anxiety ~ Hours per day.
+#
+# Los remuestreos se sortean como una matriz de índices (n_boot, n) por
+# lotes, que se reduce a una matriz de conteos W (cuántas veces aparece
+# cada fila original en cada remuestreo). Como un remuestreo solo contiene
+# filas de la muestra, todos los estadísticos salen de productos W @ f(x, y)
+# con NumPy/BLAS:
+#   – descriptivos: momentos centrales a partir de las sumas de potencias
+#     (sobre los datos ya centrados, para evitar cancelaciones);
+#   – Pearson y OLS Anxiety ~ 1 + Hours: la misma covarianza; la OLS se
+#     resuelve con las ecuaciones normales 2×2 en forma cerrada;
+#   – Spearman: Pearson sobre rangos promedio; el rango de cada valor único
+#     en cada remuestreo sale de sus conteos (cumsum), empates incluidos,
+#     sin ordenar ninguna fila.
+# La estimación puntual (W = 1) y el jackknife para BCa (W = 1 - I) usan las
+# mismas funciones.
+#
+#   tabla = intervalos_bootstrap(data["Hours per day"], data["Anxiety"], n_boot=10_000)
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+TAM_LOTE = 1_000     # remuestreos por lote (memoria ~ TAM_LOTE × n × 8 B por array)
+
+
+# --------------------  ESTADÍSTICOS POR LOTES  ---------------------------
+def conteos_lote(idx, n):
+    """Matriz de índices (B, m) -> conteos (B, n) de cada fila original."""
+    B = len(idx)
+    return np.bincount((np.arange(B)[:, None] * n + idx).ravel(),
+                       minlength=B * n).reshape(B, n).astype(float)
+
+
+def _momentos(S, media):
+    """Momentos centrales 2-4 desde las medias de potencias S1..S4 (B, 4)."""
+    mu = S[:, 0]
+    m2 = S[:, 1] - mu**2
+    m3 = S[:, 2] - 3 * mu * S[:, 1] + 2 * mu**3
+    m4 = S[:, 3] - 4 * mu * S[:, 2] + 6 * mu**2 * S[:, 1] - 3 * mu**4
+    return mu + media, m2, m3, m4
+
+
+def descriptivos_lote(media, m2, m3, m4, m):
+    """Descriptivos como DataFrame.agg de pandas (var/std muestrales, G1, G2)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g1 = m3 / m2**1.5
+        g2 = m4 / m2**2 - 3
+    var = m2 * m / (m - 1)
+    return {"mean": media, "var": var, "std": np.sqrt(var),
+            "skew": g1 * np.sqrt(m * (m - 1)) / (m - 2),
+            "kurtosis": ((m + 1) * g2 + 6) * (m - 1) / ((m - 2) * (m - 3))}
+
+
+def rangos_lote(W, codigos, n_unicos):
+    """
+    Rango promedio (como scipy.stats.rankdata) de cada valor único en cada
+    remuestreo: (B, n_unicos). codigos: posición de cada fila original
+    entre los valores únicos ordenados.
+    """
+    conteos = W @ np.eye(n_unicos)[codigos]
+    return np.cumsum(conteos, axis=1) - (conteos - 1) / 2
+
+
+def _correlacion(sxy, sx, sy, sxx, syy):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (sxy - sx * sy) / np.sqrt((sxx - sx**2) * (syy - sy**2))
+
+
+def estadisticos_lote(x, y, W, nombres):
+    """
+    Todos los estadísticos de etapa2 para cada fila de la matriz de
+    conteos W (B, n). Devuelve {nombre: array (B,)}.
+    """
+    m = W.sum(axis=1)
+    xc, yc = x - x.mean(), y - y.mean()
+    potencias = np.column_stack([xc, xc**2, xc**3, xc**4,
+                                 yc, yc**2, yc**3, yc**4, xc * yc])
+    S = (W @ potencias) / m[:, None]
+
+    res = {}
+    momentos = {}
+    for nombre, cols, media in [(nombres[0], slice(0, 4), x.mean()),
+                                (nombres[1], slice(4, 8), y.mean())]:
+        momentos[nombre] = _momentos(S[:, cols], media)
+        for est, valores in descriptivos_lote(*momentos[nombre], m).items():
+            res[f"{est} – {nombre}"] = valores
+
+    mx, vx = S[:, 0], momentos[nombres[0]][1]
+    my, vy = S[:, 4], momentos[nombres[1]][1]
+    cov = S[:, 8] - mx * my
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res["Pearson r"] = cov / np.sqrt(vx * vy)
+        # Ecuaciones normales de y ~ 1 + x: [[1, x̄], [x̄, E x²]] β = [ȳ, E xy]
+        pendiente = cov / vx
+    res["Spearman ρ"] = _spearman(x, y, W, m)
+    res["OLS const"] = momentos[nombres[1]][0] - pendiente * momentos[nombres[0]][0]
+    res["OLS pendiente"] = pendiente
+    return res
+
+
+def _spearman(x, y, W, m):
+    ux, cx = np.unique(x, return_inverse=True)
+    uy, cy = np.unique(y, return_inverse=True)
+    Rx, Ry = rangos_lote(W, cx, len(ux)), rangos_lote(W, cy, len(uy))
+    rx, ry = Rx[:, cx], Ry[:, cy]                    # rango de cada fila original
+    media = (m + 1) / 2
+    return _correlacion(np.einsum("bi,bi,bi->b", W, rx, ry) / m, media, media,
+                        np.einsum("bi,bi->b", W, rx**2) / m,
+                        np.einsum("bi,bi->b", W, ry**2) / m)
+
+
+# --------------------  BOOTSTRAP E INTERVALOS  ---------------------------
+def _por_lotes(x, y, conteos_fn, n_filas, nombres, tam_lote):
+    """Evalúa estadisticos_lote sobre conteos_fn(inicio, fin) por lotes y concatena."""
+    partes = [estadisticos_lote(x, y, conteos_fn(i, min(i + tam_lote, n_filas)), nombres)
+              for i in range(0, n_filas, tam_lote)]
+    return {k: np.concatenate([p[k] for p in partes]) for k in partes[0]}
+
+
+def _jackknife(n, inicio, fin):
+    """Filas inicio..fin-1 de los conteos leave-one-out (1 - I)."""
+    W = np.ones((fin - inicio, n))
+    W[np.arange(fin - inicio), np.arange(inicio, fin)] = 0
+    return W
+
+
+def intervalos_bootstrap(x, y, n_boot=10_000, nivel=0.95, metodo="percentil",
+                         random_state=None, tam_lote=TAM_LOTE,
+                         nombres=("Hours per day", "Anxiety")):
+    """
+    IC bootstrap de los estadísticos de etapa2.
+
+    metodo : "percentil" o "bca" (corrección de sesgo y aceleración; la
+             aceleración se estima con jackknife, n evaluaciones más).
+    Devuelve un DataFrame (una fila por estadístico) con la estimación,
+    el error estándar bootstrap y los límites del intervalo, y
+    (como segundo valor) el dict con las n_boot réplicas de cada uno.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    rng = np.random.default_rng(random_state)
+
+    punto = estadisticos_lote(x, y, np.ones((1, n)), nombres)
+    replicas = _por_lotes(x, y, lambda i, j: conteos_lote(rng.integers(n, size=(j - i, n)), n),
+                          n_boot, nombres, tam_lote)
+
+    alfa = (1 - nivel) / 2
+    if metodo == "bca":
+        jack = _por_lotes(x, y, lambda i, j: _jackknife(n, i, j), n, nombres, tam_lote)
+
+    filas = []
+    for nombre, r in replicas.items():
+        estimacion = punto[nombre][0]
+        r = r[np.isfinite(r)]
+        if metodo == "bca":
+            z0 = stats.norm.ppf(np.mean(r < estimacion) + np.mean(r == estimacion) / 2)
+            d = jack[nombre].mean() - jack[nombre]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                a = np.sum(d**3) / (6 * np.sum(d**2)**1.5)
+            z = stats.norm.ppf([alfa, 1 - alfa])
+            q = stats.norm.cdf(z0 + (z0 + z) / (1 - a * (z0 + z)))
+            q = np.nan_to_num(q, nan=0.5)
+        elif metodo == "percentil":
+            q = np.array([alfa, 1 - alfa])
+        else:
+            raise ValueError(f"metodo debe ser 'percentil' o 'bca', no {metodo!r}")
+        inf, sup = np.quantile(r, q)
+        filas.append({"Estadístico": nombre, "Estimación": estimacion,
+                      "Error estándar": r.std(ddof=1), "IC inf": inf, "IC sup": sup})
+    return pd.DataFrame(filas).set_index("Estadístico"), replicas
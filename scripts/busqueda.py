@@ -0,0 +1,195 @@
+# --------------------  ESTRATEGIAS DE BÚSQUEDA DE HIPERPARÁMETROS  -------
+# Usado por etapa3. Cada modelo de la lista elige su estrategia con la
+# clave "busqueda":
+#   – "grid"    : GridSearchCV exhaustivo (comportamiento original)
+#   – "halving" : HalvingGridSearchCV; el recurso es n_estimators en los
+#                 ensembles de árboles y n_samples en el resto
+#   – "random"  : n_iter configuraciones muestreadas del grid (semilla
+#                 fija: mismas configuraciones en cualquier máquina); el
+#                 presupuesto de reloj es opcional y hace el resultado
+#                 dependiente de la velocidad de la máquina
+# Todas exponen fit / best_estimator_ / best_score_ / best_params_ y la
+# suma de los segundos de reloj de cada fit y score (fit_s_; con fits de
+# un solo hilo ≈ segundos de CPU).
+#
+# RondasHalving describe las mismas rondas que BusquedaHalving (recurso,
+# configuraciones y folds de cada ronda) para que entrenamiento.py reparta
+# cada (configuración × fold) de una ronda como tarea independiente.
+import time
+from math import ceil, floor, log
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (GridSearchCV, HalvingGridSearchCV,
+                                     ParameterGrid, ParameterSampler, cross_validate)
+from sklearn.utils import resample
+
+ESTRATEGIAS = ("grid", "halving", "random")
+RECURSO_ARBOLES = "model__n_estimators"
+FACTOR_HALVING  = 2
+
+
+def _fit_s_cv_results(cv_results, n_splits):
+    """Suma de tiempos de fit + score de todos los folds de todas las configs."""
+    por_config = (np.asarray(cv_results["mean_fit_time"]) +
+                  np.asarray(cv_results["mean_score_time"]))
+    return float(por_config.sum() * n_splits)
+
+
+class BusquedaGrid(GridSearchCV):
+    """GridSearchCV que además registra fit_s_."""
+
+    def fit(self, X, y=None, **params):
+        super().fit(X, y, **params)
+        self.fit_s_ = (_fit_s_cv_results(self.cv_results_, self.n_splits_) +
+                       self.refit_time_)
+        return self
+
+
+class BusquedaHalving(HalvingGridSearchCV):
+    """HalvingGridSearchCV que además registra fit_s_."""
+
+    def fit(self, X, y=None, **params):
+        super().fit(X, y, **params)
+        self.fit_s_ = (_fit_s_cv_results(self.cv_results_, self.n_splits_) +
+                       self.refit_time_)
+        return self
+
+
+class BusquedaAleatoriaPresupuesto:
+    """
+    Evalúa 'n_iter' configuraciones muestreadas al azar del grid (sin
+    repetición; todas si n_iter es None) y reajusta la mejor sobre todo el
+    conjunto de entrenamiento. Con 'presupuesto_s' (opcional) se deja de
+    evaluar al agotar esos segundos de reloj: más rápido, pero cuántas
+    configuraciones se prueban depende de la máquina.
+    """
+
+    def __init__(self, estimator, param_grid, scoring, cv, n_jobs=None,
+                 n_iter=None, presupuesto_s=None, random_state=None):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.presupuesto_s = presupuesto_s
+        self.n_iter = n_iter
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        n_total = int(np.prod([len(v) for v in self.param_grid.values()]))
+        n_iter = min(self.n_iter or n_total, n_total)
+        candidatos = ParameterSampler(self.param_grid, n_iter=n_iter,
+                                      random_state=self.random_state)
+        self.cv_results_ = {"params": [], "mean_test_score": []}
+        self.fit_s_ = 0.0
+        t0 = time.perf_counter()
+        for params in candidatos:
+            if self.presupuesto_s is not None and time.perf_counter() - t0 > self.presupuesto_s:
+                break
+            res = cross_validate(clone(self.estimator).set_params(**params),
+                                 X, y, scoring=self.scoring, cv=self.cv,
+                                 n_jobs=self.n_jobs)
+            self.fit_s_ += float(np.sum(res["fit_time"]) + np.sum(res["score_time"]))
+            self.cv_results_["params"].append(params)
+            self.cv_results_["mean_test_score"].append(float(np.mean(res["test_score"])))
+
+        mejor = int(np.argmax(self.cv_results_["mean_test_score"]))
+        self.best_params_ = self.cv_results_["params"][mejor]
+        self.best_score_ = self.cv_results_["mean_test_score"][mejor]
+
+        t_refit = time.perf_counter()
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+        self.best_estimator_.fit(X, y)
+        self.fit_s_ += time.perf_counter() - t_refit
+        return self
+
+
+class RondasHalving:
+    """
+    Rondas de successive halving con los mismos parámetros que
+    crear_busqueda("halving", ...): recurso n_estimators en los ensembles
+    (de max/8 al máximo del grid) y n_samples en el resto ("exhaust").
+    En cada ronda sobrevive la mitad (redondeando hacia arriba) de las
+    mejores configuraciones; el mejor es el de la última ronda.
+    """
+
+    def __init__(self, param_grid, n_samples, n_splits, factor=FACTOR_HALVING,
+                 random_state=None):
+        self.factor = factor
+        self.random_state = random_state
+        self.n_samples = n_samples
+        if RECURSO_ARBOLES in param_grid:
+            self.recurso = RECURSO_ARBOLES
+            grid = {k: v for k, v in param_grid.items() if k != RECURSO_ARBOLES}
+            max_recursos = max(param_grid[RECURSO_ARBOLES])
+            min_recursos = max_recursos // 8
+        else:
+            self.recurso = "n_samples"
+            grid = param_grid
+            max_recursos = n_samples
+            min_recursos = None
+
+        self.candidatos = list(ParameterGrid(grid))
+        n_necesarias = 1 + floor(log(len(self.candidatos), factor))
+        if min_recursos is None:
+            # "exhaust": la última ronda usa tantas filas como sea posible
+            min_recursos = max(2 * n_splits, max_recursos // factor ** (n_necesarias - 1))
+        n_posibles = 1 + floor(log(max_recursos // min_recursos, factor))
+        self.n_rondas = min(n_necesarias, n_posibles)
+        self.recursos = [min(int(factor ** i * min_recursos), max_recursos)
+                         for i in range(self.n_rondas)]
+
+    def configs(self, ronda, candidatos):
+        """Configuraciones de la ronda con su recurso (n_estimators) fijado."""
+        if self.recurso == "n_samples":
+            return list(candidatos)
+        return [{**c, self.recurso: self.recursos[ronda]} for c in candidatos]
+
+    def folds(self, ronda, folds):
+        """Folds de la ronda: submuestra train y validación si el recurso son filas."""
+        if self.recurso != "n_samples":
+            return folds
+        fraccion = self.recursos[ronda] / self.n_samples
+        return [tuple(resample(idx, replace=False, random_state=self.random_state,
+                               n_samples=int(fraccion * len(idx)))
+                      for idx in (tr, va))
+                for tr, va in folds]
+
+    def supervivientes(self, medias):
+        """Índices de las configuraciones que pasan a la ronda siguiente."""
+        return np.argsort(medias)[-ceil(len(medias) / self.factor):]
+
+
+def crear_busqueda(estrategia, pipe, param_grid, cv, scoring="neg_mean_absolute_error",
+                   n_jobs=-1, random_state=None, n_iter=None, presupuesto_s=None):
+    """Devuelve el objeto de búsqueda correspondiente a 'estrategia'."""
+    if estrategia == "grid":
+        return BusquedaGrid(pipe, param_grid=param_grid, scoring=scoring,
+                            cv=cv, n_jobs=n_jobs)
+
+    if estrategia == "halving":
+        if RECURSO_ARBOLES in param_grid:
+            # Ensembles: se empieza con pocos árboles y solo las mejores
+            # configuraciones llegan al máximo del grid.
+            grid = {k: v for k, v in param_grid.items() if k != RECURSO_ARBOLES}
+            max_arboles = max(param_grid[RECURSO_ARBOLES])
+            return BusquedaHalving(pipe, param_grid=grid, scoring=scoring, cv=cv,
+                                   resource=RECURSO_ARBOLES, factor=FACTOR_HALVING,
+                                   min_resources=max_arboles // 8,
+                                   max_resources=max_arboles,
+                                   random_state=random_state, n_jobs=n_jobs)
+        return BusquedaHalving(pipe, param_grid=param_grid, scoring=scoring, cv=cv,
+                               resource="n_samples", factor=FACTOR_HALVING,
+                               min_resources="exhaust",
+                               random_state=random_state, n_jobs=n_jobs)
+
+    if estrategia == "random":
+        return BusquedaAleatoriaPresupuesto(pipe, param_grid, scoring=scoring, cv=cv,
+                                            n_jobs=n_jobs, n_iter=n_iter,
+                                            presupuesto_s=presupuesto_s,
+                                            random_state=random_state)
+
+    raise ValueError(f"Estrategia de búsqueda desconocida: {estrategia!r} "
+                     f"(opciones: {', '.join(ESTRATEGIAS)})")
@@ -0,0 +1,99 @@
+# --------------------  CACHE DE PREDICCIONES  ---------------------------
+# Capa delante de un pipeline ya entrenado (p. ej. SVR_best.pkl) que evita
+# recalcular predicciones para filas ya vistas. La clave es un hash estable
+# de cada fila de features tras aplicar el escenario; como el preprocesado
+# del pipeline es determinista, la misma fila siempre produce la misma
+# predicción. Política LRU acotada y almacenamiento opcional en disco (.npz).
+import os
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+def hash_filas(X):
+    """Hash uint64 estable (entre procesos y ejecuciones) de cada fila."""
+    return pd.util.hash_pandas_object(X, index=False).to_numpy(dtype=np.uint64)
+
+
+class CachePredicciones:
+    """
+    Envoltorio con la misma interfaz `predict(X)` que el pipeline.
+
+    max_items : número máximo de filas guardadas (LRU); None = sin límite.
+    ruta      : fichero .npz opcional; se carga al crear el objeto si existe
+                y corresponde al mismo modelo, y se escribe con `guardar()`.
+    """
+
+    def __init__(self, modelo, max_items=100_000, ruta=None):
+        self.modelo = modelo
+        self.max_items = max_items
+        self.ruta = ruta
+        self.huella = joblib.hash(modelo)
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        if ruta is not None and os.path.exists(ruta):
+            self._cargar()
+
+    # ---------- Interfaz tipo estimador ----------
+    def predict(self, X):
+        claves = hash_filas(X)
+        preds = np.empty(len(claves))
+        pendientes = {}                      # clave -> posiciones sin predicción
+        for i, k in enumerate(claves.tolist()):
+            if k in self._cache:
+                self._cache.move_to_end(k)
+                preds[i] = self._cache[k]
+                self.hits += 1
+            else:
+                pendientes.setdefault(k, []).append(i)
+                self.misses += 1
+
+        if pendientes:
+            # Una fila representativa por clave: los duplicados dentro del
+            # mismo lote también se predicen una sola vez.
+            primeras = [pos[0] for pos in pendientes.values()]
+            nuevas = self.modelo.predict(X.iloc[primeras])
+            for (k, pos), valor in zip(pendientes.items(), nuevas):
+                preds[pos] = valor
+                self._insertar(k, float(valor))
+        return preds
+
+    def _insertar(self, clave, valor):
+        self._cache[clave] = valor
+        self._cache.move_to_end(clave)
+        if self.max_items is not None:
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
+
+    # ---------- Persistencia ----------
+    def guardar(self):
+        if self.ruta is None:
+            return
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        np.savez(self.ruta,
+                 huella=np.array(self.huella),
+                 claves=np.fromiter(self._cache.keys(), dtype=np.uint64,
+                                    count=len(self._cache)),
+                 valores=np.fromiter(self._cache.values(), dtype=float,
+                                     count=len(self._cache)))
+
+    def _cargar(self):
+        datos = np.load(self.ruta)
+        if str(datos["huella"]) != self.huella:
+            print(f"⚠️  Cache {self.ruta} pertenece a otro modelo: se ignora")
+            return
+        for k, v in zip(datos["claves"].tolist(), datos["valores"].tolist()):
+            self._insertar(k, v)
+
+    # ---------- Métricas ----------
+    def estadisticas(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "items": len(self._cache)
+        }
@@ -0,0 +1,113 @@
+# --------------------  CACHE DEL PREPROCESADO ENTRE FOLDS Y MODELOS  -----
+# En etapa3 cada fold de cada configuración de cada modelo vuelve a ajustar
+# el mismo ColumnTransformer (StandardScaler + OrdinalEncoder + OneHot)
+# sobre exactamente las mismas filas. PreprocesadorCacheado envuelve al
+# preprocesador y guarda, por fold, el transformador ajustado y las
+# matrices transformadas, de forma que se calculan una sola vez y se
+# reutilizan en todo el grid y en todas las familias de modelos.
+#
+# La clave de un fold son sus índices (las etiquetas del índice del
+# DataFrame, que train_test_split y KFold conservan) junto con un hash del
+# contenido, así que dos folds distintos nunca colisionan.
+#
+# El registro es un LRU acotado en bytes y vive a nivel de módulo (uno por
+# proceso: con n_jobs>1 cada worker tiene el suyo). limpiar_cache() lo
+# vacía al terminar el entrenamiento.
+import hashlib
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+
+MAX_BYTES = 512 * 1024**2
+
+_registro = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "bytes": 0}
+
+
+def _hash_datos(X):
+    """Hash de índices + contenido de X (DataFrame)."""
+    filas = pd.util.hash_pandas_object(X, index=True).to_numpy()
+    h = hashlib.sha1(filas.tobytes())
+    h.update("|".join(map(str, X.columns)).encode())
+    return h.hexdigest()
+
+
+def _tamano(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if hasattr(valor, "data") and hasattr(valor.data, "nbytes"):   # sparse
+        return valor.data.nbytes
+    return 0
+
+
+def _obtener(clave):
+    if clave in _registro:
+        _registro.move_to_end(clave)
+        _stats["hits"] += 1
+        return _registro[clave]
+    _stats["misses"] += 1
+    return None
+
+
+def _guardar(clave, valor):
+    _registro[clave] = valor
+    _stats["bytes"] += _tamano(valor)
+    while _stats["bytes"] > MAX_BYTES and len(_registro) > 1:
+        _, viejo = _registro.popitem(last=False)
+        _stats["bytes"] -= _tamano(viejo)
+
+
+def limpiar_cache():
+    """Vacía el registro y devuelve las estadísticas acumuladas."""
+    resumen = dict(_stats, items=len(_registro))
+    _registro.clear()
+    _stats.update(hits=0, misses=0, bytes=0)
+    return resumen
+
+
+class PreprocesadorCacheado(TransformerMixin, BaseEstimator):
+    """
+    Envoltorio de un preprocesador no supervisado (no depende de y) que
+    reutiliza ajustes y transformaciones ya calculados para el mismo fold.
+    """
+
+    def __init__(self, preprocesador):
+        self.preprocesador = preprocesador
+
+    def fit(self, X, y=None):
+        self.clave_fit_ = (joblib.hash(self.preprocesador.get_params()),
+                           _hash_datos(X))
+        ajustado = _obtener(("fit",) + self.clave_fit_)
+        if ajustado is None:
+            ajustado = clone(self.preprocesador).fit(X)
+            _guardar(("fit",) + self.clave_fit_, ajustado)
+        self.preprocesador_ = ajustado
+        return self
+
+    def transform(self, X):
+        clave = ("transform",) + self.clave_fit_ + (_hash_datos(X),)
+        Xt = _obtener(clave)
+        if Xt is None:
+            Xt = self.preprocesador_.transform(X)
+            _guardar(clave, Xt)
+        return Xt
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X, y).transform(X)
+
+    def get_feature_names_out(self, input_features=None):
+        return self.preprocesador_.get_feature_names_out(input_features)
+
+
+def desenvolver(pipe):
+    """
+    Sustituye el paso 'prep' cacheado por el preprocesador ajustado, para
+    que los modelos guardados en disco no dependan de este módulo.
+    """
+    prep = pipe.named_steps["prep"]
+    if isinstance(prep, PreprocesadorCacheado):
+        pipe.steps[0] = ("prep", prep.preprocesador_)
+    return pipe
@@ -0,0 +1,120 @@
+# --------------------  CONFIGURACIÓN DE MODELOS (Etapa 3)  ---------------
+# Lista de modelos, grids de hiperparámetros y estrategia de búsqueda de
+# cada uno (ver busqueda.py). "preprocesador" (opcional) es una función
+# X -> ColumnTransformer que sustituye a esquema.construir_preprocesador
+# para esa familia. Compartida por etapa3.py, etapa3-2.py y los
+# benchmarks.
+from sklearn.ensemble import (RandomForestRegressor, GradientBoostingRegressor,
+                              HistGradientBoostingRegressor)
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVR, LinearSVR
+from sklearn.neighbors import KNeighborsRegressor
+
+from esquema import CATEGORICAS_ARBOLES, construir_preprocesador_arboles
+from knn_aproximado import KNNAproximado
+
+RANDOM_STATE = 42
+CV_FOLDS     = 5
+
+# Estrategia "random": nº fijo de configuraciones muestreadas del grid
+# (con RANDOM_STATE), así que etapa3 guarda los mismos hiperparámetros en
+# cualquier máquina (ver bench_busqueda.py). El presupuesto de reloj (s)
+# es opcional (None = sin límite): con él, cuántas configuraciones se
+# evalúan depende de la velocidad y la carga de la máquina. "halving"
+# sobre n_estimators pierde precisión en GradientBoosting porque
+# n_estimators y learning_rate están acoplados.
+N_ITER_RANDOM        = 8
+PRESUPUESTO_RANDOM_S = None
+
+MODELOS = [
+    {
+        "nombre": "RandomForest",
+        "estimator": RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=-1),
+        "param_grid": {
+            "model__n_estimators":   [400, 800],
+            "model__max_depth":      [None, 15, 30],
+            "model__min_samples_leaf": [1, 2, 4]
+        },
+        "busqueda": "random"
+    },
+    {
+        "nombre": "GradientBoosting",
+        "estimator": GradientBoostingRegressor(random_state=RANDOM_STATE),
+        "param_grid": {
+            "model__n_estimators": [300, 600],
+            "model__learning_rate": [0.03, 0.05, 0.1],
+            "model__max_depth": [2, 3, 4]
+        },
+        "busqueda": "random"
+    },
+    {
+        # Boosting por histogramas: categóricas nativas (códigos enteros,
+        # sin one-hot) y early stopping sobre un 10 % de validación interna,
+        # así que max_iter es solo un techo (ver bench_hgb.py).
+        "nombre": "HistGradientBoosting",
+        "estimator": HistGradientBoostingRegressor(
+            categorical_features=CATEGORICAS_ARBOLES, max_iter=1000,
+            early_stopping=True, validation_fraction=0.1, n_iter_no_change=20,
+            random_state=RANDOM_STATE),
+        "preprocesador": construir_preprocesador_arboles,
+        "param_grid": {
+            "model__learning_rate":    [0.03, 0.05, 0.1],
+            "model__max_leaf_nodes":   [7, 15, 31],
+            "model__min_samples_leaf": [10, 20],
+            "model__l2_regularization": [0.0, 1.0]
+        },
+        "busqueda": "grid"
+    },
+    {
+        "nombre": "SVR",
+        "estimator": SVR(),
+        "param_grid": {
+            "model__C":      [10, 100],
+            "model__gamma":  ["scale", 0.01],
+            "model__epsilon": [0.1, 0.2]
+        },
+        "busqueda": "grid"
+    },
+    {
+        # SVR aproximado: mapa Nystroem del kernel RBF + SVR lineal. Predice
+        # en O(n_components × n_features) por fila en vez de
+        # O(n_vectores_soporte × n_features) y entrena en tiempo ~lineal
+        # en filas (ver bench_svr_aprox.py).
+        "nombre": "SVR_nystroem",
+        "estimator": Pipeline([
+            ("kernel", Nystroem(kernel="rbf", random_state=RANDOM_STATE)),
+            ("svr", LinearSVR(dual="auto", max_iter=10_000, random_state=RANDOM_STATE))
+        ]),
+        "param_grid": {
+            "model__kernel__gamma":        [0.01, 0.03],
+            "model__kernel__n_components": [100, 300],
+            "model__svr__C":               [1, 10],
+            "model__svr__epsilon":         [0.1, 0.2]
+        },
+        "busqueda": "grid"
+    },
+    {
+        "nombre": "kNN",
+        "estimator": KNeighborsRegressor(),
+        "param_grid": {
+            "model__n_neighbors": [5, 7, 9],
+            "model__weights":     ["uniform", "distance"],
+            "model__p":           [1, 2]
+        },
+        "busqueda": "grid"
+    },
+    {
+        # Mismo grid que kNN + nº de árboles del índice aproximado
+        # (ver knn_aproximado.py y bench_knn.py)
+        "nombre": "kNN_aprox",
+        "estimator": KNNAproximado(random_state=RANDOM_STATE),
+        "param_grid": {
+            "model__n_neighbors": [5, 7, 9],
+            "model__weights":     ["uniform", "distance"],
+            "model__p":           [1, 2],
+            "model__n_arboles":   [8, 16]
+        },
+        "busqueda": "grid"
+    }
+]
@@ -0,0 +1,76 @@
+# --------------------  CORRELACIONES CON SIGNIFICACIÓN (Etapa 1)  ---------
+# Matrices de Pearson y Spearman con p-valores y corrección de
+# Benjamini-Hochberg para todas las parejas de columnas, en una pasada
+# vectorizada:
+#   – cada columna se centra y normaliza (Spearman: rangos promedio, una
+#     sola vez por columna) -> R = Zᵀ Z es un único producto de matrices;
+#   – p-valores bilaterales con t = r √((n-2)/(1-r²)) y n-2 g.l. (lo mismo
+#     que stats.pearsonr / stats.spearmanr), sobre el triángulo superior;
+#   – BH (fdr_bh de statsmodels) dentro de cada método.
+# Ningún bucle por pareja: escala a cientos de columnas. Las filas con NaN
+# se descartan antes (clean_data no tiene NaN en las numéricas).
+#
+#   matrices, tabla = analisis_correlaciones(df[COLUMNAS_CORR])
+#   parejas_significativas(tabla).to_csv(...)
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from permutacion import estandarizar
+
+
+def matriz_correlacion(X, metodo="pearson"):
+    """Matriz de correlación (DataFrame) y número de filas usadas."""
+    X = X.dropna()
+    Z = estandarizar(X.to_numpy(dtype=float), metodo)
+    R = np.clip(Z.T @ Z, -1, 1)
+    return pd.DataFrame(R, index=X.columns, columns=X.columns), len(X)
+
+
+def p_valores(r, n):
+    """p bilateral del test t de una correlación r con n observaciones."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt((n - 2) / (1 - r**2))
+    return 2 * stats.t.sf(np.abs(t), n - 2)
+
+
+def analisis_correlaciones(X, metodos=("pearson", "spearman"), alfa=0.05):
+    """
+    Correlaciones de todas las parejas de columnas de X.
+
+    Devuelve ({metodo: matriz de correlación}, tabla larga) con una fila
+    por pareja y método: r, p, p BH (FDR de Benjamini-Hochberg dentro del
+    método) y si es significativa (p BH < alfa).
+    """
+    matrices, partes = {}, []
+    for metodo in metodos:
+        R, n = matriz_correlacion(X, metodo)
+        fi, co = np.triu_indices(len(R), 1)
+        r = R.to_numpy()[fi, co]
+        p = p_valores(r, n)
+        p_bh = np.full_like(p, np.nan)
+        validos = np.isfinite(p)
+        if validos.any():
+            p_bh[validos] = multipletests(p[validos], method="fdr_bh")[1]
+        matrices[metodo] = R
+        partes.append(pd.DataFrame({
+            "Método": metodo,
+            "Variable 1": R.columns[fi],
+            "Variable 2": R.columns[co],
+            "r": r,
+            "n": n,
+            "p": p,
+            "p BH": p_bh,
+            "Significativo": p_bh < alfa,
+        }))
+    return matrices, pd.concat(partes, ignore_index=True)
+
+
+def parejas_significativas(tabla):
+    """Filas significativas tras BH, de mayor a menor |r| dentro de cada método."""
+    sig = tabla[tabla["Significativo"]]
+    return (sig.assign(orden=-sig["r"].abs())
+               .sort_values(["Método", "orden"])
+               .drop(columns=["orden", "Significativo"])
+               .reset_index(drop=True))
@@ -0,0 +1,180 @@
+# --------------------  DEPENDENCIA PARCIAL / ICE (Etapa 4)  ---------------
+# Curvas de dependencia parcial (PD) e ICE para cualquier feature del
+# esquema (Hours per day, BPM, Age, Frequency [...], categóricas), sobre
+# una rejilla densa de valores y todas las filas, y superficies 2D de
+# interacción entre dos features.
+#
+# En vez de un escenario por punto de la rejilla:
+#   – si el modelo es un Pipeline con ColumnTransformer, X se preprocesa
+#     una vez. Cada valor de la rejilla se transforma por separado (una
+#     fila por valor) y solo se sustituyen las columnas de salida de la
+#     feature (one-hot agrupado, ver importancia.grupos_features): el
+#     preprocesado es fila a fila y cada salida depende de una sola
+#     feature;
+#   – la matriz de filas × puntos de la rejilla se construye en bloque
+#     (np.tile) y se predice con una sola llamada al estimador final; si
+#     pasa de max_filas_lote filas, se trocea por puntos de la rejilla
+#     (memoria acotada, también en 2D con n × k1 × k2 filas);
+#   – con cualquier otro modelo (artefacto, CachePredicciones, ...) se
+#     hace lo mismo sobre el DataFrame crudo con modelo.predict;
+#   – al fijar una feature con derivadas (Hours per day -> Hours_cat, ver
+#     limpieza.DERIVADAS) la derivada se recalcula para cada valor con la
+#     misma función que la limpieza, en los dos caminos.
+#
+#   pd_h, ice_h = dependencia_parcial(modelo, X, "Hours per day", valores=np.arange(0, 25))
+#   sup = dependencia_2d(modelo, X, "Hours per day", "BPM", n_puntos=20)
+#
+# Uso (desde scripts/):
+#   python dependencia_parcial.py [--modelo SVR] [--features "Hours per day" BPM ...]
+#                                 [--puntos 50] [--2d "Hours per day" BPM]
+import argparse
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+
+from esquema import FEATURES, cargar_datos
+from importancia import grupos_features
+from limpieza import con_derivadas
+
+MAX_FILAS_LOTE = 200_000     # filas por predict (memoria acotada)
+N_PUNTOS       = 50
+PERCENTILES    = (0.05, 0.95)
+
+
+def rejilla(serie, n_puntos=N_PUNTOS, percentiles=PERCENTILES):
+    """
+    Valores a evaluar: los valores únicos si hay ≤ n_puntos (Likert,
+    categóricas, ...); si no, n_puntos equiespaciados entre los percentiles.
+    """
+    valores = serie.dropna().unique()
+    if len(valores) <= n_puntos or not pd.api.types.is_numeric_dtype(serie):
+        return np.sort(valores) if pd.api.types.is_numeric_dtype(serie) else valores
+    inf, sup = np.quantile(serie.dropna().astype(float), percentiles)
+    return np.linspace(inf, sup, n_puntos)
+
+
+# ------------------------------------------------------------------
+# Evaluación por bloques
+# ------------------------------------------------------------------
+def _separar(modelo):
+    """(ColumnTransformer, estimador final) si el modelo es un Pipeline; si no, (None, modelo)."""
+    if isinstance(modelo, Pipeline) and isinstance(modelo[:-1][-1], ColumnTransformer):
+        return modelo[:-1], modelo[-1]
+    return None, modelo
+
+
+def _columnas_rejilla(prep, X, feature, valores):
+    """Columnas de salida de 'feature' para cada valor: (k, ancho del grupo)."""
+    cols = grupos_features(prep[-1])[feature]
+    base = X.iloc[[0] * len(valores)].copy()
+    base[feature] = valores
+    return cols, np.asarray(prep.transform(base))[:, cols]
+
+
+def _predecir_puntos(modelo, X, asignaciones, max_filas_lote):
+    """
+    asignaciones: {feature: array de k valores} (mismo k para todas). Para
+    cada punto j fija cada feature a su valor j-ésimo en todas las filas de
+    X y predice (y recalcula sus derivadas). Devuelve (k, n). Una llamada
+    a predict por bloque de puntos, con ≤ max_filas_lote filas.
+    """
+    asignaciones = con_derivadas(asignaciones, X.columns)
+    prep, estimador = _separar(modelo)
+    n = len(X)
+    k = len(next(iter(asignaciones.values())))
+    por_lote = max(1, max_filas_lote // n)
+    if prep is not None:
+        Xp = np.asarray(prep.transform(X))
+        grupos = [_columnas_rejilla(prep, X, f, v) for f, v in asignaciones.items()]
+
+    preds = np.empty((k, n))
+    for a in range(0, k, por_lote):
+        b = min(a + por_lote, k)
+        if prep is not None:
+            bloque = np.tile(Xp, (b - a, 1))
+            for cols, salida in grupos:
+                bloque[:, cols] = np.repeat(salida[a:b], n, axis=0)
+        else:
+            bloque = X.iloc[np.tile(np.arange(n), b - a)].reset_index(drop=True)
+            for f, v in asignaciones.items():
+                bloque[f] = np.repeat(np.asarray(v)[a:b], n)
+        preds[a:b] = np.asarray(estimador.predict(bloque)).reshape(b - a, n)
+    return preds
+
+
+# ------------------------------------------------------------------
+# PD / ICE
+# ------------------------------------------------------------------
+def dependencia_parcial(modelo, X, feature, valores=None, n_puntos=N_PUNTOS,
+                        max_filas_lote=MAX_FILAS_LOTE):
+    """
+    PD e ICE de una feature. Devuelve (DataFrame con valor, PD (media de
+    las ICE), p05/p95 de las ICE y PD centrada en el primer valor; matriz
+    ICE (n filas × k valores)).
+    """
+    X = X[FEATURES] if set(FEATURES) <= set(X.columns) else X
+    valores = rejilla(X[feature], n_puntos) if valores is None else np.asarray(valores)
+    ice = _predecir_puntos(modelo, X, {feature: valores}, max_filas_lote).T
+    pd_media = ice.mean(axis=0)
+    tabla = pd.DataFrame({feature: valores, "PD": pd_media,
+                          "ICE p05": np.percentile(ice, 5, axis=0),
+                          "ICE p95": np.percentile(ice, 95, axis=0),
+                          "PD centrada": pd_media - pd_media[0]})
+    return tabla, ice
+
+
+def curvas_pd(modelo, X, features, n_puntos=N_PUNTOS, max_filas_lote=MAX_FILAS_LOTE):
+    """PD de varias features en una tabla larga (Feature, Valor, PD, ...)."""
+    partes = []
+    for f in features:
+        tabla, _ = dependencia_parcial(modelo, X, f, n_puntos=n_puntos,
+                                       max_filas_lote=max_filas_lote)
+        partes.append(tabla.rename(columns={f: "Valor"}).assign(Feature=f))
+    return pd.concat(partes, ignore_index=True)[["Feature", "Valor", "PD", "ICE p05",
+                                                 "ICE p95", "PD centrada"]]
+
+
+def dependencia_2d(modelo, X, feature_1, feature_2, valores_1=None, valores_2=None,
+                   n_puntos=20, max_filas_lote=MAX_FILAS_LOTE):
+    """
+    Superficie PD de dos features: DataFrame (valores_1 × valores_2) con la
+    predicción media. n × k1 × k2 filas en total, troceadas en bloques de
+    ≤ max_filas_lote.
+    """
+    X = X[FEATURES] if set(FEATURES) <= set(X.columns) else X
+    v1 = rejilla(X[feature_1], n_puntos) if valores_1 is None else np.asarray(valores_1)
+    v2 = rejilla(X[feature_2], n_puntos) if valores_2 is None else np.asarray(valores_2)
+    preds = _predecir_puntos(modelo, X, {feature_1: np.repeat(v1, len(v2)),
+                                         feature_2: np.tile(v2, len(v1))}, max_filas_lote)
+    return pd.DataFrame(preds.mean(axis=1).reshape(len(v1), len(v2)),
+                        index=pd.Index(v1, name=feature_1),
+                        columns=pd.Index(v2, name=feature_2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Curvas PD / ICE de un *_best.pkl")
+    parser.add_argument("--modelo", default="SVR")
+    parser.add_argument("--features", nargs="+", default=["Hours per day", "BPM"],
+                        choices=FEATURES, metavar="FEATURE")
+    parser.add_argument("--puntos", type=int, default=N_PUNTOS)
+    parser.add_argument("--2d", dest="dos_d", nargs=2, choices=FEATURES, metavar="FEATURE")
+    args = parser.parse_args(argv)
+
+    modelo = joblib.load(f"../modelos/{args.modelo}_best.pkl")
+    X = cargar_datos()[FEATURES]
+    for f in args.features:
+        tabla, ice = dependencia_parcial(modelo, X, f, n_puntos=args.puntos)
+        print(f"\n=== PD / ICE – {f} ({args.modelo}, {ice.shape[0]} filas × "
+              f"{ice.shape[1]} valores) ===")
+        print(tabla.round(3).to_string(index=False))
+    if args.dos_d:
+        sup = dependencia_2d(modelo, X, *args.dos_d, n_puntos=min(args.puntos, 20))
+        print(f"\n=== Superficie PD – {args.dos_d[0]} × {args.dos_d[1]} ({args.modelo}) ===")
+        print(sup.round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+# ====================================================================
+# ORQUESTADOR DE ENTRENAMIENTO (Etapa 3)
+# ====================================================================
+# Flujo único que sustituye al código duplicado de etapa3.py y
+# etapa3-2.py: carga, split, búsqueda de hiperparámetros de todas las
+# familias de config_modelos.MODELOS, guardado de <nombre>_best.pkl y,
+# opcionalmente, matrices de confusión como post-etapa.
+#
+# Planificación: un único ProcessPoolExecutor con un presupuesto global
+# de workers. Cada (configuración × fold) de cada familia es una tarea
+# independiente: "grid" envía todo el grid, "random" las N_ITER_RANDOM
+# configuraciones muestreadas con RANDOM_STATE y "halving" una ronda cada
+# vez (busqueda.RondasHalving; la siguiente sale al completarse la
+# anterior). Solo "random" con PRESUPUESTO_RANDOM_S, que depende del reloj,
+# se ejecuta como una tarea secuencial completa. Dentro de cada worker todo
+# corre con un solo hilo (n_jobs=1 en los estimadores y BLAS/OpenMP
+# limitados a 1), así que nunca hay más de N procesos activos. Cada
+# modelo se guarda en disco en cuanto termina su refit.
+# ====================================================================
+import argparse
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import (
+    get_scorer,
+    mean_absolute_error,
+    mean_squared_error,
+    confusion_matrix,
+    classification_report
+)
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+from sklearn.pipeline import Pipeline
+from threadpoolctl import threadpool_limits
+
+from esquema import cargar_datos, separar_xy, construir_preprocesador, particion_test
+from busqueda import ESTRATEGIAS, RondasHalving, crear_busqueda
+from cache_preprocesado import PreprocesadorCacheado, desenvolver, limpiar_cache
+from artefacto import ARTEFACTOS_DIR, exportar_artefacto
+from config_modelos import (MODELOS, RANDOM_STATE, CV_FOLDS, N_ITER_RANDOM,
+                            PRESUPUESTO_RANDOM_S)
+
+SCORING    = "neg_mean_absolute_error"
+OUTPUT_DIR = "../modelos"
+FIGS_DIR   = "../figs/figuras_confusion"
+
+# Datos de entrenamiento de cada worker (se envían una vez, no por tarea)
+_DATOS = {}
+
+
+# ------------------------------------------------------------------
+# Tareas que se ejecutan en los workers
+# ------------------------------------------------------------------
+def _init_worker(X_train, y_train):
+    warnings.filterwarnings("ignore")
+    threadpool_limits(1)
+    _DATOS["X"], _DATOS["y"] = X_train, y_train
+
+
+def _tarea_fold(pipe, params, train_idx, val_idx):
+    """Ajusta una configuración en un fold y devuelve (score, CPU-s)."""
+    X, y = _DATOS["X"], _DATOS["y"]
+    t0 = time.process_time()
+    est = clone(pipe).set_params(**params)
+    est.fit(X.iloc[train_idx], y.iloc[train_idx])
+    score = get_scorer(SCORING)(est, X.iloc[val_idx], y.iloc[val_idx])
+    return score, time.process_time() - t0
+
+
+def _tarea_refit(pipe, params):
+    """Reajusta la mejor configuración sobre todo el train."""
+    t0 = time.process_time()
+    est = clone(pipe).set_params(**params).fit(_DATOS["X"], _DATOS["y"])
+    return desenvolver(est), time.process_time() - t0
+
+
+def _tarea_busqueda(estrategia, pipe, param_grid, cv):
+    """Búsqueda secuencial completa (random con presupuesto) en un solo worker."""
+    gs = crear_busqueda(estrategia, pipe, param_grid, cv, n_jobs=1,
+                        random_state=RANDOM_STATE, n_iter=N_ITER_RANDOM,
+                        presupuesto_s=PRESUPUESTO_RANDOM_S)
+    t0 = time.process_time()
+    gs.fit(_DATOS["X"], _DATOS["y"])
+    cpu = time.process_time() - t0
+    return desenvolver(gs.best_estimator_), -gs.best_score_, gs.best_params_, cpu
+
+
+def _sin_anidar(pipe):
+    """Fuerza n_jobs=1 en cualquier paso que lo admita (p. ej. RandomForest)."""
+    return pipe.set_params(**{k: 1 for k in pipe.get_params() if k.endswith("n_jobs")})
+
+
+# ------------------------------------------------------------------
+# Planificador
+# ------------------------------------------------------------------
+def _configs_iniciales(estrategia, param_grid, n_samples, n_splits):
+    """Configuraciones de la primera ronda y plan de halving (o None)."""
+    if estrategia == "grid":
+        return list(ParameterGrid(param_grid)), None
+    if estrategia == "random":
+        n_total = len(ParameterGrid(param_grid))
+        return list(ParameterSampler(param_grid, n_iter=min(N_ITER_RANDOM, n_total),
+                                     random_state=RANDOM_STATE)), None
+    plan = RondasHalving(param_grid, n_samples, n_splits, random_state=RANDOM_STATE)
+    return plan.configs(0, plan.candidatos), plan
+
+
+def _enviar_ronda(pool, pendientes, nombre, st, folds):
+    """Envía cada (configuración × fold) de la ronda actual como una tarea."""
+    if st["plan"] is not None:
+        folds = st["plan"].folds(st["ronda"], folds)
+    st["scores"] = np.full((len(st["configs"]), len(folds)), np.nan)
+    st["restantes"] = len(st["configs"]) * len(folds)
+    for i, params in enumerate(st["configs"]):
+        for j, (tr, va) in enumerate(folds):
+            fut = pool.submit(_tarea_fold, st["pipe"], params, tr, va)
+            pendientes[fut] = ("fold", nombre, i, j)
+
+
+def entrenar(models, X_train, y_train, preprocessor, cv, n_workers=None, busqueda=None,
+             preprocesadores=None):
+    """
+    Generador: entrena todas las familias de 'models' en un pool común de
+    n_workers procesos y va devolviendo un dict por modelo en cuanto su
+    mejor estimador está reajustado. 'preprocesadores' (nombre ->
+    transformador) sustituye a 'preprocessor' en las familias indicadas.
+    """
+    preprocesadores = preprocesadores or {}
+    n_workers = n_workers or os.cpu_count() or 1
+    folds = list(cv.split(X_train))
+    t_inicio = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(X_train, y_train)) as pool:
+        pendientes = {}
+        estado = {}
+
+        for cfg in models:
+            nombre = cfg["nombre"]
+            estrategia = busqueda or cfg.get("busqueda", "grid")
+            prep = preprocesadores.get(nombre, preprocessor)
+            pipe = _sin_anidar(Pipeline([("prep", prep),
+                                         ("model", clone(cfg["estimator"]))]))
+            estado[nombre] = {"estrategia": estrategia, "pipe": pipe, "cpu_s": 0.0}
+
+            if estrategia == "random" and PRESUPUESTO_RANDOM_S is not None:
+                fut = pool.submit(_tarea_busqueda, estrategia, pipe,
+                                  cfg["param_grid"], cv)
+                pendientes[fut] = ("busqueda", nombre)
+                continue
+
+            configs, plan = _configs_iniciales(estrategia, cfg["param_grid"],
+                                               len(X_train), len(folds))
+            estado[nombre].update(configs=configs, plan=plan, ronda=0)
+            _enviar_ronda(pool, pendientes, nombre, estado[nombre], folds)
+
+        while pendientes:
+            hechos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for fut in hechos:
+                tipo, nombre, *pos = pendientes.pop(fut)
+                st = estado[nombre]
+
+                if tipo == "fold":
+                    score, cpu = fut.result()
+                    st["scores"][pos[0], pos[1]] = score
+                    st["cpu_s"] += cpu
+                    st["restantes"] -= 1
+                    if st["restantes"] == 0:
+                        medias = st["scores"].mean(axis=1)
+                        plan = st["plan"]
+                        if plan is not None and st["ronda"] + 1 < plan.n_rondas:
+                            # Halving: las mejores pasan a la ronda siguiente
+                            st["ronda"] += 1
+                            vivos = [st["configs"][i] for i in plan.supervivientes(medias)]
+                            st["configs"] = plan.configs(st["ronda"], vivos)
+                            _enviar_ronda(pool, pendientes, nombre, st, folds)
+                            continue
+                        # Igual que GridSearchCV: la primera config con mejor media
+                        mejor = int(np.argmax(medias))
+                        st["best_score"] = medias[mejor]
+                        st["best_params"] = st["configs"][mejor]
+                        fut = pool.submit(_tarea_refit, st["pipe"], st["best_params"])
+                        pendientes[fut] = ("refit", nombre)
+                    continue
+
+                if tipo == "refit":
+                    best_model, cpu = fut.result()
+                    st["cpu_s"] += cpu
+                    cv_mae = -st["best_score"]
+                    best_params = st["best_params"]
+                else:
+                    best_model, cv_mae, best_params, cpu = fut.result()
+                    st["cpu_s"] += cpu
+
+                yield {
+                    "nombre": nombre,
+                    "estrategia": st["estrategia"],
+                    "modelo": best_model,
+                    "cv_mae": cv_mae,
+                    "params": best_params,
+                    "cpu_s": st["cpu_s"],
+                    "wall_s": time.perf_counter() - t_inicio
+                }
+
+
+# ------------------------------------------------------------------
+# Post-etapa opcional: matrices de confusión (terciles)
+# ------------------------------------------------------------------
+def discretize_to_terciles(array_continuo):
+    """
+    Convierte un array de valores continuos en 3 categorías:
+      - 0 (Bajo): valores < percentil 33
+      - 1 (Medio): valores entre percentil 33 y 66
+      - 2 (Alto): valores > percentil 66
+    """
+    p33, p66 = np.percentile(array_continuo, [33, 66])
+    categorias = np.zeros_like(array_continuo, dtype=int)
+    categorias[array_continuo > p33] = 1
+    categorias[array_continuo > p66] = 2
+    return categorias
+
+
+def matriz_confusion(modelo, X_test, y_test):
+    """Matriz de confusión (terciles) y classification_report de un modelo."""
+    # Predicción continua y discretización en categorías (0,1,2)
+    y_true_cat = discretize_to_terciles(y_test.values)
+    y_pred_cat = discretize_to_terciles(modelo.predict(X_test))
+
+    cm = confusion_matrix(y_true_cat, y_pred_cat, labels=[0, 1, 2])
+    cr = classification_report(
+        y_true_cat,
+        y_pred_cat,
+        labels=[0, 1, 2],
+        target_names=["Bajo", "Medio", "Alto"],
+        zero_division=0
+    )
+    return cm, cr
+
+
+def reporte_confusion(saved_models, orden, X_test, y_test, figs_dir=FIGS_DIR,
+                      preview=False):
+    """
+    Imprime el classification_report de cada modelo y guarda su matriz de
+    confusión como PNG (300 dpi) con la etapa de figuras: Agg, en paralelo
+    y solo las que hayan cambiado. No abre ventanas (nada de plt.show()).
+    """
+    from figuras import figuras_confusion, renderizar
+
+    resultados = {nombre: matriz_confusion(saved_models[nombre], X_test, y_test)
+                  for nombre in orden}
+    specs = figuras_confusion({n: cm for n, (cm, _) in resultados.items()}, figs_dir)
+    info = renderizar(specs, preview=preview)
+
+    print(f"  ✓ Matrices de confusión en {figs_dir}: {len(info['renderizadas'])} "
+          f"renderizadas, {len(info['omitidas'])} sin cambios")
+
+    for nombre in orden:
+        print(f"\n--- Classification Report para {nombre} ---\n")
+        print(resultados[nombre][1])
+
+
+# ------------------------------------------------------------------
+# Punto de entrada (etapa3.py / etapa3-2.py)
+# ------------------------------------------------------------------
+def main(argv=None, confusion=False):
+    parser = argparse.ArgumentParser(description="Etapa 3 – entrenamiento de modelos")
+    parser.add_argument("busqueda", nargs="?", choices=ESTRATEGIAS,
+                        help="fuerza la misma estrategia en todos los modelos")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="presupuesto global de procesos (por defecto: nº de CPUs)")
+    parser.add_argument("--confusion", action="store_true", default=confusion,
+                        help="genera las matrices de confusión al terminar")
+    parser.add_argument("--preview", action="store_true",
+                        help="matrices de confusión a baja resolución (figs/preview)")
+    parser.add_argument("--modelos", nargs="+", metavar="NOMBRE",
+                        choices=[cfg["nombre"] for cfg in MODELOS],
+                        help="entrena solo estas familias de config_modelos.MODELOS")
+    parser.add_argument("--filas-split", type=int, default=None, metavar="N",
+                        help="reparte train/test solo entre las N primeras filas de "
+                             "clean_data; las demás van a train (reentrenamiento.py)")
+    args = parser.parse_args(argv)
+    modelos = [cfg for cfg in MODELOS if not args.modelos or cfg["nombre"] in args.modelos]
+
+    warnings.filterwarnings("ignore")
+
+    # Datos + split (80% train, 20% test; mismo test aunque clean_data crezca)
+    X, y = separar_xy(cargar_datos())
+    filas_split = len(X) if args.filas_split is None else min(args.filas_split, len(X))
+    preprocessor = PreprocesadorCacheado(construir_preprocesador(X))
+    preprocesadores = {cfg["nombre"]: PreprocesadorCacheado(cfg["preprocesador"](X))
+                       for cfg in modelos if "preprocesador" in cfg}
+    X_train, X_test, y_train, y_test = particion_test(X, y, RANDOM_STATE, filas_split)
+    cv = KFold(n_splits=CV_FOLDS, shuffle=True, random_state=RANDOM_STATE)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    resultados = []
+    saved_models = {}
+
+    for res in entrenar(modelos, X_train, y_train, preprocessor, cv,
+                        n_workers=args.workers, busqueda=args.busqueda,
+                        preprocesadores=preprocesadores):
+        best_model = res["modelo"]
+        y_pred = best_model.predict(X_test)
+        mae  = mean_absolute_error(y_test, y_pred)
+        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        r2   = best_model.score(X_test, y_test)
+
+        print(f"\n▶ {res['nombre']} ({res['estrategia']}) – listo a los {res['wall_s']:.1f} s")
+        print(f"  Best CV MAE: {res['cv_mae']:.3f}  ({res['cpu_s']:.1f} CPU-s)")
+        print(f"  Params: {res['params']}")
+        print(f"  Test  → MAE {mae:.3f} | RMSE {rmse:.3f} | R² {r2:.3f}")
+
+        resultados.append({
+            "Modelo": res["nombre"],
+            "Búsqueda": res["estrategia"],
+            "CV MAE": res["cv_mae"],
+            "CPU-s": res["cpu_s"],
+            "MAE":  mae,
+            "RMSE": rmse,
+            "R²":   r2
+        })
+        saved_models[res["nombre"]] = best_model
+
+        fname = os.path.join(OUTPUT_DIR, f"{res['nombre']}_best.pkl")
+        joblib.dump(best_model, fname)
+        print(f"  ✓ Saved as {fname}")
+
+        # Artefacto compacto (float32 donde se puede, arrays mapeables + manifiesto)
+        exportar_artefacto(best_model, os.path.join(ARTEFACTOS_DIR, res["nombre"]),
+                           X_train, y_train,
+                           metricas={"busqueda": res["estrategia"], "params": res["params"],
+                                     "cv_mae": res["cv_mae"], "cpu_s": res["cpu_s"],
+                                     "test_mae": mae, "test_rmse": rmse, "test_r2": r2,
+                                     "filas_split": filas_split})
+
+    limpiar_cache()
+
+    print("\n===== TEST Performance Summary =====")
+    resumen = pd.DataFrame(resultados).sort_values("MAE")
+    print(resumen.to_string(index=False))
+
+    if args.confusion:
+        reporte_confusion(saved_models, resumen["Modelo"].tolist(), X_test, y_test,
+                          preview=args.preview)
+
+    return resumen
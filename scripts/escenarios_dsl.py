@@ -0,0 +1,235 @@
+# --------------------  ESCENARIOS DECLARATIVOS Y BARRIDOS  ----------------
+# Un escenario es una lista de operaciones sobre columnas (dict, JSON o
+# YAML) en lugar de una función Python:
+#
+#   [{"op": "shift", "col": "Hours per day", "valor": 10},
+#    {"op": "clip",  "col": "Hours per day", "min": 0, "max": 24}]
+#
+#   set   : col = valor              shift : col = col + valor
+#   clip  : col = clip(col, min, max)  cap : col = min(col, valor)
+#
+# Cada especificación se compila a un Escenario, que aplica las operaciones
+# en sitio sobre arrays de columnas; las features derivadas de una columna
+# tocada (Hours per day -> Hours_cat, limpieza.DERIVADAS) se recalculan
+# después con la misma función que la limpieza. Un barrido es una plantilla cuyos
+# valores "$param" se sustituyen por cada combinación de una rejilla:
+#
+#   {"nombre": "+{incremento} h/día, trabajando={trabajando}",
+#    "ops": [{"op": "shift", "col": "Hours per day", "valor": "$incremento"}, ...],
+#    "rejilla": {"incremento": range(13), "trabajando": ["Yes", "No"]}}
+#
+# simular_barrido evalúa cientos de escenarios con una sola pasada de
+# predicción: sortea los índices bootstrap una vez (los mismos para todos
+# los escenarios), apila una copia de las filas únicas por escenario en una
+# matriz base compartida, aplica cada Escenario en sitio sobre su bloque y
+# llama a predict una única vez (o por lotes de max_filas_lote filas).
+import itertools
+import json
+import numbers
+import os
+
+import numpy as np
+import pandas as pd
+
+from limpieza import con_derivadas
+from simulacion import indices_bootstrap, estadisticas_por_iteracion
+
+OPERACIONES = {"set": ("valor",), "shift": ("valor",),
+               "clip": ("min", "max"), "cap": ("valor",)}
+NUMERICAS = ("shift", "clip", "cap")
+
+
+class Escenario:
+    """
+    Escenario compilado a partir de una lista de operaciones.
+
+    Se puede usar como función de escenario (`esc(df)` devuelve una copia
+    transformada, como las de simulacion.py, también en simular_paralelo)
+    o aplicarse en sitio sobre un dict {columna: array} con `aplicar`.
+    """
+
+    def __init__(self, ops, nombre=None, params=None):
+        self.nombre = nombre
+        self.params = dict(params or {})
+        self.ops = tuple(_compilar_op(op) for op in ops)
+
+    @property
+    def columnas(self):
+        return sorted({col for _, col, _ in self.ops})
+
+    @property
+    def columnas_numericas(self):
+        return sorted({col for op, col, _ in self.ops if op in NUMERICAS})
+
+    def aplicar(self, columnas):
+        """Aplica las operaciones en sitio sobre {columna: array 1-D}."""
+        for op, col, args in self.ops:
+            arr = columnas[col]
+            if op == "set":
+                arr[...] = args[0]
+            elif op == "shift":
+                np.add(arr, args[0], out=arr)
+            elif op == "clip":
+                np.clip(arr, args[0], args[1], out=arr)
+            else:
+                np.minimum(arr, args[0], out=arr)
+
+    def __call__(self, df_in):
+        df_out = df_in.copy()
+        columnas = _extraer_columnas(df_out, self.columnas, self.columnas_numericas)
+        self.aplicar(columnas)
+        for col, arr in con_derivadas(columnas, df_out.columns).items():
+            df_out[col] = arr
+        return df_out
+
+    def __repr__(self):
+        return f"Escenario({self.nombre!r}, {len(self.ops)} ops)"
+
+
+def _compilar_op(op):
+    nombre = op.get("op")
+    if nombre not in OPERACIONES:
+        raise ValueError(f"Operación desconocida {nombre!r}; válidas: {sorted(OPERACIONES)}")
+    if "col" not in op:
+        raise ValueError(f"Falta 'col' en la operación {op}")
+    faltan = [k for k in OPERACIONES[nombre] if k not in op]
+    if faltan:
+        raise ValueError(f"Faltan {faltan} en la operación {op}")
+    args = tuple(op[k] for k in OPERACIONES[nombre])
+    if nombre in NUMERICAS and not all(a is None or (isinstance(a, numbers.Real) and
+                                                     not isinstance(a, (bool, np.bool_)))
+                                       for a in args):
+        raise ValueError(f"'{nombre}' necesita valores numéricos: {op}")
+    return nombre, op["col"], args
+
+
+def _extraer_columnas(df, columnas, numericas):
+    """Copia las columnas a arrays escribibles (float64 si se operan numéricamente)."""
+    faltan = [c for c in columnas if c not in df.columns]
+    if faltan:
+        raise ValueError(f"Columnas inexistentes en el escenario: {faltan}")
+    return {c: (df[c].to_numpy(dtype=float, na_value=np.nan) if c in numericas
+                else df[c].to_numpy(dtype=object, copy=True))
+            for c in columnas}
+
+
+# --------------------  COMPILACIÓN Y BARRIDOS  ---------------------------
+def _sustituir(valor, params):
+    if isinstance(valor, str) and valor.startswith("$"):
+        clave = valor[1:]
+        if clave not in params:
+            raise ValueError(f"Parámetro {valor!r} no está en la rejilla {sorted(params)}")
+        return params[clave]
+    return valor
+
+
+def barrido(spec):
+    """
+    Expande una plantilla {"nombre", "ops", "rejilla"} al producto cartesiano
+    de la rejilla. Devuelve {nombre: Escenario}, con los parámetros de cada
+    combinación en Escenario.params.
+    """
+    claves = list(spec["rejilla"])
+    escenarios = {}
+    for valores in itertools.product(*(list(spec["rejilla"][k]) for k in claves)):
+        params = dict(zip(claves, valores))
+        ops = [{k: _sustituir(v, params) for k, v in op.items()} for op in spec["ops"]]
+        nombre = spec["nombre"].format(**params)
+        escenarios[nombre] = Escenario(ops, nombre=nombre, params=params)
+    return escenarios
+
+
+def compilar_escenarios(specs):
+    """
+    {nombre: lista de ops} y/o {"barridos": [plantilla, ...]} -> {nombre: Escenario}.
+    Los Escenario ya compilados se aceptan tal cual.
+    """
+    escenarios = {}
+    for nombre, ops in specs.items():
+        if nombre == "barridos":
+            for spec in ops:
+                escenarios.update(barrido(spec))
+        elif isinstance(ops, Escenario):
+            escenarios[nombre] = ops
+        else:
+            escenarios[nombre] = Escenario(ops, nombre=nombre)
+    return escenarios
+
+
+def cargar_escenarios(ruta):
+    """Lee especificaciones desde .json o .yaml/.yml y las compila."""
+    with open(ruta, encoding="utf-8") as f:
+        if os.path.splitext(ruta)[1].lower() in (".yaml", ".yml"):
+            import yaml            # dependencia opcional: solo para ficheros YAML
+            specs = yaml.safe_load(f)
+        else:
+            specs = json.load(f)
+    return compilar_escenarios(specs)
+
+
+ESCENARIOS_DSL = compilar_escenarios({
+    "Baseline":            [],
+    "+10 h/día":           [{"op": "shift", "col": "Hours per day", "valor": 10},
+                            {"op": "clip", "col": "Hours per day", "min": 0, "max": 24}],
+    "≤0.5 h/día":          [{"op": "cap", "col": "Hours per day", "valor": 0.5}],
+    "Mientras trabajando": [{"op": "set", "col": "While working", "valor": "Yes"}],
+})
+
+BARRIDO_HORAS_TRABAJO = {
+    "nombre": "+{incremento} h/día | While working={trabajando}",
+    "ops": [{"op": "shift", "col": "Hours per day", "valor": "$incremento"},
+            {"op": "clip", "col": "Hours per day", "min": 0, "max": 24},
+            {"op": "set", "col": "While working", "valor": "$trabajando"}],
+    "rejilla": {"incremento": list(range(13)), "trabajando": ["Yes", "No"]},
+}
+
+
+# --------------------  SIMULACIÓN EN UNA SOLA PASADA  --------------------
+def matriz_escenarios(df_in, escenarios, features, filas):
+    """
+    DataFrame con len(escenarios) bloques de len(filas) filas: cada bloque es
+    la copia de las filas base con su escenario aplicado en sitio. Solo las
+    columnas que tocan los escenarios (y sus derivadas, recalculadas) se
+    materializan como arrays; el resto conserva el dtype original.
+    """
+    base = df_in.iloc[filas][features]
+    n, k = len(base), len(escenarios)
+    tocadas = sorted({c for e in escenarios.values() for c in e.columnas})
+    numericas = sorted({c for e in escenarios.values() for c in e.columnas_numericas})
+    columnas = {c: np.tile(a, k)
+                for c, a in _extraer_columnas(base, tocadas, numericas).items()}
+    for j, esc in enumerate(escenarios.values()):
+        esc.aplicar({c: a[j * n:(j + 1) * n] for c, a in columnas.items()})
+
+    X = base.iloc[np.tile(np.arange(n), k)].reset_index(drop=True)
+    for c, a in con_derivadas(columnas, base.columns).items():
+        X[c] = a
+    return X
+
+
+def simular_barrido(modelo, df_in, escenarios, features, n_iter=500,
+                    batch_size=200, random_state=None, max_filas_lote=None):
+    """
+    Monte Carlo de todos los escenarios ({nombre: Escenario}) con los mismos
+    índices bootstrap y una única pasada de predicción (troceada en lotes de
+    max_filas_lote filas si se indica). Devuelve {nombre: DataFrame de
+    estadísticas por iteración}, como simulacion.simular_vectorizado.
+    """
+    idx = indices_bootstrap(len(df_in), n_iter, batch_size, random_state)
+    filas, inversa = np.unique(idx, return_inverse=True)
+    inversa = inversa.reshape(idx.shape)
+    X = matriz_escenarios(df_in, escenarios, features, filas)
+
+    paso = max_filas_lote or len(X)
+    preds = np.concatenate([modelo.predict(X.iloc[i:i + paso])
+                            for i in range(0, len(X), paso)])
+    preds = preds.reshape(len(escenarios), len(filas))
+    return {nombre: estadisticas_por_iteracion(preds[j][inversa])
+            for j, nombre in enumerate(escenarios)}
+
+
+def resumen_barrido(resultados, escenarios):
+    """Una fila por escenario: sus parámetros y la media de cada estadística."""
+    return pd.DataFrame([{"Escenario": nombre, **escenarios[nombre].params,
+                          **res.mean().to_dict()}
+                         for nombre, res in resultados.items()])
@@ -0,0 +1,161 @@
+# --------------------  ESQUEMA DE FEATURES (compartido)  -----------------
+# Declaración explícita de las columnas que entran a los modelos de
+# etapa3 / etapa3-2 / etapa4 y del preprocesador que las transforma.
+#
+# Antes las columnas se detectaban con select_dtypes, lo que metía
+# 'Timestamp' (≈736 valores únicos) y 'Permissions' (constante) en el
+# OneHotEncoder: ~780 columnas densas, artefactos de 3-4 MB y kernels /
+# distancias lentas. Ahora se declaran por tipo y se excluyen IDs,
+# marcas de tiempo y texto libre.
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from almacen import CSV_PATH, PARQUET_PATH, leer_limpio
+
+TARGET    = "Anxiety"
+
+# Otras escalas de salud mental: no se usan como features del target
+OTRAS_MH  = ["Depression", "Insomnia", "OCD"]
+
+# Derivadas del target en etapa1: MH_avg es la media de Anxiety y OTRAS_MH
+# (r ≈ 0.76 con Anxiety) y MH_level es pd.cut(MH_avg). Tampoco entran.
+DERIVADAS_TARGET = ["MH_avg", "MH_level"]
+
+# Numéricas continuas / discretas -> StandardScaler
+NUM_COLS = ["Age", "Hours per day", "BPM", "submit_hour"]
+
+# Frecuencias Likert ya codificadas 0-4 en etapa1 -> ordinales numéricas
+FREQ_COLS = [
+    "Frequency [Classical]", "Frequency [Country]", "Frequency [EDM]",
+    "Frequency [Folk]", "Frequency [Gospel]", "Frequency [Hip hop]",
+    "Frequency [Jazz]", "Frequency [K pop]", "Frequency [Latin]",
+    "Frequency [Lofi]", "Frequency [Metal]", "Frequency [Pop]",
+    "Frequency [R&B]", "Frequency [Rap]", "Frequency [Rock]",
+    "Frequency [Video game music]"
+]
+
+# Ordinales en texto (orden de menor a mayor) -> OrdinalEncoder + scaler.
+# 'Hours_cat' es NaN cuando Hours per day = 0: se codifica como -1,
+# por debajo de "≤1 h".
+ORD_COLS = {
+    "Hours_cat": ["≤1 h", "1-3 h", "3-6 h", ">6 h"]
+}
+
+# Nominales -> OneHotEncoder
+CAT_COLS = [
+    "Primary streaming service", "While working", "Instrumentalist",
+    "Composer", "Fav genre", "Exploratory", "Foreign languages",
+    "Music effects", "submit_wday"
+]
+
+# Columnas que nunca entran al modelo (ID / timestamp / texto libre /
+# derivadas del target)
+EXCLUIDAS = ["Timestamp", "Permissions"] + DERIVADAS_TARGET
+
+FEATURES = NUM_COLS + FREQ_COLS + list(ORD_COLS) + CAT_COLS
+
+# Proporción de test del split de etapa3
+TEST_SIZE = 0.20
+
+
+def cargar_datos(columnas=FEATURES + [TARGET], csv_path=CSV_PATH, parquet_path=PARQUET_PATH):
+    """
+    Lee clean_data (solo 'columnas'; None = todas) y aplica la
+    winsorización suave de 'Hours per day'.
+    """
+    df = leer_limpio(columnas=columnas, csv_path=csv_path, parquet_path=parquet_path)
+    p1, p99 = np.percentile(df["Hours per day"], [1, 99])
+    df["Hours per day"] = np.clip(df["Hours per day"], p1, p99)
+    return df
+
+
+def separar_xy(df):
+    """Devuelve (X, y) con solo las columnas declaradas en el esquema."""
+    return df[FEATURES], df[TARGET]
+
+
+def indices_test(n_filas, random_state, filas_split=None):
+    """
+    Posiciones del test de etapa3: train_test_split de las primeras
+    filas_split filas de clean_data (todas si es None).
+    """
+    n = n_filas if filas_split is None else min(filas_split, n_filas)
+    return train_test_split(np.arange(n), test_size=TEST_SIZE, random_state=random_state)[1]
+
+
+def particion_test(X, y, random_state, filas_split=None):
+    """
+    (X_train, X_test, y_train, y_test) de etapa3. Solo se reparten las
+    primeras filas_split filas; las añadidas después (lotes de
+    reentrenamiento.py) van siempre a train, así que el test no cambia
+    al crecer clean_data. Con filas_split=None es train_test_split tal cual.
+    """
+    n = len(X) if filas_split is None else min(filas_split, len(X))
+    X_train, X_test, y_train, y_test = train_test_split(
+        X.iloc[:n], y.iloc[:n], test_size=TEST_SIZE, random_state=random_state)
+    return (pd.concat([X_train, X.iloc[n:]]), X_test,
+            pd.concat([y_train, y.iloc[n:]]), y_test)
+
+
+def construir_preprocesador(X):
+    """
+    ColumnTransformer del esquema. Las categorías nominales se extraen de
+    todo X antes del split (como hasta ahora) para que el encoder conozca
+    todos los valores posibles.
+    """
+    all_categories = [X[col].dropna().unique().tolist() for col in CAT_COLS]
+
+    numeric_tr = Pipeline([("scaler", StandardScaler())])
+
+    ordinal_tr = Pipeline([
+        ("ord", OrdinalEncoder(categories=list(ORD_COLS.values()),
+                               handle_unknown="use_encoded_value",
+                               unknown_value=-1,
+                               encoded_missing_value=-1)),
+        ("scaler", StandardScaler())
+    ])
+
+    categorical_tr = Pipeline([
+        ("ohe", OneHotEncoder(categories=all_categories, drop="first",
+                              sparse_output=False))
+    ])
+
+    return ColumnTransformer(
+        [("num", numeric_tr, NUM_COLS + FREQ_COLS),
+         ("ord", ordinal_tr, list(ORD_COLS)),
+         ("cat", categorical_tr, CAT_COLS)],
+        remainder="drop"
+    )
+
+
+# Máscara de columnas categóricas a la salida de construir_preprocesador_arboles
+# (num + freq, ord, cat), para HistGradientBoosting(categorical_features=...)
+CATEGORICAS_ARBOLES = ([False] * (len(NUM_COLS) + len(FREQ_COLS) + len(ORD_COLS)) +
+                       [True] * len(CAT_COLS))
+
+
+def construir_preprocesador_arboles(X):
+    """
+    Variante para modelos de árboles con soporte categórico nativo: las
+    numéricas pasan sin escalar, las ordinales se codifican en su orden y
+    las nominales como códigos enteros (sin one-hot). Faltantes y
+    categorías desconocidas quedan como NaN, que el modelo trata de forma
+    nativa.
+    """
+    all_categories = [X[col].dropna().unique().tolist() for col in CAT_COLS]
+    return ColumnTransformer(
+        [("num", "passthrough", NUM_COLS + FREQ_COLS),
+         ("ord", OrdinalEncoder(categories=list(ORD_COLS.values()),
+                                handle_unknown="use_encoded_value",
+                                unknown_value=np.nan,
+                                encoded_missing_value=np.nan), list(ORD_COLS)),
+         ("cat", OrdinalEncoder(categories=all_categories,
+                                handle_unknown="use_encoded_value",
+                                unknown_value=np.nan,
+                                encoded_missing_value=np.nan), CAT_COLS)],
+        remainder="drop"
+    )
@@ -5,12 +5,18 @@
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import joblib
+
+from limpieza import LimpiezaEncuesta, MH_COLS
+from almacen import guardar_limpio
+from correlaciones import analisis_correlaciones, parejas_significativas
+from figuras import figuras_etapa1, renderizar
 
 # ----------- 0) Carpeta para las figuras ---------------------#
 PLOT_FOLDER = "../figs/figs_etapa1"
 os.makedirs(PLOT_FOLDER, exist_ok=True)
+LIMPIEZA_PATH = "../modelos/limpieza_etapa1.pkl"
+PREVIEW_FIGS  = False      # True: figuras a baja resolución en figs/preview/
 
 # 1) CARGA DEL DATASET
 df = pd.read_csv("../data/data.csv")            # ajusta la ruta si es necesaria
@@ -36,112 +42,49 @@ Permissions             : Permiso para publicar sus datos
 '''
 
 # -------------------------------------------------------------
-# 3) LIMPIEZA DE DATOS
+# 3) LIMPIEZA DE DATOS  +  4) FEATURE ENGINEERING
 # -------------------------------------------------------------
-df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
-df["Age"]       = pd.to_numeric(df["Age"], errors="coerce")
-df["Age"].fillna(df["Age"].median(), inplace=True)
-
-# --- BPM imputación medianas por género ---
-genre_bpm_median  = df.groupby("Fav genre")["BPM"].median()
-global_bpm_median = df["BPM"].median()
-
-def fill_bpm(row):
-    if np.isnan(row["BPM"]):
-        genre_val = genre_bpm_median.get(row["Fav genre"], np.nan)
-        return genre_val if not np.isnan(genre_val) else global_bpm_median
-    return row["BPM"]
-
-df["BPM"] = df.apply(fill_bpm, axis=1)
-
-# --- Categóricos con la moda ---
-cat_cols = ["Primary streaming service", "While working",
-            "Instrumentalist", "Composer", "Foreign languages",
-            "Music effects"]
-for c in cat_cols:
-    df[c].fillna(df[c].mode()[0], inplace=True)
+# Transformador ajustado (limpieza.py): imputación de Age/BPM (medianas
+# por género con fallback global) y modas, limpieza de strings,
+# winsorización suave, Hours_cat / MH_avg / MH_level y Likert 0-4.
+# Se guarda para poder limpiar nuevos lotes con las mismas estadísticas.
+limpieza = LimpiezaEncuesta().fit(df)
+df = limpieza.transform(df)
 
-# --- Limpieza de strings ---
-df["Fav genre"]                = df["Fav genre"].str.strip().str.title()
-df["Primary streaming service"] = df["Primary streaming service"].str.strip().str.title()
+bpm_p1, bpm_p99 = limpieza.limites_["BPM"]
+print(f"Rango BPM retenido: {bpm_p1:.1f} – {bpm_p99:.1f}")
 
-# --- Winsorización suave ---
-p1,  p99  = np.percentile(df["Age"], [1, 99])
-df["Age"] = np.clip(df["Age"], p1, p99)
+os.makedirs(os.path.dirname(LIMPIEZA_PATH), exist_ok=True)
+joblib.dump(limpieza, LIMPIEZA_PATH)
 
-p1,  p99  = np.percentile(df["Hours per day"], [1, 99])
-df["Hours per day"] = np.clip(df["Hours per day"], p1, p99)
-print(f"Rango BPM retenido: {p1:.1f} – {p99:.1f}")
-
-bpm_p1, bpm_p99 = np.percentile(df["BPM"], [1, 99])
-df["BPM"] = np.clip(df["BPM"], bpm_p1, bpm_p99)
-
-# -------------------------------------------------------------
-# 4) FEATURE ENGINEERING
-# -------------------------------------------------------------
-df["submit_wday"] = df["Timestamp"].dt.day_name()
-df["submit_hour"] = df["Timestamp"].dt.hour
-
-df["Hours_cat"] = pd.cut(df["Hours per day"],
-                         bins=[0, 1, 3, 6, 12],
-                         labels=["≤1 h", "1-3 h", "3-6 h", ">6 h"])
-
-mh_cols = ["Anxiety", "Depression", "Insomnia", "OCD"]
-df["MH_avg"]   = df[mh_cols].mean(axis=1)
-df["MH_level"] = pd.cut(df["MH_avg"], bins=[-0.1, 3, 6, 10],
-                        labels=["Baja", "Moderada", "Alta"])
-
-likert = {"Never":0, "Rarely":1, "Sometimes":2,
-          "Often":3, "Very frequently":4}
+mh_cols   = MH_COLS
 freq_cols = [c for c in df.columns if c.startswith("Frequency")]
-df[freq_cols] = df[freq_cols].replace(likert)
 
 # -------------------------------------------------------------
 # 5) EXPLORACIÓN VISUAL (se guardan en figs_etapa1/)
 # -------------------------------------------------------------
-sns.set_theme(style="whitegrid")
-
-# A) Distribución del género favorito
-plt.figure(figsize=(10,5))
-sns.countplot(y="Fav genre", data=df,
-              order=df["Fav genre"].value_counts().index)
-plt.title("Distribución de Género Favorito")
-plt.xlabel("Recuentos"); plt.ylabel("Género")
-plt.tight_layout()
-plt.savefig(f"{PLOT_FOLDER}/fav_genre_dist.png")
-plt.close()
-
-# B) Horas de música vs score medio de salud mental
-plt.figure(figsize=(8,5))
-sns.boxplot(x="Hours_cat", y="MH_avg", data=df, palette="pastel")
-plt.title("Horas de Música/día vs Salud Mental (promedio)")
-plt.xlabel("Categoría de horas"); plt.ylabel("Score medio (0-10)")
-plt.tight_layout()
-plt.savefig(f"{PLOT_FOLDER}/hours_vs_mh_avg.png")
-plt.close()
-
-# C) BPM vs Ansiedad
-plt.figure(figsize=(6,5))
-sns.regplot(x="BPM", y="Anxiety", data=df, scatter_kws={"alpha":0.4})
-plt.title("Relación BPM – Ansiedad")
-plt.tight_layout()
-plt.savefig(f"{PLOT_FOLDER}/bpm_vs_anxiety.png")
-plt.close()
-
-# D) Matriz de correlación numéricas
+# A) Distribución del género favorito, B) horas de música vs score medio
+# de salud mental, C) BPM vs ansiedad y D) matriz de correlación de las
+# numéricas. Se declaran como especificaciones y las dibuja la etapa de
+# figuras (figuras.py): en paralelo, con Agg y solo si han cambiado.
 num_cols = ["Age", "Hours per day", "BPM"] + mh_cols + freq_cols
-corr = df[num_cols].corr()
-plt.figure(figsize=(12,9))
-sns.heatmap(corr, cmap="coolwarm", center=0, annot=False)
-plt.title("Matriz de Correlación (numéricas)")
-plt.tight_layout()
-plt.savefig(f"{PLOT_FOLDER}/corr_matrix.png")
-plt.close()
+matrices_corr, tabla_corr = analisis_correlaciones(df[num_cols], alfa=0.05)   # + p-valores y FDR
+info_figs = renderizar(figuras_etapa1(df, matrices_corr["pearson"], PLOT_FOLDER),
+                       preview=PREVIEW_FIGS)
+
+# Parejas significativas tras Benjamini-Hochberg (formato largo, junto a la figura)
+sig_corr = parejas_significativas(tabla_corr)
+sig_corr.to_csv(f"{PLOT_FOLDER}/corr_parejas_significativas.csv", index=False)
+n_parejas = len(num_cols) * (len(num_cols) - 1) // 2
+for metodo, k in sig_corr["Método"].value_counts(sort=False).items():
+    print(f"Correlaciones {metodo}: {k}/{n_parejas} parejas significativas (FDR 5 %)")
 
-print("✔ Figuras guardadas en la carpeta 'figs_etapa1/'")
+print(f"✔ Figuras en la carpeta 'figs_etapa1/' ({len(info_figs['renderizadas'])} renderizadas, "
+      f"{len(info_figs['omitidas'])} sin cambios)")
 
 # -------------------------------------------------------------
 # 6) EXPORTAR DATASET LIMPIO
 # -------------------------------------------------------------
-df.to_csv("../data/clean_data.csv", index=False)
-print("✔ Dataset limpio guardado como clean_data.csv")
+# CSV (texto) + Parquet tipado, que es el que leen las etapas siguientes
+guardar_limpio(df)
+print("✔ Dataset limpio guardado como clean_data.csv y clean_data.parquet")
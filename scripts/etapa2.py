@@ -1,46 +1,41 @@
 # =============================================================================
 # ETAPA 2 – ANÁLISIS ESTADÍSTICO (Hours per day & Anxiety)
-# Dataset  : clean_data.csv
+# Dataset  : clean_data.parquet (o clean_data.csv si no hay Parquet)
 # Requisitos: pandas, numpy, scipy, matplotlib, seaborn, statsmodels
 # =============================================================================
 import os, warnings
 import numpy as np
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 from scipy import stats
 import statsmodels.api as sm
 
+from almacen import leer_limpio
+from figuras import figuras_etapa2, renderizar
+from bootstrap import intervalos_bootstrap
+from permutacion import COLUMNAS_CORR, test_permutacion
+
 warnings.filterwarnings("ignore")
-plt.rcParams["figure.dpi"] = 120
-sns.set_theme(style="whitegrid")
 
 # 1. Parámetros generales ------------------------------------------------------
-PLOT_FOLDER = "../figs/figs_etapa2"
+PLOT_FOLDER  = "../figs/figs_etapa2"
+PREVIEW_FIGS = False       # True: figuras a baja resolución en figs/preview/
+N_BOOT       = 10_000      # remuestreos para los IC bootstrap (sección 9)
+N_PERM       = 10_000      # máximo de permutaciones por pareja (secciones 7 y 10)
 os.makedirs(PLOT_FOLDER, exist_ok=True)
-DATA_PATH   = "../data/clean_data.csv"      # ajustar ruta si fuera necesario
 
 # 2. Carga y selección de variables -------------------------------------------
-df   = pd.read_csv(DATA_PATH)
 cols = ["Hours per day", "Anxiety"]
-data = df[cols].dropna().copy()
+data = leer_limpio(columnas=cols).dropna().copy()   # solo se leen estas columnas
 
 # 3. Estadísticos descriptivos -------------------------------------------------
 desc = data.agg(["count", "mean", "var", "std", "skew", "kurtosis"]).T.round(3)
 print("\n=== Descriptivos ===")
 print(desc, "\n")
 
-# 4. Histogramas + KDE ---------------------------------------------------------
-for col in cols:
-    plt.figure(figsize=(6,4))
-    sns.histplot(data[col], kde=True, bins="auto", stat="density")
-    plt.axvline(desc.loc[col, "mean"], ls="--", lw=1,
-                label=f"Media = {desc.loc[col,'mean']:.2f}")
-    plt.title(f"Histograma + KDE – {col}")
-    plt.xlabel(col); plt.ylabel("Densidad")
-    plt.legend(); plt.tight_layout()
-    plt.savefig(f"{PLOT_FOLDER}/hist_{col.replace(' ', '_')}.png")
-    plt.close()
+# 4. Figuras: histogramas + KDE, boxplots y scatter con recta OLS --------------
+# Se declaran como especificaciones y las dibuja la etapa de figuras
+# (figuras.py): en paralelo, con Agg y solo las que hayan cambiado.
+info_figs = renderizar(figuras_etapa2(data, cols, PLOT_FOLDER), preview=PREVIEW_FIGS)
 
 # 5. Pruebas de normalidad -----------------------------------------------------
 print("=== Normalidad ===")
@@ -65,14 +60,6 @@ for col in cols:
     out_idx = data.loc[(data[col] < lower) | (data[col] > upper)].index
     print(f"{col}: {len(out_idx)} atípicos -> idx {list(out_idx)}")
 
-    # Boxplot
-    plt.figure(figsize=(4,4))
-    sns.boxplot(y=data[col])
-    plt.title(f"Boxplot – {col}")
-    plt.tight_layout()
-    plt.savefig(f"{PLOT_FOLDER}/box_{col.replace(' ', '_')}.png")
-    plt.close()
-
 # 7. Correlaciones -------------------------------------------------------------
 pear_r, pear_p = stats.pearsonr(data["Hours per day"], data["Anxiety"])
 spear_r, spear_p = stats.spearmanr(data["Hours per day"], data["Anxiety"])
@@ -80,6 +67,13 @@ print("\n=== Correlaciones ===")
 print(f"Pearson  r = {pear_r:.3f}  (p = {pear_p:.4f})")
 print(f"Spearman ρ = {spear_r:.3f}  (p = {spear_p:.4f})")
 
+# p-valores de permutación (sin suponer normalidad; parada temprana)
+for metodo, nombre in [("pearson", "Pearson "), ("spearman", "Spearman")]:
+    t = test_permutacion(data[cols], metodo, n_perm=N_PERM, random_state=42).iloc[0]
+    print(f"{nombre} p permutación = {t['p permutación']:.4f}  "
+          f"(IC 99 % [{t['IC p inf']:.4f}, {t['IC p sup']:.4f}], "
+          f"{t['Permutaciones']} permutaciones)")
+
 # 8. Regresión lineal simple ---------------------------------------------------
 X = sm.add_constant(data["Hours per day"])
 y = data["Anxiety"]
@@ -87,12 +81,22 @@ model = sm.OLS(y, X).fit()
 print("\n=== Regresión lineal: Anxiety ~ Hours per day ===")
 print(model.summary().tables[1])   # tabla de coeficientes
 
-# Guardar scatter con recta de regresión
-plt.figure(figsize=(6,5))
-sns.regplot(x="Hours per day", y="Anxiety", data=data, scatter_kws={"alpha":0.45})
-plt.title("Anxiety vs Hours per day\n(regresión OLS)")
-plt.tight_layout()
-plt.savefig(f"{PLOT_FOLDER}/scatter_hours_anxiety.png")
-plt.close()
+# 9. Intervalos de confianza bootstrap -----------------------------------------
+# Remuestreos vectorizados por lotes (bootstrap.py); IC BCa al 95 %.
+ic, _ = intervalos_bootstrap(data["Hours per day"], data["Anxiety"], n_boot=N_BOOT,
+                             metodo="bca", random_state=42)
+print(f"\n=== IC bootstrap BCa 95 % ({N_BOOT} remuestreos) ===")
+print(ic.round(3))
+
+# 10. Tests de permutación para todas las parejas de etapa1 ---------------------
+# Todas las parejas de la matriz de correlación de etapa1 a la vez
+# (permutacion.py); cada pareja para en cuanto su p-valor queda claro.
+print("\n=== Tests de permutación: matriz de correlación de etapa1 ===")
+datos_corr = leer_limpio(columnas=COLUMNAS_CORR)
+for metodo in ["pearson", "spearman"]:
+    perm = test_permutacion(datos_corr, metodo, n_perm=N_PERM, random_state=42)
+    print(f"{metodo:8s}: {perm['Significativo'].sum()}/{len(perm)} parejas con p < {alpha}  |  "
+          f"{perm['Permutaciones'].sum():,} permutaciones de {len(perm) * N_PERM:,} posibles")
 
-print("\nProceso completado. Figuras en 'figs_etapa2/'.")
+print(f"\nProceso completado. Figuras en 'figs_etapa2/' "
+      f"({len(info_figs['renderizadas'])} renderizadas, {len(info_figs['omitidas'])} sin cambios).")
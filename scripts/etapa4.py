@@ -6,138 +6,165 @@ import pandas as pd
 from sklearn.svm import SVR
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.inspection import permutation_importance
+
+from esquema import FEATURES, cargar_datos, separar_xy
+from escenarios_dsl import (ESCENARIOS_DSL, BARRIDO_HORAS_TRABAJO, barrido,
+                            simular_barrido, resumen_barrido)
+from cache_predicciones import CachePredicciones
+from artefacto import cargar_artefacto
+from simulacion_paralela import simular_paralelo
+from simulacion_adaptativa import simular_adaptativo
+from importancia import datos_test, importancia_permutacion
+from dependencia_parcial import dependencia_parcial, dependencia_2d
 
 RANDOM_STATE = 42
-DATA_PATH     = "../data/clean_data.csv"              
-MODEL_PATH    = "../modelos/SVR_best.pkl"                
-TARGET        = "Anxiety"                     # variable crítica elegida en Etapa 2
+MODELO        = "SVR"                         # o "SVR_nystroem" (SVR aproximado, más rápido)
+ARTEFACTO_PATH = f"../modelos/artefactos/{MODELO}"           # formato compacto (artefacto.py)
+MODEL_PATH    = f"../modelos/{MODELO}_best.pkl"
 ID_COLS       = []                            # lista de columnas-ID que no entran al modelo
+CACHE_PATH    = f"../modelos/cache/{MODELO}_best_preds.npz"  # None = cache solo en memoria
+N_WORKERS     = 1                             # >1: escenarios y shards en un pool de procesos
+BARRIDO       = True                          # barrido horas × While working (una pasada)
+N_REP_IMPORTANCIA = 30                        # permutaciones por feature (0 = sin importancias)
+PASO_HORAS    = 0.5                           # PD/ICE de Hours per day cada media hora…
+RANGO_HORAS   = (0.01, 0.99)                  # …entre los cuantiles observados (sin extrapolar)
+MC_ADAPTATIVO = True                          # CRN + parada por ancho de IC (en serie)
+ANCHO_IC      = 0.01                          # ancho del IC 95 % de cada diferencia vs Baseline
+ESTRATOS      = "Fav genre"                   # o "Hours_cat", o None (muestreo simple)
+ANTITETICO    = True                          # parejas u / 1 − u ordenadas por Anxiety
 
 # --------------------  CARGA DE DATOS Y PREPARACIÓN  ---------------
-df = pd.read_csv(DATA_PATH)
-
-# Soft Winsorization of 'Hours per day' (same as first code)
-p1, p99 = np.percentile(df["Hours per day"], [1, 99])
-df["Hours per day"] = np.clip(df["Hours per day"], p1, p99)
-
-# Define columns to remove from features (same as first code)
-cols_to_drop = [TARGET, 'Insomnia', 'Depression', 'OCD']
-cols_to_drop = [col for col in cols_to_drop if col in df.columns]
-
-X = df.drop(columns=cols_to_drop)
-y = df[TARGET]
-
-# Identify numerical and categorical columns
-num_cols = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
-cat_cols = X.select_dtypes(include=["object", "bool"]).columns.tolist()
-
-# Extract all possible categories from the entire dataset BEFORE the split
-all_categories = [X[col].unique().tolist() for col in cat_cols]
-
-# Pipeline for numerical features: standardize data
-numeric_tr = Pipeline([("scaler", StandardScaler())])
-
-# Pipeline for categorical features: one-hot encode data
-categorical_tr = Pipeline(
-    [("ohe", OneHotEncoder(categories=all_categories, drop="first", sparse_output=False))]
-)
-
-# Create a preprocessor to apply different transformations to different column types
-preprocessor = ColumnTransformer(
-    [("num", numeric_tr, num_cols),
-     ("cat", categorical_tr, cat_cols)],
-    remainder="passthrough"
-)
+# Misma carga, winsorización y esquema de features que en Etapa 3
+df = cargar_datos()
+X, y = separar_xy(df)
 
 # --------------------  CARGA O ENTRENAMIENTO DEL MODELO SVR  -------
-if os.path.exists(MODEL_PATH):
+if os.path.isdir(ARTEFACTO_PATH):
+    svr_pipeline = cargar_artefacto(ARTEFACTO_PATH)
+    print(f"✅  Modelo {MODELO} cargado desde {ARTEFACTO_PATH} (arrays mapeados en memoria)")
+elif os.path.exists(MODEL_PATH):
     svr_pipeline = joblib.load(MODEL_PATH)
-    print(f"✅  Modelo SVR cargado desde {MODEL_PATH}")
+    print(f"✅  Modelo {MODELO} cargado desde {MODEL_PATH}")
 else:
     print("⚠️  Modelo pre-entrenado no encontrado. Entrenando uno rápido con los hiperparámetros de Etapa 3…")
-    
-
-# --------------------  DEFINICIÓN DE ESCENARIOS  -------------------
-def escenario_baseline(df_in):
-    """Sin cambios: reproduce la distribución original"""
-    return df_in.copy()
-
-def escenario_mas_musica(df_in, incremento=10):
-    """+10 h de música al día (cap a 24 h)"""
-    df_out = df_in.copy()
-    df_out["Hours per day"] = np.clip(df_out["Hours per day"] + incremento, 0, 24)
-    return df_out
-
-def escenario_menos_musica(df_in, limite=0.5):
-    """Limita la escucha a ≤ media hora por día"""
-    df_out = df_in.copy()
-    df_out["Hours per day"] = np.minimum(df_out["Hours per day"], limite)
-    return df_out
-
-def escenario_while_working(df_in):
-    """Establece 'While working' siempre como True"""
-    df_out = df_in.copy()
-    df_out["While working"] = "Yes"
-    return df_out
-
-
-ESCENARIOS = {
-    "Baseline":           escenario_baseline,
-    "+10 h/día":          escenario_mas_musica,
-    "≤0.5 h/día":         escenario_menos_musica,
-    "Mientras trabajando": escenario_while_working
-}
+
+# Cache de predicciones delante del pipeline: los escenarios solo tocan una
+# o dos columnas, así que muchas filas se repiten entre escenarios y runs.
+svr_pipeline = CachePredicciones(svr_pipeline, ruta=CACHE_PATH)
+
+
+# --------------------  IMPORTANCIA DE VARIABLES  -------------------
+# ΔMAE de test al permutar cada feature (importancia.py: sobre la matriz
+# preprocesada, one-hot agrupado en su feature, predicts apilados). Todos
+# los *_best.pkl a la vez: python importancia.py
+if N_REP_IMPORTANCIA and os.path.exists(MODEL_PATH):
+    X_test, y_test = datos_test([MODELO])
+    importancias, _ = importancia_permutacion({MODELO: MODEL_PATH}, X_test, y_test,
+                                              n_repeticiones=N_REP_IMPORTANCIA,
+                                              n_workers=N_WORKERS)
+    print(f"\n===== Importancia por permutación ({MODELO}, ΔMAE con IC 95 %) =====")
+    print(importancias.head(10).drop(columns=["Modelo", "MAE base"]).round(4).to_string(index=False))
+
+
+# --------------------  DEPENDENCIA PARCIAL / ICE  ------------------
+# Curva dosis-respuesta completa de Hours per day (y BPM) en vez de los
+# tres puntos de los escenarios: todas las filas × toda la rejilla en un
+# predict por lote (dependencia_parcial.py), sin pasar por el cache.
+# Hours_cat se recalcula en cada punto; la rejilla no sale del rango
+# observado (winsorizado) de Hours per day.
+h_min, h_max = np.quantile(df["Hours per day"], RANGO_HORAS)
+REJILLA_HORAS = np.arange(np.ceil(h_min / PASO_HORAS), np.floor(h_max / PASO_HORAS) + 1) * PASO_HORAS
+pd_horas, ice_horas = dependencia_parcial(svr_pipeline.modelo, df, "Hours per day",
+                                          valores=REJILLA_HORAS)
+print(f"\n===== Dependencia parcial – Hours per day ({MODELO}, "
+      f"{ice_horas.shape[0]} filas × {ice_horas.shape[1]} valores) =====")
+print(pd_horas[pd_horas["Hours per day"] % 2 == 0].round(3).to_string(index=False))
+pico = pd_horas.loc[pd_horas["PD"].idxmax()]
+print(f"Máximo de la PD en {pico['Hours per day']:.1f} h/día ({pico['PD']:.3f}); "
+      f"rango de la PD: {np.ptp(pd_horas['PD']):.3f}")
+
+pd_bpm, _ = dependencia_parcial(svr_pipeline.modelo, df, "BPM", n_puntos=10)
+print(f"\n===== Dependencia parcial – BPM ({MODELO}) =====")
+print(pd_bpm.round(3).to_string(index=False))
+
+superficie = dependencia_2d(svr_pipeline.modelo, df, "Hours per day", "BPM",
+                            valores_1=REJILLA_HORAS[::8], n_puntos=6)
+print(f"\n===== Superficie PD – Hours per day × BPM ({MODELO}) =====")
+print(superficie.round(3).rename(columns=lambda b: f"{b:.0f}").to_string())
+
 
 # --------------------  FUNCIÓN DE SIMULACIÓN  ----------------------
-def simular(scenario_fn, n_iter=500, batch_size=200):
+def simular(escenarios, n_iter=500, batch_size=200, random_state=RANDOM_STATE):
     """
-    Ejecuta Monte Carlo:
+    Ejecuta Monte Carlo para varios escenarios a la vez ({nombre: Escenario},
+    ver escenarios_dsl.py):
        – n_iter repeticiones
        – en cada una, toma 'batch_size' filas aleatorias (con reemplazo),
          aplica la transformación del escenario y predice Ansiedad.
-    Devuelve un DataFrame con estadísticas por iteración.
+    Las muestras se sortean una vez (las mismas para todos los escenarios) y
+    todas las filas de todos los escenarios se predicen en una sola pasada.
+    Devuelve {nombre: DataFrame con estadísticas por iteración}.
     """
-    stats = []
-    for _ in range(n_iter):
-        # Sample from the original dataframe
-        sample = df.sample(batch_size, replace=True, random_state=None)
-        
-        # Apply scenario transformation
-        sample_transformed = scenario_fn(sample)
-        
-        # Prepare features (drop target and other columns as in first code)
-        X_sim = sample_transformed.drop(columns=cols_to_drop)
-        
-        # Predict using the pipeline (which includes preprocessing)
-        preds = svr_pipeline.predict(X_sim)
-        
-        stats.append({
-            "mean": np.mean(preds),
-            "median": np.median(preds),
-            "p95": np.percentile(preds, 95),
-            "p05": np.percentile(preds, 5),
-            "std": np.std(preds)
-        })
-    return pd.DataFrame(stats)
+    return simular_barrido(svr_pipeline, df, escenarios, FEATURES,
+                           n_iter=n_iter, batch_size=batch_size,
+                           random_state=random_state)
 
 # --------------------  EJECUCIÓN DE LAS SIMULACIONES  --------------
-resultados = {}
-for nombre, fn in ESCENARIOS.items():
-    print(f"⏳  Simulando escenario: {nombre}")
-    resultados[nombre] = simular(fn)
+if N_WORKERS > 1:
+    # Cada worker carga el modelo una vez (artefacto mapeado si existe);
+    # semillas por shard: mismo resultado con cualquier nº de workers.
+    print(f"⏳  Simulando {len(ESCENARIOS_DSL)} escenarios en {N_WORKERS} procesos")
+    ruta = ARTEFACTO_PATH if os.path.isdir(ARTEFACTO_PATH) else MODEL_PATH
+    resultados, info = simular_paralelo(ruta, ESCENARIOS_DSL, df, n_workers=N_WORKERS,
+                                        random_state=RANDOM_STATE)
+    print(f"⚡  {info['muestras_por_s']:,.0f} muestras/s, {info['filas_modelo']:,} filas "
+          f"predichas ({info['shards']} shards, {info['segundos']:.1f} s)")
+elif MC_ADAPTATIVO:
+    # Mismas muestras para todos los escenarios; se para cuando el IC de
+    # cada diferencia con el Baseline mide ≤ ANCHO_IC.
+    print(f"⏳  Simulando escenarios (adaptativo, IC ≤ {ANCHO_IC}): {', '.join(ESCENARIOS_DSL)}")
+    resultados, diferencias, info = simular_adaptativo(
+        svr_pipeline, df, ESCENARIOS_DSL, FEATURES, ancho_objetivo=ANCHO_IC,
+        estratos=ESTRATOS, antitetico=ANTITETICO, random_state=RANDOM_STATE)
+    estado = "alcanzado" if info["convergido"] else "NO alcanzado"
+    print(f"⚡  {info['iteraciones']} iteraciones, ancho máximo {info['ancho_max']:.4f} "
+          f"({estado}), {info['filas_predichas']:,} filas predichas, {info['segundos']:.1f} s")
+    print("\n===== Diferencia con el Baseline (IC 95 %) =====")
+    print(diferencias.round(4).to_string(index=False))
+
+    svr_pipeline.guardar()
+    cache_stats = svr_pipeline.estadisticas()
+    print(f"🗄️  Cache de predicciones: {cache_stats['hits']} hits / "
+          f"{cache_stats['misses']} misses (hit rate {cache_stats['hit_rate']:.1%})")
+else:
+    print(f"⏳  Simulando escenarios: {', '.join(ESCENARIOS_DSL)}")
+    resultados = simular(ESCENARIOS_DSL)
+
+    svr_pipeline.guardar()
+    cache_stats = svr_pipeline.estadisticas()
+    print(f"🗄️  Cache de predicciones: {cache_stats['hits']} hits / "
+          f"{cache_stats['misses']} misses (hit rate {cache_stats['hit_rate']:.1%})")
+
+# --------------------  BARRIDO DE PARÁMETROS  ----------------------
+# Incremento de horas/día 0..12 × While working Yes/No: 26 escenarios
+# declarativos evaluados con una sola pasada de predicción.
+if BARRIDO:
+    escenarios_barrido = barrido(BARRIDO_HORAS_TRABAJO)
+    print(f"⏳  Barrido: {len(escenarios_barrido)} escenarios en una pasada")
+    resumen = resumen_barrido(simular(escenarios_barrido), escenarios_barrido)
+    svr_pipeline.guardar()
+    print("\n===== Ansiedad media predicha: +h/día × While working =====")
+    print(resumen.pivot(index="incremento", columns="trabajando", values="mean").round(3))
 
 # --------------------  VISUALIZACIÓN DE RESULTADOS  ----------------
 summary = pd.DataFrame({
     esc: res.mean() for esc, res in resultados.items()
 }).T[["mean", "median", "p05", "p95", "std"]]
 
-print("\n===== Resumen de simulaciones (promedio de 500 iteraciones) =====")
+n_iter = len(next(iter(resultados.values())))
+print(f"\n===== Resumen de simulaciones (promedio de {n_iter} iteraciones) =====")
 print(summary.round(3))
 
 # Asegura que el índice sea columna para Seaborn
@@ -0,0 +1,304 @@
+# --------------------  ETAPA DE FIGURAS (etapa1 / etapa2 / etapa3-2)  -----
+# Las etapas ya no dibujan en serie con pyplot: declaran cada figura como
+# una especificación
+#     {"ruta", "dibujo", "datos", "params", "figsize", "dpi", "estilo"}
+# ('dibujo' es una función de este módulo que pinta sobre un Axes, 'datos'
+# solo las columnas que usa) y renderizar() las genera:
+#   – sobre matplotlib.figure.Figure con el canvas Agg (sin pyplot: nada
+#     de plt.show() bloqueando, ni estado global compartido);
+#   – en un ProcessPoolExecutor cuando hay varias pendientes y más de un
+#     worker;
+#   – de forma incremental: el hash de cada figura cubre sus datos, sus
+#     parámetros y el código de su función de dibujo, y se guarda en
+#     MANIFIESTO; si coincide y el PNG existe, no se vuelve a dibujar;
+#   – modo preview: dpi bajo (DPI_PREVIEW) y sin las bandas de confianza
+#     bootstrap de regplot (PARAMS_PREVIEW), con salida en DIR_PREVIEW sin
+#     tocar las figuras definitivas. Casi todo el coste es maquetar texto,
+#     así que el preview ahorra menos que la omisión por hash.
+#
+# Los constructores figuras_etapa1/figuras_etapa2/figuras_confusion
+# generan las especificaciones de cada etapa; desde la línea de comandos
+# se recogen todas (a partir de clean_data y de los *_best.pkl) y se
+# regeneran las que hayan cambiado:
+#
+#   python figuras.py [--preview] [--forzar] [--workers N] [--etapas etapa1 ...]
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+FIGS_DIR     = "../figs"
+DIR_PREVIEW  = "../figs/preview"
+MANIFIESTO   = "../.cache_etapas/figuras.json"
+DPI_PREVIEW  = 40
+# Parámetros que el modo preview sustituye, por función de dibujo
+PARAMS_PREVIEW = {"regresion": {"ci": None}}
+
+
+# ------------------------------------------------------------------
+# Funciones de dibujo (nivel de módulo: viajan a los workers por nombre)
+# ------------------------------------------------------------------
+def barras_conteo(ax, datos, y, titulo, xlabel, ylabel):
+    import seaborn as sns
+    sns.countplot(y=y, data=datos, order=datos[y].value_counts().index, ax=ax)
+    ax.set_title(titulo)
+    ax.set_xlabel(xlabel); ax.set_ylabel(ylabel)
+
+
+def cajas(ax, datos, y, titulo, x=None, xlabel=None, ylabel=None, palette=None):
+    import seaborn as sns
+    sns.boxplot(x=x, y=y, data=datos, palette=palette, ax=ax)
+    ax.set_title(titulo)
+    if xlabel is not None:
+        ax.set_xlabel(xlabel)
+    if ylabel is not None:
+        ax.set_ylabel(ylabel)
+
+
+def regresion(ax, datos, x, y, titulo, alpha, ci=95):
+    import seaborn as sns
+    sns.regplot(x=x, y=y, data=datos, scatter_kws={"alpha": alpha}, ci=ci, ax=ax)
+    ax.set_title(titulo)
+
+
+def histograma_kde(ax, datos, columna, titulo):
+    import seaborn as sns
+    media = datos[columna].mean()
+    sns.histplot(datos[columna], kde=True, bins="auto", stat="density", ax=ax)
+    ax.axvline(media, ls="--", lw=1, label=f"Media = {media:.2f}")
+    ax.set_title(titulo)
+    ax.set_xlabel(columna); ax.set_ylabel("Densidad")
+    ax.legend()
+
+
+def mapa_calor(ax, datos, titulo, xlabel=None, ylabel=None, **kwargs):
+    import seaborn as sns
+    sns.heatmap(datos, ax=ax, **kwargs)
+    ax.set_title(titulo)
+    if xlabel is not None:
+        ax.set_xlabel(xlabel)
+    if ylabel is not None:
+        ax.set_ylabel(ylabel)
+
+
+# ------------------------------------------------------------------
+# Especificaciones de cada etapa
+# ------------------------------------------------------------------
+def figura(ruta, dibujo, datos, figsize, dpi=100, estilo="whitegrid", **params):
+    return {"ruta": ruta, "dibujo": dibujo, "datos": datos, "params": params,
+            "figsize": figsize, "dpi": dpi, "estilo": estilo}
+
+
+def figuras_etapa1(df, corr, carpeta="../figs/figs_etapa1"):
+    """Las cuatro figuras de exploración de etapa1 (df limpio, corr de Pearson)."""
+    return [
+        figura(f"{carpeta}/fav_genre_dist.png", barras_conteo, df[["Fav genre"]], (10, 5),
+               y="Fav genre", titulo="Distribución de Género Favorito",
+               xlabel="Recuentos", ylabel="Género"),
+        figura(f"{carpeta}/hours_vs_mh_avg.png", cajas, df[["Hours_cat", "MH_avg"]], (8, 5),
+               x="Hours_cat", y="MH_avg", palette="pastel",
+               titulo="Horas de Música/día vs Salud Mental (promedio)",
+               xlabel="Categoría de horas", ylabel="Score medio (0-10)"),
+        figura(f"{carpeta}/bpm_vs_anxiety.png", regresion, df[["BPM", "Anxiety"]], (6, 5),
+               x="BPM", y="Anxiety", alpha=0.4, titulo="Relación BPM – Ansiedad"),
+        figura(f"{carpeta}/corr_matrix.png", mapa_calor, corr, (12, 9),
+               titulo="Matriz de Correlación (numéricas)",
+               cmap="coolwarm", center=0, annot=False),
+    ]
+
+
+def figuras_etapa2(data, cols, carpeta="../figs/figs_etapa2", dpi=120):
+    """Histograma + KDE y boxplot por columna y el scatter con la recta OLS."""
+    specs = []
+    for col in cols:
+        nombre = col.replace(" ", "_")
+        specs.append(figura(f"{carpeta}/hist_{nombre}.png", histograma_kde, data[[col]],
+                            (6, 4), dpi, columna=col, titulo=f"Histograma + KDE – {col}"))
+        specs.append(figura(f"{carpeta}/box_{nombre}.png", cajas, data[[col]], (4, 4), dpi,
+                            y=col, titulo=f"Boxplot – {col}"))
+    specs.append(figura(f"{carpeta}/scatter_hours_anxiety.png", regresion,
+                        data[["Hours per day", "Anxiety"]], (6, 5), dpi,
+                        x="Hours per day", y="Anxiety", alpha=0.45,
+                        titulo="Anxiety vs Hours per day\n(regresión OLS)"))
+    return specs
+
+
+def figuras_confusion(matrices, carpeta="../figs/figuras_confusion"):
+    """Una matriz de confusión por modelo ({nombre: cm 3×3}), a 300 dpi."""
+    etiquetas = ["Bajo", "Medio", "Alto"]
+    return [figura(os.path.join(carpeta, f"confusion_{nombre}.png"), mapa_calor,
+                   np.asarray(cm), (6, 5), 300, None,
+                   titulo=f"Matriz de Confusión ({nombre})",
+                   xlabel="Clase Predicha", ylabel="Clase Verdadera",
+                   annot=True, fmt="d", cmap="Blues",
+                   xticklabels=etiquetas, yticklabels=etiquetas)
+            for nombre, cm in matrices.items()]
+
+
+# ------------------------------------------------------------------
+# Hash de cada figura (datos + parámetros + código de dibujo)
+# ------------------------------------------------------------------
+def _hash_datos(h, datos):
+    if isinstance(datos, (pd.DataFrame, pd.Series)):
+        h.update(repr(datos.dtypes if isinstance(datos, pd.DataFrame)
+                      else datos.dtype).encode())
+        h.update(repr(list(datos.columns) if isinstance(datos, pd.DataFrame)
+                      else datos.name).encode())
+        h.update(pd.util.hash_pandas_object(datos, index=True).to_numpy().tobytes())
+    else:
+        datos = np.ascontiguousarray(datos)
+        h.update(f"{datos.dtype}{datos.shape}".encode())
+        h.update(datos.tobytes())
+
+
+def hash_figura(spec):
+    h = hashlib.sha256()
+    _hash_datos(h, spec["datos"])
+    h.update(json.dumps({"dibujo": spec["dibujo"].__name__,
+                         "codigo": inspect.getsource(spec["dibujo"]),
+                         "params": spec["params"], "figsize": spec["figsize"],
+                         "dpi": spec["dpi"], "estilo": spec["estilo"]},
+                        sort_keys=True, default=repr).encode())
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------------
+# Render
+# ------------------------------------------------------------------
+def _dibujar(spec):
+    """Renderiza una especificación a PNG con el canvas Agg; devuelve los segundos."""
+    import matplotlib as mpl
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    t0 = time.perf_counter()
+    with mpl.rc_context():
+        if spec["estilo"]:
+            sns.set_theme(style=spec["estilo"])
+        fig = Figure(figsize=spec["figsize"])
+        spec["dibujo"](fig.add_subplot(), spec["datos"], **spec["params"])
+        fig.tight_layout()
+        os.makedirs(os.path.dirname(spec["ruta"]) or ".", exist_ok=True)
+        fig.savefig(spec["ruta"], dpi=spec["dpi"])
+    return time.perf_counter() - t0
+
+
+def _init_worker():
+    os.environ["MPLBACKEND"] = "Agg"
+
+
+def _cargar_manifiesto(ruta):
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def renderizar(specs, preview=False, forzar=False, n_workers=None, manifiesto=MANIFIESTO):
+    """
+    Genera las figuras cuyo hash ha cambiado (o todas con forzar=True).
+
+    preview   : versión rápida (DPI_PREVIEW, PARAMS_PREVIEW) bajo DIR_PREVIEW.
+    n_workers : procesos (por defecto nº de CPUs); con 1, o con una sola
+                figura pendiente, se dibuja en este proceso.
+    Devuelve un dict con las rutas renderizadas, las omitidas y el tiempo.
+    """
+    t0 = time.perf_counter()
+    if preview:
+        specs = [dict(s, dpi=DPI_PREVIEW,
+                      params={**s["params"], **PARAMS_PREVIEW.get(s["dibujo"].__name__, {})},
+                      ruta=os.path.join(DIR_PREVIEW, os.path.relpath(s["ruta"], FIGS_DIR)))
+                 for s in specs]
+    hechos = _cargar_manifiesto(manifiesto)
+    hashes = {s["ruta"]: hash_figura(s) for s in specs}
+    clave = {s["ruta"]: os.path.abspath(s["ruta"]) for s in specs}
+    pendientes = [s for s in specs
+                  if forzar or not os.path.exists(s["ruta"])
+                  or hechos.get(clave[s["ruta"]]) != hashes[s["ruta"]]]
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(pendientes))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker) as pool:
+            list(pool.map(_dibujar, pendientes))
+    else:
+        for s in pendientes:
+            _dibujar(s)
+
+    hechos.update({clave[s["ruta"]]: hashes[s["ruta"]] for s in pendientes})
+    os.makedirs(os.path.dirname(manifiesto), exist_ok=True)
+    with open(manifiesto, "w", encoding="utf-8") as f:
+        json.dump(hechos, f, indent=1, sort_keys=True)
+    rutas = {s["ruta"] for s in pendientes}
+    return {"renderizadas": sorted(rutas),
+            "omitidas": sorted(s["ruta"] for s in specs if s["ruta"] not in rutas),
+            "workers": max(n_workers, 1), "segundos": time.perf_counter() - t0}
+
+
+# ------------------------------------------------------------------
+# Recogida de todas las etapas (línea de comandos)
+# ------------------------------------------------------------------
+def specs_etapa1():
+    from almacen import leer_limpio
+    from correlaciones import matriz_correlacion
+    from limpieza import MH_COLS
+
+    df = leer_limpio()
+    freq_cols = [c for c in df.columns if c.startswith("Frequency")]
+    corr, _ = matriz_correlacion(df[["Age", "Hours per day", "BPM"] + MH_COLS + freq_cols])
+    return figuras_etapa1(df, corr)
+
+
+def specs_etapa2():
+    from almacen import leer_limpio
+
+    cols = ["Hours per day", "Anxiety"]
+    return figuras_etapa2(leer_limpio(columnas=cols).dropna().copy(), cols)
+
+
+def specs_confusion(modelos_dir="../modelos"):
+    import joblib
+    from artefacto import filas_split
+    from config_modelos import MODELOS, RANDOM_STATE
+    from entrenamiento import matriz_confusion
+    from esquema import cargar_datos, particion_test, separar_xy
+
+    rutas = {cfg["nombre"]: os.path.join(modelos_dir, f"{cfg['nombre']}_best.pkl")
+             for cfg in MODELOS}
+    rutas = {nombre: ruta for nombre, ruta in rutas.items() if os.path.exists(ruta)}
+    X, y = separar_xy(cargar_datos())
+    _, X_test, _, y_test = particion_test(X, y, RANDOM_STATE, filas_split(list(rutas)))
+    matrices = {nombre: matriz_confusion(joblib.load(ruta), X_test, y_test)[0]
+                for nombre, ruta in rutas.items()}
+    return figuras_confusion(matrices)
+
+
+ETAPAS = {"etapa1": specs_etapa1, "etapa2": specs_etapa2, "etapa3-2": specs_confusion}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenera las figuras que han cambiado")
+    parser.add_argument("--preview", action="store_true",
+                        help=f"dpi {DPI_PREVIEW} y salida en {DIR_PREVIEW}")
+    parser.add_argument("--forzar", action="store_true", help="renderiza todas")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos (por defecto: nº de CPUs)")
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), default=list(ETAPAS))
+    args = parser.parse_args(argv)
+
+    specs = [s for nombre in args.etapas for s in ETAPAS[nombre]()]
+    info = renderizar(specs, preview=args.preview, forzar=args.forzar, n_workers=args.workers)
+    for ruta in info["renderizadas"]:
+        print(f"  ✓ {ruta}")
+    print(f"{len(info['renderizadas'])} figuras renderizadas, {len(info['omitidas'])} "
+          f"sin cambios ({info['workers']} workers, {info['segundos']:.1f} s)")
+    return info
+
+
+if __name__ == "__main__":
+    main()
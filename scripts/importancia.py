@@ -0,0 +1,246 @@
+# --------------------  IMPORTANCIA POR PERMUTACIÓN (Etapa 3 / 4)  ---------
+# Importancia de cada feature del esquema para los pipelines guardados
+# (modelos/*_best.pkl): aumento del MAE de test al permutar la feature.
+#
+# permutation_importance de sklearn sobre el pipeline vuelve a pasar todo
+# X por el ColumnTransformer en cada permutación de cada columna y predice
+# una copia de n filas cada vez. Aquí:
+#   – X_test se preprocesa una vez por modelo; como el preprocesado es
+#     fila a fila, permutar una feature cruda equivale a permutar (con la
+#     misma permutación) sus columnas de salida: las dummies de un one-hot
+#     se agrupan de nuevo en su feature de origen (grupos_features);
+#   – al permutar una feature con derivadas (Hours per day -> Hours_cat,
+#     limpieza.DERIVADAS) sus columnas se permutan con la misma permutación,
+#     que equivale a recalcular la derivada y no deja filas incoherentes;
+#   – todas las parejas (feature × repetición) se apilan en matrices de
+#     hasta MEMORIA_LOTE bytes y se predicen con una sola llamada por lote
+#     al estimador final;
+#   – los lotes de todos los modelos se reparten en un ProcessPoolExecutor
+#     (cada worker carga cada modelo y su matriz preprocesada una vez);
+#   – la permutación de (feature, repetición) sale de
+#     SeedSequence(random_state, spawn_key=(feature, repetición)): mismas
+#     permutaciones para todos los modelos (comparables entre sí) y mismo
+#     resultado con cualquier nº de workers o tamaño de lote.
+# El IC de cada importancia es el intervalo t sobre las repeticiones.
+#
+# Uso (desde scripts/):
+#   python importancia.py [--repeticiones 30] [--workers N] [--modelos SVR kNN ...]
+import argparse
+import glob
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+from threadpoolctl import threadpool_limits
+
+from artefacto import filas_split
+from config_modelos import RANDOM_STATE
+from esquema import cargar_datos, particion_test, separar_xy
+from limpieza import DERIVADAS
+
+MODELOS_DIR    = "../modelos"
+N_REPETICIONES = 30
+MEMORIA_LOTE   = 64 * 1024**2     # bytes de la matriz apilada de cada predict
+
+# Estado de cada worker: rutas, X/y de test y modelos ya cargados
+_WORKER = {}
+
+
+# ------------------------------------------------------------------
+# Columnas de salida del preprocesador por feature de origen
+# ------------------------------------------------------------------
+def _ultimo_paso(transformador):
+    return transformador.steps[-1][1] if isinstance(transformador, Pipeline) else transformador
+
+
+def grupos_features(prep):
+    """
+    {feature cruda: índices de sus columnas en prep.transform(X)} para un
+    ColumnTransformer ajustado. Un OneHotEncoder aporta len(categorías)
+    columnas por feature (una menos si tiene drop); el resto, una.
+    """
+    if not isinstance(prep, ColumnTransformer):
+        raise TypeError(f"se esperaba un ColumnTransformer, no {type(prep).__name__}")
+    grupos = {}
+    for nombre, transformador, columnas in prep.transformers_:
+        if transformador == "drop" or nombre == "remainder":
+            continue
+        inicio = prep.output_indices_[nombre].start
+        ultimo = _ultimo_paso(transformador)
+        for i, col in enumerate(columnas):
+            ancho = 1
+            if isinstance(ultimo, OneHotEncoder):
+                ancho = len(ultimo.categories_[i])
+                if ultimo.drop_idx_ is not None and ultimo.drop_idx_[i] is not None:
+                    ancho -= 1
+            grupos[col] = np.arange(inicio, inicio + ancho)
+            inicio += ancho
+        assert inicio == prep.output_indices_[nombre].stop, nombre
+    return grupos
+
+
+# ------------------------------------------------------------------
+# Trabajo de cada worker
+# ------------------------------------------------------------------
+def _init_worker(rutas, X, y, limitar_hilos=True):
+    warnings.filterwarnings("ignore")
+    if limitar_hilos:
+        threadpool_limits(1)
+    _WORKER.update(rutas=rutas, X=X, y=np.asarray(y, dtype=float), modelos={})
+
+
+def _modelo(nombre):
+    """(estimador final, X_test preprocesado, grupos, MAE base), una vez por worker."""
+    if nombre not in _WORKER["modelos"]:
+        pipe = joblib.load(_WORKER["rutas"][nombre])
+        prep, estimador = pipe[:-1], pipe[-1]
+        # Sin convertir el dtype: HistGradientBoosting se ajustó sobre la
+        # salida object del preprocesador de árboles y la espera igual.
+        Xp = np.asarray(prep.transform(_WORKER["X"]))
+        grupos = grupos_features(prep[-1])
+        if list(grupos) != list(_WORKER["X"].columns):
+            raise ValueError(f"{nombre}: el preprocesador no usa exactamente las columnas de X")
+        grupos = [np.concatenate([cols] + [grupos[d] for d in DERIVADAS.get(f, {}) if d in grupos])
+                  for f, cols in grupos.items()]
+        base = np.abs(estimador.predict(Xp) - _WORKER["y"]).mean()
+        _WORKER["modelos"][nombre] = (estimador, Xp, grupos, base)
+    return _WORKER["modelos"][nombre]
+
+
+def permutacion(random_state, feature, repeticion, n):
+    """Permutación de filas de (feature, repetición); igual para todos los modelos."""
+    semilla = np.random.SeedSequence(random_state, spawn_key=(feature, repeticion))
+    return np.random.default_rng(semilla).permutation(n)
+
+
+def _tarea_lote(nombre, pares, random_state):
+    """MAE de test con cada (feature, repetición) de 'pares' permutada: un predict."""
+    estimador, Xp, grupos, base = _modelo(nombre)
+    n = len(Xp)
+    apilada = np.tile(Xp, (len(pares), 1))
+    for k, (f, r) in enumerate(pares):
+        cols = grupos[f]
+        apilada[k * n:(k + 1) * n, cols] = Xp[permutacion(random_state, f, r, n)][:, cols]
+    pred = estimador.predict(apilada).reshape(len(pares), n)
+    return nombre, pares, np.abs(pred - _WORKER["y"]).mean(axis=1), base
+
+
+# ------------------------------------------------------------------
+# Motor
+# ------------------------------------------------------------------
+def importancia_permutacion(rutas, X, y, n_repeticiones=N_REPETICIONES, nivel=0.95,
+                            n_workers=None, random_state=RANDOM_STATE,
+                            memoria_lote=MEMORIA_LOTE):
+    """
+    Importancia por permutación (ΔMAE) de cada feature de X para cada
+    pipeline de rutas ({nombre: ruta .pkl}), sobre (X, y).
+
+    Devuelve (DataFrame largo con Modelo, Feature, Importancia, Error
+    estándar, IC inf, IC sup y MAE base, ordenado por modelo e importancia;
+    info con workers, lotes, filas predichas y segundos).
+    """
+    t0 = time.perf_counter()
+    features = list(X.columns)
+    n = len(X)
+    _init_worker(rutas, X, y, limitar_hilos=False)
+    p_max = max(_modelo(nombre)[1].shape[1] for nombre in rutas)
+
+    pares = [(f, r) for f in range(len(features)) for r in range(n_repeticiones)]
+    n_workers = n_workers or os.cpu_count() or 1
+    por_lote = max(1, min(int(memoria_lote // (n * p_max * 8)),
+                          -(-len(pares) * len(rutas) // n_workers)))
+    tareas = [(nombre, pares[i:i + por_lote], random_state)
+              for nombre in rutas for i in range(0, len(pares), por_lote)]
+
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(rutas, X, y)) as pool:
+            resultados = list(pool.map(_tarea_lote, *zip(*tareas)))
+    else:
+        resultados = [_tarea_lote(*t) for t in tareas]
+    _WORKER.clear()
+
+    mae = {nombre: np.empty((len(features), n_repeticiones)) for nombre in rutas}
+    bases = {}
+    for nombre, lote, valores, base in resultados:
+        f, r = np.array(lote).T
+        mae[nombre][f, r] = valores
+        bases[nombre] = base
+
+    t = stats.t.ppf((1 + nivel) / 2, n_repeticiones - 1)
+    filas = []
+    for nombre in rutas:
+        delta = mae[nombre] - bases[nombre]
+        media = delta.mean(axis=1)
+        se = delta.std(axis=1, ddof=1) / np.sqrt(n_repeticiones)
+        for i, feature in enumerate(features):
+            filas.append({"Modelo": nombre, "Feature": feature, "Importancia": media[i],
+                          "Error estándar": se[i], "IC inf": media[i] - t * se[i],
+                          "IC sup": media[i] + t * se[i], "MAE base": bases[nombre]})
+    tabla = (pd.DataFrame(filas)
+               .sort_values(["Modelo", "Importancia"], ascending=[True, False])
+               .reset_index(drop=True))
+    info = {"workers": n_workers, "lotes": len(tareas),
+            "filas_predichas": len(pares) * len(rutas) * n,
+            "segundos": time.perf_counter() - t0}
+    return tabla, info
+
+
+def rutas_modelos(nombres=None, modelos_dir=MODELOS_DIR):
+    """{nombre: ruta} de los <nombre>_best.pkl (todos, o solo 'nombres')."""
+    rutas = {os.path.basename(r)[:-len("_best.pkl")]: r
+             for r in sorted(glob.glob(os.path.join(modelos_dir, "*_best.pkl")))}
+    if nombres:
+        faltan = set(nombres) - set(rutas)
+        if faltan:
+            raise FileNotFoundError(f"no hay *_best.pkl para: {sorted(faltan)}")
+        rutas = {n: rutas[n] for n in nombres}
+    return rutas
+
+
+def datos_test(nombres=None):
+    """
+    Split de test de etapa3 (mismo RANDOM_STATE y proporción) de los
+    modelos 'nombres': solo las filas que repartió su búsqueda
+    (artefacto.filas_split), no las añadidas después por reentrenamiento.
+    """
+    X, y = separar_xy(cargar_datos())
+    _, X_test, _, y_test = particion_test(X, y, RANDOM_STATE, filas_split(nombres or []))
+    return X_test, y_test
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importancia por permutación de los *_best.pkl")
+    parser.add_argument("--repeticiones", type=int, default=N_REPETICIONES)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos (por defecto: nº de CPUs)")
+    parser.add_argument("--modelos", nargs="+", metavar="NOMBRE",
+                        help="solo estos modelos (por defecto, todos los *_best.pkl)")
+    parser.add_argument("--top", type=int, default=10, help="features a mostrar por modelo")
+    args = parser.parse_args(argv)
+
+    rutas = rutas_modelos(args.modelos)
+    X_test, y_test = datos_test(list(rutas))
+    tabla, info = importancia_permutacion(rutas, X_test, y_test,
+                                          n_repeticiones=args.repeticiones,
+                                          n_workers=args.workers)
+    for nombre, t in tabla.groupby("Modelo", sort=False):
+        print(f"\n=== {nombre} (MAE test {t['MAE base'].iloc[0]:.3f}, "
+              f"ΔMAE con IC 95 % sobre {args.repeticiones} permutaciones) ===")
+        print(t.head(args.top).drop(columns=["Modelo", "MAE base"])
+               .round(4).to_string(index=False))
+    print(f"\n⚡  {info['filas_predichas']:,} filas predichas en {info['lotes']} lotes "
+          f"({info['workers']} workers, {info['segundos']:.1f} s)")
+    return tabla
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# --------------------  kNN APROXIMADO CON BOSQUE DE PROYECCIONES  --------
+# Regresor kNN con índice precalculado para poblaciones grandes, donde el
+# kNN exacto (fuerza bruta) recorre todo el train en cada predicción.
+#
+# Índice: bosque de árboles de proyecciones aleatorias (tipo Annoy). Cada
+# nodo corta su grupo de puntos por la mediana de la proyección sobre el
+# hiperplano que separa dos puntos elegidos al azar, hasta hojas de como
+# mucho 'tam_hoja' puntos. En la consulta cada fila baja por todos los
+# árboles, la unión de sus hojas forma los candidatos y entre ellos se
+# eligen los k más cercanos con la distancia de Minkowski exacta (p = 1
+# o 2, como en el grid de etapa3). Más árboles = más recall y más
+# latencia (ver bench_knn.py).
+#
+# Es un estimador sklearn normal (get_params / set_params, fit / predict),
+# así que entra en Pipeline([("prep", ...), ("model", KNNAproximado())]) y
+# en GridSearchCV con claves "model__n_neighbors", "model__n_arboles"...
+# La alternativa exacta con índice es KNeighborsRegressor(algorithm=
+# "ball_tree"), que también se compara en el benchmark.
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.utils import check_random_state
+from sklearn.utils.validation import check_array, check_is_fitted, check_X_y
+
+TAM_BLOQUE = 256          # filas de consulta por bloque (acota la memoria)
+
+
+def _construir_arbol(X, tam_hoja, rng):
+    """
+    Árbol de proyecciones aleatorias sobre las filas de X. Devuelve un dict
+    de arrays: normal/umbral/izq/der por nodo (izq = -1 en las hojas),
+    hoja_de_nodo y la matriz de hojas (índices de X, rellenada con -1).
+    """
+    normales, umbrales, izq, der, hoja_de_nodo, hojas = [], [], [], [], [], []
+    pila = [(0, np.arange(len(X)))]
+    normales.append(None); umbrales.append(0.0); izq.append(-1); der.append(-1)
+    hoja_de_nodo.append(-1)
+
+    while pila:
+        nodo, idx = pila.pop()
+        if len(idx) <= tam_hoja:
+            hoja_de_nodo[nodo] = len(hojas)
+            hojas.append(idx)
+            continue
+        a, b = rng.choice(idx, size=2, replace=False)
+        normal = X[a] - X[b]
+        if not normal.any():                     # dos puntos iguales: eje al azar
+            normal = rng.standard_normal(X.shape[1])
+        proy = X[idx] @ normal
+        orden = np.argsort(proy, kind="stable")
+        mitad = len(idx) // 2
+        normales[nodo] = normal
+        umbrales[nodo] = (proy[orden[mitad - 1]] + proy[orden[mitad]]) / 2
+        for lado, sub in ((izq, idx[orden[:mitad]]), (der, idx[orden[mitad:]])):
+            hijo = len(normales)
+            normales.append(None); umbrales.append(0.0); izq.append(-1); der.append(-1)
+            hoja_de_nodo.append(-1)
+            lado[nodo] = hijo
+            pila.append((hijo, sub))
+
+    ancho = max(len(h) for h in hojas)
+    matriz = np.full((len(hojas), ancho), -1, dtype=np.intp)
+    for i, h in enumerate(hojas):
+        matriz[i, :len(h)] = h
+    d = X.shape[1]
+    return {
+        "normal": np.stack([np.zeros(d) if n is None else n for n in normales]),
+        "umbral": np.asarray(umbrales), "izq": np.asarray(izq, dtype=np.intp),
+        "der": np.asarray(der, dtype=np.intp),
+        "hoja_de_nodo": np.asarray(hoja_de_nodo, dtype=np.intp), "hojas": matriz
+    }
+
+
+def _hojas_de(arbol, Xq):
+    """Fila de 'hojas' a la que llega cada consulta (descenso vectorizado)."""
+    nodo = np.zeros(len(Xq), dtype=np.intp)
+    activos = arbol["izq"][nodo] >= 0
+    while activos.any():
+        n = nodo[activos]
+        proy = np.einsum("ij,ij->i", Xq[activos], arbol["normal"][n])
+        nodo[activos] = np.where(proy <= arbol["umbral"][n], arbol["izq"][n], arbol["der"][n])
+        activos = arbol["izq"][nodo] >= 0
+    return arbol["hoja_de_nodo"][nodo]
+
+
+class KNNAproximado(BaseEstimator, RegressorMixin):
+    """
+    kNN regresor sobre un bosque de proyecciones aleatorias.
+
+    n_neighbors : vecinos usados en la predicción.
+    weights     : "uniform" o "distance" (como KNeighborsRegressor).
+    p           : exponente de Minkowski de la distancia (1 o 2).
+    n_arboles   : árboles del bosque; controla el compromiso recall/latencia.
+    tam_hoja    : tamaño máximo de hoja; debe ser ≥ 2·n_neighbors para que
+                  cada árbol aporte al menos k candidatos.
+
+    min_candidatos_ (tras fit) es la hoja más pequeña del bosque: toda
+    consulta tiene al menos ese nº de candidatos distintos, así que
+    kneighbors rechaza k mayores (como KNeighborsRegressor con k > n).
+    """
+
+    def __init__(self, n_neighbors=5, weights="uniform", p=2, n_arboles=8,
+                 tam_hoja=64, random_state=None):
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.p = p
+        self.n_arboles = n_arboles
+        self.tam_hoja = tam_hoja
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        X, y = check_X_y(X, y, dtype=np.float64, y_numeric=True)
+        if self.weights not in ("uniform", "distance"):
+            raise ValueError(f"weights desconocido: {self.weights!r}")
+        if self.tam_hoja < 2 * self.n_neighbors:
+            raise ValueError(f"tam_hoja ({self.tam_hoja}) debe ser ≥ 2·n_neighbors "
+                             f"({2 * self.n_neighbors})")
+        rng = check_random_state(self.random_state)
+        self._fit_X = np.ascontiguousarray(X)
+        self._y = np.asarray(y, dtype=np.float64)
+        self.n_features_in_ = X.shape[1]
+        self.arboles_ = [_construir_arbol(self._fit_X, self.tam_hoja, rng)
+                         for _ in range(self.n_arboles)]
+        self.min_candidatos_ = min(int((a["hojas"] >= 0).sum(axis=1).min())
+                                   for a in self.arboles_)
+        return self
+
+    def _distancias(self, Xq, cand):
+        dif = np.abs(self._fit_X[cand] - Xq[:, None, :])
+        if self.p == 1:
+            return dif.sum(axis=2)
+        if self.p == 2:
+            return np.sqrt(np.einsum("ijk,ijk->ij", dif, dif))
+        return (dif ** self.p).sum(axis=2) ** (1 / self.p)
+
+    def kneighbors(self, X, n_neighbors=None):
+        """(distancias, índices) de los k vecinos aproximados, ordenados."""
+        check_is_fitted(self, "arboles_")
+        X = check_array(X, dtype=np.float64)
+        k = n_neighbors or self.n_neighbors
+        if k > len(self._fit_X):
+            raise ValueError(f"Expected n_neighbors <= n_samples_fit, but n_neighbors = {k}, "
+                             f"n_samples_fit = {len(self._fit_X)}")
+        if k > self.min_candidatos_:
+            raise ValueError(f"n_neighbors ({k}) mayor que los candidatos garantizados por "
+                             f"consulta ({self.min_candidatos_}); sube tam_hoja "
+                             f"({self.tam_hoja}) a ≥ 2·n_neighbors")
+        dist = np.empty((len(X), k))
+        ind = np.empty((len(X), k), dtype=np.intp)
+
+        for ini in range(0, len(X), TAM_BLOQUE):
+            Xq = X[ini:ini + TAM_BLOQUE]
+            cand = np.hstack([a["hojas"][_hojas_de(a, Xq)] for a in self.arboles_])
+            # Un punto puede salir en varios árboles: los repetidos se anulan
+            cand.sort(axis=1)
+            invalido = cand < 0
+            invalido[:, 1:] |= cand[:, 1:] == cand[:, :-1]
+            d = self._distancias(Xq, np.where(invalido, 0, cand))
+            d[invalido] = np.inf
+
+            top = np.argpartition(d, k - 1, axis=1)[:, :k]
+            d_top = np.take_along_axis(d, top, axis=1)
+            orden = np.argsort(d_top, axis=1, kind="stable")
+            dist[ini:ini + len(Xq)] = np.take_along_axis(d_top, orden, axis=1)
+            ind[ini:ini + len(Xq)] = np.take_along_axis(
+                np.take_along_axis(cand, top, axis=1), orden, axis=1)
+        return dist, ind
+
+    def predict(self, X):
+        dist, ind = self.kneighbors(X)
+        vecinos = self._y[ind]
+        if self.weights == "uniform":
+            return vecinos.mean(axis=1)
+        # Como sklearn: si hay vecinos a distancia 0, solo cuentan ellos
+        with np.errstate(divide="ignore"):
+            pesos = 1.0 / dist
+        ceros = np.isinf(pesos)
+        filas_cero = ceros.any(axis=1)
+        pesos[filas_cero] = ceros[filas_cero]
+        return (pesos * vecinos).sum(axis=1) / pesos.sum(axis=1)
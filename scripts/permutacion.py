@@ -0,0 +1,109 @@
+# --------------------  TESTS DE PERMUTACIÓN POR LOTES (Etapa 2)  ----------
+# p-valores de permutación para correlaciones de Pearson y Spearman, sin
+# suponer normalidad (Anderson-Darling la rechaza para Hours per day y
+# Anxiety). Pensado para todas las parejas de la matriz de correlación de
+# etapa1 a la vez.
+#
+# Cada columna se centra y normaliza (Spearman: sobre rangos promedio), de
+# modo que r_ij = z_i · z_j. Una permutación de las filas aplicada a z_j
+# da una réplica de r_ij bajo H0 (independencia) para TODAS las parejas a
+# la vez: un bloque de B permutaciones es un gather (B, n, p) y un matmul
+# Zᵀ (Z permutada), con B acotado por MEMORIA_BLOQUE.
+#
+# p = (extremos + 1) / (permutaciones + 1), bilateral (|r*| ≥ |r|), que es
+# un test exacto de nivel alfa aunque no se enumeren las n! permutaciones.
+# Parada temprana: tras cada bloque, el intervalo de Clopper-Pearson del
+# p-valor de cada pareja se compara con alfa; las parejas cuyo intervalo
+# queda entero a un lado dejan de calcularse, y el motor para cuando no
+# queda ninguna o se llega a n_perm.
+#
+#   tabla = test_permutacion(df[COLUMNAS_CORR], metodo="spearman")
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from esquema import FREQ_COLS
+from limpieza import MH_COLS
+
+# Mismas columnas que la matriz de correlación de etapa1
+COLUMNAS_CORR  = ["Age", "Hours per day", "BPM"] + MH_COLS + FREQ_COLS
+MEMORIA_BLOQUE = 64e6     # bytes del array (B, n, p) permutado de cada bloque
+
+
+def estandarizar(M, metodo):
+    """Columnas centradas y de norma 1: Zᵀ Z es la matriz de correlación."""
+    if metodo == "spearman":
+        M = stats.rankdata(M, axis=0)
+    elif metodo != "pearson":
+        raise ValueError(f"metodo debe ser 'pearson' o 'spearman', no {metodo!r}")
+    M = M - M.mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return M / np.sqrt((M**2).sum(axis=0))
+
+
+def intervalo_p(extremos, perms, confianza=0.99):
+    """IC de Clopper-Pearson para la probabilidad de un |r*| ≥ |r|."""
+    a = (1 - confianza) / 2
+    with np.errstate(invalid="ignore"):
+        inf = np.where(extremos > 0, stats.beta.ppf(a, extremos, perms - extremos + 1), 0.0)
+        sup = np.where(extremos < perms,
+                       stats.beta.ppf(1 - a, extremos + 1, perms - extremos), 1.0)
+    return inf, sup
+
+
+def test_permutacion(X, metodo="pearson", n_perm=10_000, alfa=0.05,
+                     parada_temprana=True, confianza=0.99, tam_bloque=None,
+                     random_state=None):
+    """
+    Test de permutación bilateral de la correlación para todas las parejas
+    de columnas de X (DataFrame; las filas con NaN se descartan).
+
+    metodo          : "pearson" o "spearman".
+    n_perm          : máximo de permutaciones por pareja.
+    parada_temprana : deja de permutar una pareja cuando el IC (confianza)
+                      de su p-valor queda por encima o por debajo de alfa.
+    tam_bloque      : permutaciones por bloque (por defecto, las que caben
+                      en MEMORIA_BLOQUE).
+    Devuelve un DataFrame con una fila por pareja (orden de la matriz).
+    """
+    X = X.dropna()
+    nombres = list(X.columns)
+    Z = estandarizar(X.to_numpy(dtype=float), metodo)
+    n, p = Z.shape
+    fi, co = np.triu_indices(p, 1)
+    r_obs = (Z.T @ Z)[fi, co]
+    umbral = np.abs(r_obs) * (1 - 1e-12)         # empates numéricos cuentan como extremos
+    tam_bloque = tam_bloque or max(1, int(MEMORIA_BLOQUE // (n * p * 8)))
+    rng = np.random.default_rng(random_state)
+
+    extremos = np.zeros(len(fi), dtype=int)
+    perms = np.zeros(len(fi), dtype=int)
+    activas = np.isfinite(r_obs)
+    hechas = 0
+    while activas.any() and hechas < n_perm:
+        b = min(tam_bloque, n_perm - hechas)
+        orden = rng.permuted(np.tile(np.arange(n), (b, 1)), axis=1)
+        act = np.flatnonzero(activas)
+        filas, pos_f = np.unique(fi[act], return_inverse=True)
+        cols, pos_c = np.unique(co[act], return_inverse=True)
+        R = Z[:, filas].T @ Z[:, cols][orden]     # (b, filas, cols)
+        extremos[act] += (np.abs(R[:, pos_f, pos_c]) >= umbral[act]).sum(axis=0)
+        perms[act] += b
+        hechas += b
+        if parada_temprana:
+            inf, sup = intervalo_p(extremos[act], perms[act], confianza)
+            activas[act[(sup < alfa) | (inf > alfa)]] = False
+
+    inf, sup = intervalo_p(extremos, perms, confianza)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_valor = (extremos + 1) / (perms + 1)
+    return pd.DataFrame({
+        "Variable 1": [nombres[i] for i in fi],
+        "Variable 2": [nombres[j] for j in co],
+        "r": r_obs,
+        "p permutación": p_valor,
+        "IC p inf": inf,
+        "IC p sup": sup,
+        "Permutaciones": perms,
+        "Significativo": p_valor < alfa,
+    })
@@ -0,0 +1,399 @@
+# ====================================================================
+# PIPELINE CON CACHE DIRECCIONADA POR CONTENIDO
+# ====================================================================
+# Ejecuta la cadena etapa1 → clean_data → etapa2 / etapa3 → modelos →
+# etapa4 → figs saltando las etapas cuyas entradas no han cambiado.
+#
+# La clave de cada etapa es el sha256 de:
+#   – el código: el script de la etapa y, de forma recursiva, los módulos
+#     de scripts/ que importa (esquema.py, config_modelos.py, …);
+#   – las entradas: contenido de los ficheros que lee (data.csv,
+#     clean_data.parquet, <MODELO>_best.pkl, …); de los manifest.json de
+#     los artefactos no cuentan la fecha ni los CPU-s (CAMPOS_VOLATILES),
+#     así que re-ejecutar etapa3 con el mismo resultado no invalida etapa4;
+#   – los parámetros: constantes literales en MAYÚSCULAS del script (p. ej.
+#     RANDOM_STATE, MODELO, N_WORKERS en etapa4) y, para etapa3,
+#     RANDOM_STATE, CV_FOLDS, el presupuesto y los grids de config_modelos;
+#   – los argumentos con los que se lanza el script.
+#
+# Las salidas de cada ejecución se guardan por su sha256 en
+# ../.cache_etapas/objetos y un registro clave -> {salida: sha256} en
+# ../.cache_etapas/etapas/<etapa>/. Si la clave ya tiene registro, la etapa
+# no se ejecuta: si las salidas en disco ya coinciden está al día, y si no,
+# se restauran desde la cache (p. ej. al volver a una configuración
+# anterior). Como las entradas de una etapa son las salidas de la
+# anterior, si una etapa se re-ejecuta y produce exactamente los mismos
+# ficheros, las siguientes siguen en cache.
+#
+# Uso (desde scripts/):
+#   python pipeline.py                    # todas las etapas
+#   python pipeline.py etapa4             # etapa4 y las etapas de las que depende
+#   python pipeline.py --dry-run          # qué está obsoleto y por qué
+#   python pipeline.py etapa3 --force     # re-ejecuta aunque esté en cache
+#   python pipeline.py --force etapa1     # solo fuerza etapa1 (y sigue la cadena)
+#   python pipeline.py --adoptar          # registra las salidas actuales como
+#                                         # resultado de la clave actual sin ejecutar
+# ====================================================================
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR   = os.path.join(SCRIPTS_DIR, "..", ".cache_etapas")
+
+
+def parametros_etapa3():
+    """Parámetros de búsqueda de config_modelos (se importa solo para etapa3)."""
+    import config_modelos as cm
+    return {"RANDOM_STATE": cm.RANDOM_STATE, "CV_FOLDS": cm.CV_FOLDS,
+            "N_ITER_RANDOM": cm.N_ITER_RANDOM,
+            "PRESUPUESTO_RANDOM_S": cm.PRESUPUESTO_RANDOM_S,
+            "modelos": {cfg["nombre"]: {"estimator": repr(cfg["estimator"]),
+                                        "param_grid": cfg["param_grid"],
+                                        "busqueda": cfg.get("busqueda", "grid")}
+                        for cfg in cm.MODELOS}}
+
+
+# Rutas relativas a scripts/ (como en los propios scripts). Las entradas
+# admiten {CONSTANTE} con las constantes literales del script.
+LOTES_LIMPIOS = "../data/clean_data_lotes/*.parquet"
+
+# Campos (rutas de claves) de las entradas JSON que cambian en cada
+# exportación aunque el modelo sea idéntico: se quitan antes del hash.
+CAMPOS_VOLATILES = {"manifest.json": [("creado",), ("metricas", "cpu_s")]}
+ETAPAS = {
+    "etapa1": {"script": "etapa1.py", "depende": [],
+               "entradas": ["../data/data.csv"],
+               "salidas": ["../data/clean_data.csv", "../data/clean_data.parquet",
+                           "../modelos/limpieza_etapa1.pkl", "../figs/figs_etapa1/*.png",
+                           "../figs/figs_etapa1/*.csv"]},
+    "etapa2": {"script": "etapa2.py", "depende": ["etapa1"],
+               "entradas": ["../data/clean_data.parquet", LOTES_LIMPIOS],
+               "salidas": ["../figs/figs_etapa2/*.png"]},
+    "etapa3": {"script": "etapa3.py", "depende": ["etapa1"],
+               "entradas": ["../data/clean_data.parquet", LOTES_LIMPIOS],
+               "salidas": ["../modelos/*_best.pkl", "../modelos/artefactos/*/*"],
+               "parametros": parametros_etapa3},
+    "etapa4": {"script": "etapa4.py", "depende": ["etapa1", "etapa3"],
+               "entradas": ["../data/clean_data.parquet", LOTES_LIMPIOS,
+                            "../modelos/{MODELO}_best.pkl", "../modelos/artefactos/{MODELO}/*"],
+               "salidas": ["../figs/comparacion_escenarios_ansiedad.png",
+                           "../figs/comparacion_escenarios_ansiedad.pdf"]},
+}
+
+
+# ------------------------------------------------------------------
+# Hash de ficheros (memorizado por tamaño + mtime)
+# ------------------------------------------------------------------
+class Hashes:
+    """sha256 de ficheros; no relee los que no han cambiado de tamaño ni mtime."""
+
+    def __init__(self, ruta=os.path.join(CACHE_DIR, "hashes.json")):
+        self.ruta = ruta
+        self._memo = {}
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                self._memo = json.load(f)
+
+    def fichero(self, path):
+        st = os.stat(path)
+        clave = os.path.abspath(path)
+        firma = [st.st_size, st.st_mtime_ns]
+        memo = self._memo.get(clave)
+        if memo and memo[:2] == firma:
+            return memo[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+        self._memo[clave] = firma + [h.hexdigest()]
+        return h.hexdigest()
+
+    def entrada(self, path):
+        """Como fichero(), sin los CAMPOS_VOLATILES si es un JSON que los tiene."""
+        campos = CAMPOS_VOLATILES.get(os.path.basename(path))
+        if campos is None:
+            return self.fichero(path)
+        with open(path, encoding="utf-8") as f:
+            obj = json.load(f)
+        for *padres, campo in campos:
+            nodo = obj
+            for clave in padres:
+                nodo = nodo.get(clave) if isinstance(nodo, dict) else None
+            if isinstance(nodo, dict):
+                nodo.pop(campo, None)
+        return _hash_json(obj)
+
+    def guardar(self):
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            json.dump(self._memo, f)
+
+
+def _hash_json(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+def _expandir(patrones, constantes=None):
+    """Patrones (relativos a scripts/) -> ficheros existentes, ordenados."""
+    rutas = []
+    for patron in patrones:
+        patron = patron.format(**(constantes or {}))
+        rutas += [p for p in glob.glob(os.path.join(SCRIPTS_DIR, patron)) if os.path.isfile(p)]
+    return sorted({os.path.relpath(p, SCRIPTS_DIR) for p in rutas})
+
+
+# ------------------------------------------------------------------
+# Código y parámetros de un script
+# ------------------------------------------------------------------
+def modulos_locales(script):
+    """El script y todos los módulos de scripts/ que importa, recursivamente."""
+    vistos, pendientes = set(), [script]
+    while pendientes:
+        actual = pendientes.pop()
+        if actual in vistos:
+            continue
+        vistos.add(actual)
+        with open(os.path.join(SCRIPTS_DIR, actual), encoding="utf-8") as f:
+            arbol = ast.parse(f.read())
+        for nodo in ast.walk(arbol):
+            if isinstance(nodo, ast.Import):
+                nombres = [a.name for a in nodo.names]
+            elif isinstance(nodo, ast.ImportFrom) and nodo.level == 0 and nodo.module:
+                nombres = [nodo.module]
+            else:
+                continue
+            for nombre in nombres:
+                fichero = nombre.split(".")[0] + ".py"
+                if os.path.exists(os.path.join(SCRIPTS_DIR, fichero)):
+                    pendientes.append(fichero)
+    return sorted(vistos)
+
+
+def constantes_literales(script):
+    """Asignaciones de módulo NOMBRE = <literal> (ast.literal_eval) del script."""
+    with open(os.path.join(SCRIPTS_DIR, script), encoding="utf-8") as f:
+        arbol = ast.parse(f.read())
+    constantes = {}
+    for nodo in arbol.body:
+        if (isinstance(nodo, ast.Assign) and len(nodo.targets) == 1 and
+                isinstance(nodo.targets[0], ast.Name) and nodo.targets[0].id.isupper()):
+            try:
+                constantes[nodo.targets[0].id] = ast.literal_eval(nodo.value)
+            except ValueError:
+                pass
+    return constantes
+
+
+# ------------------------------------------------------------------
+# Estado de una etapa
+# ------------------------------------------------------------------
+def componentes(nombre, hashes, args=()):
+    """Todo lo que determina el resultado de la etapa, con sus hashes."""
+    etapa = ETAPAS[nombre]
+    constantes = constantes_literales(etapa["script"])
+    parametros = dict(constantes)
+    if "parametros" in etapa:
+        parametros.update(etapa["parametros"]())
+    return {
+        "codigo": {m: hashes.fichero(os.path.join(SCRIPTS_DIR, m))
+                   for m in modulos_locales(etapa["script"])},
+        "entradas": {p: hashes.entrada(os.path.join(SCRIPTS_DIR, p))
+                     for p in _expandir(etapa["entradas"], constantes)},
+        "parametros": {k: _hash_json(v) for k, v in parametros.items()},
+        "args": list(args),
+    }
+
+
+def _dir_etapa(nombre):
+    return os.path.join(CACHE_DIR, "etapas", nombre)
+
+
+def _leer_json(ruta):
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _escribir_json(ruta, obj):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def _objeto(sha):
+    return os.path.join(CACHE_DIR, "objetos", sha[:2], sha)
+
+
+def explicar(actual, anterior):
+    """Lista de motivos por los que 'actual' difiere del último registro."""
+    if anterior is None:
+        return ["sin ejecuciones previas"]
+    motivos = []
+    for tipo, etiqueta in [("codigo", "código"), ("entradas", "entrada"),
+                           ("parametros", "parámetro")]:
+        antes, ahora = anterior["componentes"][tipo], actual[tipo]
+        for k in sorted(set(antes) | set(ahora)):
+            if k not in antes:
+                motivos.append(f"{etiqueta} nuevo: {k}")
+            elif k not in ahora:
+                motivos.append(f"{etiqueta} eliminado: {k}")
+            elif antes[k] != ahora[k]:
+                motivos.append(f"cambió {etiqueta}: {k}")
+    if anterior["componentes"]["args"] != actual["args"]:
+        motivos.append(f"argumentos {anterior['componentes']['args']} -> {actual['args']}")
+    return motivos
+
+
+def salidas_actuales(nombre, hashes):
+    return {p: hashes.fichero(os.path.join(SCRIPTS_DIR, p))
+            for p in _expandir(ETAPAS[nombre]["salidas"])}
+
+
+def estado_etapa(nombre, hashes, args=()):
+    """
+    (estado, clave, componentes, motivos, registro). estado es 'al día'
+    (registro para la clave y salidas iguales), 'en cache' (registro pero
+    salidas distintas o ausentes: se restauran) u 'obsoleta'.
+    """
+    comp = componentes(nombre, hashes, args)
+    clave = _hash_json(comp)
+    registro = _leer_json(os.path.join(_dir_etapa(nombre), f"{clave}.json"))
+    if registro is None:
+        anterior = _leer_json(os.path.join(_dir_etapa(nombre), "ultimo.json"))
+        return "obsoleta", clave, comp, explicar(comp, anterior), None
+    actuales = salidas_actuales(nombre, hashes)
+    distintas = [p for p, sha in registro["salidas"].items() if actuales.get(p) != sha]
+    if distintas:
+        return "en cache", clave, comp, [f"salida distinta o ausente: {p}" for p in distintas], registro
+    return "al día", clave, comp, [], registro
+
+
+# ------------------------------------------------------------------
+# Ejecución, registro y restauración
+# ------------------------------------------------------------------
+def registrar(nombre, clave, comp, hashes, segundos=None):
+    """Guarda las salidas actuales en la cache de objetos y el registro de la clave."""
+    salidas = salidas_actuales(nombre, hashes)
+    for p, sha in salidas.items():
+        destino = _objeto(sha)
+        if not os.path.exists(destino):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            shutil.copyfile(os.path.join(SCRIPTS_DIR, p), destino + ".tmp")
+            os.replace(destino + ".tmp", destino)
+    registro = {"etapa": nombre, "clave": clave, "componentes": comp, "salidas": salidas,
+                "segundos": segundos, "fecha": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    _escribir_json(os.path.join(_dir_etapa(nombre), f"{clave}.json"), registro)
+    _escribir_json(os.path.join(_dir_etapa(nombre), "ultimo.json"), registro)
+    return registro
+
+
+def restaurar(registro, hashes):
+    """Copia desde la cache de objetos las salidas que no coinciden."""
+    for p, sha in registro["salidas"].items():
+        ruta = os.path.join(SCRIPTS_DIR, p)
+        if os.path.exists(ruta) and hashes.fichero(ruta) == sha:
+            continue
+        if not os.path.exists(_objeto(sha)):
+            return False
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        shutil.copyfile(_objeto(sha), ruta)
+    _escribir_json(os.path.join(_dir_etapa(registro["etapa"]), "ultimo.json"), registro)
+    return True
+
+
+def ejecutar(nombre, args=()):
+    """Lanza el script en scripts/ con backend Agg (sin ventanas de plt.show)."""
+    entorno = dict(os.environ, MPLBACKEND="Agg")
+    t0 = time.perf_counter()
+    proceso = subprocess.run([sys.executable, ETAPAS[nombre]["script"], *args],
+                             cwd=SCRIPTS_DIR, env=entorno)
+    if proceso.returncode != 0:
+        raise SystemExit(f"✘ {nombre} terminó con código {proceso.returncode}")
+    return time.perf_counter() - t0
+
+
+def con_dependencias(seleccion):
+    """Etapas pedidas + las que necesitan, en el orden de ETAPAS."""
+    necesarias, pendientes = set(), list(seleccion)
+    while pendientes:
+        nombre = pendientes.pop()
+        if nombre not in necesarias:
+            necesarias.add(nombre)
+            pendientes += ETAPAS[nombre]["depende"]
+    return [n for n in ETAPAS if n in necesarias]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline con cache por contenido")
+    parser.add_argument("etapas", nargs="*", metavar="ETAPA",
+                        help=f"etapas a ejecutar (y sus dependencias) de {list(ETAPAS)}; "
+                             f"por defecto todas")
+    parser.add_argument("--force", nargs="*", metavar="ETAPA", choices=list(ETAPAS),
+                        help="re-ejecuta estas etapas (sin nombres: las pedidas) aunque estén en cache")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="no ejecuta nada: muestra qué etapas están obsoletas y por qué")
+    parser.add_argument("--adoptar", action="store_true",
+                        help="registra las salidas actuales como resultado de la clave actual")
+    parser.add_argument("--args-etapa3", default="",
+                        help="argumentos para etapa3.py, p. ej. \"random --workers 4\"")
+    args = parser.parse_args(argv)
+    desconocidas = [e for e in args.etapas if e not in ETAPAS]
+    if desconocidas:
+        parser.error(f"etapas desconocidas {desconocidas}; válidas: {list(ETAPAS)}")
+
+    pedidas = args.etapas or list(ETAPAS)
+    orden = con_dependencias(pedidas)
+    forzadas = set() if args.force is None else set(args.force or pedidas)
+    argumentos = {"etapa3": args.args_etapa3.split()}
+    hashes = Hashes()
+    pendientes = set()                 # etapas que se ejecutarán (para el dry-run)
+
+    try:
+        for nombre in orden:
+            extra = argumentos.get(nombre, [])
+            estado, clave, comp, motivos, registro = estado_etapa(nombre, hashes, extra)
+            previas = [d for d in ETAPAS[nombre]["depende"] if d in pendientes]
+            if nombre in forzadas:
+                estado, motivos = "obsoleta", ["--force"]
+
+            if args.dry_run:
+                if previas and estado != "obsoleta":
+                    estado = "pendiente"
+                    motivos = [f"depende de {', '.join(previas)}: se decide tras ejecutarla "
+                               f"(si sus salidas no cambian, sigue en cache)"]
+                print(f"{'✔' if estado == 'al día' else '•'} {nombre:<7} {estado}  "
+                      f"[{clave[:12]}]")
+                for m in motivos:
+                    print(f"      – {m}")
+                if estado in ("obsoleta", "pendiente"):
+                    pendientes.add(nombre)
+                continue
+
+            if args.adoptar:
+                registrar(nombre, clave, comp, hashes)
+                print(f"✔ {nombre}: salidas actuales registradas [{clave[:12]}]")
+            elif estado == "al día":
+                print(f"✔ {nombre}: al día [{clave[:12]}], no se ejecuta")
+            elif estado == "en cache" and restaurar(registro, hashes):
+                print(f"✔ {nombre}: restaurada desde la cache [{clave[:12]}]")
+            else:
+                print(f"▶ {nombre}: {'; '.join(motivos[:5])}"
+                      f"{' …' if len(motivos) > 5 else ''}")
+                segundos = ejecutar(nombre, extra)
+                registrar(nombre, clave, comp, hashes, segundos)
+                print(f"✔ {nombre}: {segundos:.1f} s, salidas registradas [{clave[:12]}]")
+    finally:
+        hashes.guardar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+# ====================================================================
+# REENTRENAMIENTO INCREMENTAL (Etapas 1 + 3 para lotes nuevos)
+# ====================================================================
+# En lugar de repetir etapa1 sobre todo data.csv y la búsqueda completa
+# de etapa3 con cada lote de respuestas nuevas:
+#
+#   1) Filas nuevas: las que hay desde el último offset de data.csv (el
+#      fichero solo crece), tengan el Timestamp que tengan. Si el fichero se
+#      ha reescrito (otra cabecera o más corto) no hay offset fiable: se
+#      relee entero y se toman las filas con Timestamp > último procesado.
+#   2) Limpieza: las estadísticas de LimpiezaEncuesta (medianas, percentiles
+#      y modas) se acumulan con limpieza_streaming.EstadisticasLimpieza y
+#      solo se actualizan con el lote. El lote se limpia con las
+#      estadísticas actualizadas y se añade a clean_data sin reescribir el
+#      histórico (almacen.anadir_limpio); las filas antiguas conservan su
+#      limpieza.
+#   3) Control: antes de tocar los modelos se mide
+#        – la deriva de Age / Hours per day / BPM (PSI del lote frente a los
+#          deciles del histórico) y las categorías nunca vistas,
+#        – la degradación: MAE del modelo actual en el lote frente a su MAE
+#          en el holdout de etapa3 (ver abajo), recalculado tras cada
+#          actualización.
+#      Si la deriva o la degradación superan su umbral, el modelo no se
+#      actualiza: se marca para búsqueda completa (entrenamiento.main con
+#      --filas-split, que conserva el mismo test).
+#   4) Actualización con los mejores hiperparámetros ya encontrados:
+#        – RandomForest: warm_start con árboles nuevos ajustados sobre el
+#          lote + una muestra del histórico; se descartan los árboles más
+#          antiguos para mantener n_estimators (bosque deslizante);
+#        – GradientBoosting / HistGradientBoosting: warm_start con etapas
+#          adicionales sobre la misma mezcla;
+#        – el resto (SVR, kNN, …) se reajusta con los hiperparámetros
+#          fijos, sin búsqueda, sobre una ventana acotada: el reservoir
+#          sample del histórico (≤ MUESTRA_MAX filas) + el lote.
+#      El nº de árboles / etapas nuevas es proporcional a la fracción de
+#      filas nuevas, y la mezcla es el lote + HISTORIA_POR_LOTE veces su
+#      tamaño sacado del reservoir sample (con una semilla que depende del
+#      offset del lote), así que el coste depende del tamaño del lote (y
+#      de MUESTRA_MAX), no del histórico.
+#
+# Holdout: las filas de test del split de etapa3 (esquema.indices_test
+# sobre las filas_split primeras filas de clean_data) se guardan en el
+# estado y nunca entran en el reservoir sample ni en ningún reajuste. Las
+# métricas test_* del manifiesto se recalculan sobre ellas tras cada
+# actualización, así que importancia.datos_test sigue siendo un test
+# limpio para los modelos actualizados.
+#
+# Uso (desde scripts/):
+#   python reentrenamiento.py --init          # estado inicial desde data.csv
+#   python reentrenamiento.py                 # procesa las filas nuevas
+# ====================================================================
+import argparse
+import io
+import math
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import (RandomForestRegressor, GradientBoostingRegressor,
+                              HistGradientBoostingRegressor)
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from almacen import CSV_PATH, PARQUET_PATH, anadir_limpio, concatenar_limpio
+from artefacto import ARTEFACTOS_DIR, exportar_artefacto, filas_split, leer_manifiesto
+from esquema import CAT_COLS, FEATURES, TARGET, cargar_datos, indices_test, separar_xy
+from limpieza_streaming import EstadisticasLimpieza
+from config_modelos import MODELOS, RANDOM_STATE
+
+RAW_PATH      = "../data/data.csv"
+ESTADO_PATH   = "../modelos/incremental/estado.joblib"
+LIMPIEZA_PATH = "../modelos/limpieza_etapa1.pkl"
+MODELOS_DIR   = "../modelos"
+
+UMBRAL_PSI         = 0.2     # PSI > 0.2: cambio de distribución relevante
+UMBRAL_DEGRADACION = 0.15    # MAE del lote > 15 % peor que la referencia
+MIN_FILAS_CONTROL  = 50      # por debajo, PSI y MAE del lote son solo ruido
+MUESTRA_MAX        = 5_000   # tamaño del reservoir sample del histórico
+HISTORIA_POR_LOTE  = 4       # filas históricas por fila nueva en el warm start
+COLUMNAS_PSI       = {"Age": "age", "Hours per day": "horas", "BPM": "bpm"}
+
+
+# ------------------------------------------------------------------
+# Deriva y actualización de modelos
+# ------------------------------------------------------------------
+def psi(sketch, valores, n_bins=10):
+    """
+    Population Stability Index de 'valores' frente al histórico del sketch,
+    con bins en los deciles del histórico (fusionados si hay empates).
+    """
+    v = pd.to_numeric(pd.Series(valores), errors="coerce").dropna().to_numpy()
+    if len(v) == 0 or sketch.vacio:
+        return 0.0
+    cortes = np.unique(sketch.cuantil(list(np.linspace(0, 100, n_bins + 1)[1:-1])))
+    historia = np.concatenate(sketch.niveles)
+    pesos = np.concatenate([np.full(len(b), 2.0**h) for h, b in enumerate(sketch.niveles)])
+    esperado = np.bincount(np.searchsorted(cortes, historia, side="right"),
+                           weights=pesos, minlength=len(cortes) + 1) / pesos.sum()
+    observado = np.bincount(np.searchsorted(cortes, v, side="right"),
+                            minlength=len(cortes) + 1) / len(v)
+    esperado, observado = np.clip(esperado, 1e-4, None), np.clip(observado, 1e-4, None)
+    return float(np.sum((observado - esperado) * np.log(observado / esperado)))
+
+
+def _extra(n_actual, n_lote, n_historia):
+    """Árboles / etapas nuevas en proporción a las filas nuevas (mínimo 1)."""
+    return max(1, math.ceil(n_actual * n_lote / max(n_historia, 1)))
+
+
+def actualizar_modelo(pipe, X, y, n_lote, n_historia, X_ventana, y_ventana):
+    """
+    Actualiza en sitio el pipeline (prep + model) con sus hiperparámetros
+    actuales. X, y es la mezcla lote + muestra del histórico; X_ventana,
+    y_ventana (reservoir sample + lote) es lo que se reajusta en los
+    modelos que no admiten warm start. Devuelve una descripción de la acción.
+    """
+    prep, model = pipe.named_steps["prep"], pipe.named_steps["model"]
+
+    if isinstance(model, RandomForestRegressor):
+        n = len(model.estimators_)
+        extra = min(_extra(n, n_lote, n_historia), n)
+        model.set_params(warm_start=True, n_estimators=n + extra).fit(prep.transform(X), y)
+        model.estimators_ = model.estimators_[extra:]
+        model.set_params(warm_start=False, n_estimators=n)
+        return f"warm start: {extra} árboles renovados"
+
+    if isinstance(model, GradientBoostingRegressor):
+        n = model.n_estimators_
+        extra = _extra(n, n_lote, n_historia)
+        model.set_params(warm_start=True, n_estimators=n + extra).fit(prep.transform(X), y)
+        model.set_params(warm_start=False)
+        return f"warm start: +{model.n_estimators_ - n} etapas"
+
+    if isinstance(model, HistGradientBoostingRegressor):
+        n = model.n_iter_
+        extra = _extra(n, n_lote, n_historia)
+        model.set_params(warm_start=True, max_iter=n + extra).fit(prep.transform(X), y)
+        model.set_params(warm_start=False)
+        return f"warm start: +{model.n_iter_ - n} iteraciones"
+
+    pipe.fit(X_ventana, y_ventana)
+    return f"reajuste sobre la ventana ({len(X_ventana)} filas, mismos hiperparámetros)"
+
+
+# ------------------------------------------------------------------
+# Estado persistente
+# ------------------------------------------------------------------
+class ReentrenadorIncremental:
+    """
+    Mantiene el estado entre lotes (estadísticas de limpieza, último
+    Timestamp y offset de data.csv, holdout de etapa3, reservoir sample
+    del resto del histórico limpio, categorías vistas y MAE de referencia
+    de cada modelo en el holdout) en ruta_estado.
+
+    modelos : nombres de config_modelos.MODELOS con <nombre>_best.pkl en
+              modelos_dir.
+    """
+
+    def __init__(self, modelos, ruta_raw=RAW_PATH, ruta_estado=ESTADO_PATH,
+                 modelos_dir=MODELOS_DIR, artefactos_dir=ARTEFACTOS_DIR,
+                 csv_limpio=CSV_PATH, parquet_limpio=PARQUET_PATH,
+                 limpieza_path=LIMPIEZA_PATH, umbral_psi=UMBRAL_PSI,
+                 umbral_degradacion=UMBRAL_DEGRADACION):
+        self.modelos = list(modelos)
+        self.ruta_raw = ruta_raw
+        self.ruta_estado = ruta_estado
+        self.modelos_dir = modelos_dir
+        self.artefactos_dir = artefactos_dir
+        self.csv_limpio = csv_limpio
+        self.parquet_limpio = parquet_limpio
+        self.limpieza_path = limpieza_path
+        self.umbral_psi = umbral_psi
+        self.umbral_degradacion = umbral_degradacion
+        self.estado = joblib.load(ruta_estado) if os.path.exists(ruta_estado) else None
+
+    def _ruta_modelo(self, nombre):
+        return os.path.join(self.modelos_dir, f"{nombre}_best.pkl")
+
+    def _cargar_limpio(self, columnas=FEATURES + [TARGET]):
+        return cargar_datos(columnas, csv_path=self.csv_limpio,
+                            parquet_path=self.parquet_limpio)
+
+    def _metricas_holdout(self, pipe):
+        """test_mae / test_rmse / test_r2 del pipeline en el holdout de etapa3."""
+        X, y = separar_xy(self.estado["holdout"])
+        pred = pipe.predict(X)
+        return {"test_mae": mean_absolute_error(y, pred),
+                "test_rmse": float(np.sqrt(mean_squared_error(y, pred))),
+                "test_r2": r2_score(y, pred)}
+
+    def refrescar_referencias(self):
+        """MAE de referencia de cada modelo en el holdout (tras una búsqueda completa)."""
+        self.estado["referencias"] = {
+            n: self._metricas_holdout(joblib.load(self._ruta_modelo(n)))["test_mae"]
+            for n in self.modelos if os.path.exists(self._ruta_modelo(n))}
+        self.guardar()
+
+    # ---------- Estado inicial (una pasada completa) ----------
+    def inicializar(self):
+        """Estado a partir de data.csv y del clean_data que generó etapa1."""
+        estadisticas = EstadisticasLimpieza()
+        raw = pd.read_csv(self.ruta_raw)
+        estadisticas.actualizar(raw)
+        limpio = self._cargar_limpio()
+        # Mismo test que la búsqueda de etapa3 de los modelos: fuera del reservoir
+        n_split = filas_split(self.modelos, self.artefactos_dir) or len(limpio)
+        test = indices_test(len(limpio), RANDOM_STATE, n_split)
+        historia = np.setdiff1d(np.arange(len(limpio)), test)
+        rng = np.random.default_rng(RANDOM_STATE)
+        muestra = limpio.iloc[np.sort(rng.permutation(historia)[:MUESTRA_MAX])]
+
+        with open(self.ruta_raw, "rb") as f:
+            cabecera = f.readline()
+        self.estado = {
+            "estadisticas": estadisticas,
+            "cabecera": cabecera,
+            "offset": os.path.getsize(self.ruta_raw),
+            "ultimo_ts": pd.to_datetime(raw["Timestamp"], errors="coerce").max(),
+            "n_historia": len(historia),
+            "filas_split": n_split,
+            "holdout": limpio.iloc[test].reset_index(drop=True),
+            "muestra": muestra.reset_index(drop=True),
+            "rng": rng,
+            "categorias": {c: set(limpio[c].dropna()) for c in CAT_COLS},
+        }
+        self.refrescar_referencias()
+        return self
+
+    def guardar(self):
+        os.makedirs(os.path.dirname(self.ruta_estado) or ".", exist_ok=True)
+        joblib.dump(self.estado, self.ruta_estado)
+
+    # ---------- Lote nuevo ----------
+    def _leer_nuevas(self):
+        est = self.estado
+        tipos = {c: float for c in est["estadisticas"].columnas_float}
+        tam = os.path.getsize(self.ruta_raw)
+        with open(self.ruta_raw, "rb") as f:
+            cabecera = f.readline()
+            anexado = cabecera == est["cabecera"] and est["offset"] <= tam
+            if anexado:
+                f.seek(est["offset"])
+                cuerpo = f.read()
+                df = (pd.read_csv(io.BytesIO(cabecera + cuerpo), dtype=tipos) if cuerpo.strip()
+                      else pd.read_csv(io.BytesIO(cabecera)))
+            else:
+                df = pd.read_csv(self.ruta_raw, dtype=tipos)     # fichero reescrito
+        ts = pd.to_datetime(df["Timestamp"], errors="coerce")
+        if not anexado:
+            # Sin offset, las filas nuevas son las posteriores al último Timestamp
+            nuevas = ~(ts <= est["ultimo_ts"])
+            df, ts = df[nuevas], ts[nuevas]
+        return df.reset_index(drop=True), cabecera, tam, ts.max()
+
+    def _actualizar_muestra(self, lote):
+        """
+        Reservoir sampling (algoritmo R) del histórico limpio. Las filas
+        del lote llenan primero los huecos libres; las demás sustituyen
+        posiciones de la muestra ya llena (incluidas las recién añadidas),
+        así que nunca pasa de MUESTRA_MAX filas.
+        """
+        est = self.estado
+        muestra, visto, rng = est["muestra"], est["n_historia"], est["rng"]
+        huecos = max(0, MUESTRA_MAX - len(muestra))
+        directas, resto = lote.iloc[:huecos], lote.iloc[huecos:]
+        muestra = concatenar_limpio([muestra, directas])
+        destino = rng.integers(0, visto + len(directas) + np.arange(len(resto)) + 1)
+        reemplazos = {}                                  # posición -> fila del lote
+        for fila in np.flatnonzero(destino < len(muestra)):
+            reemplazos[destino[fila]] = fila
+        mantener = np.setdiff1d(np.arange(len(muestra)), list(reemplazos))
+        est["muestra"] = concatenar_limpio([muestra.iloc[mantener],
+                                            resto.iloc[list(reemplazos.values())]])
+
+    def actualizar(self):
+        """
+        Procesa las filas nuevas de data.csv. Devuelve un dict con el nº de
+        filas, la deriva, una fila por modelo (acción, MAE del lote antes y
+        después, segundos) y la lista de modelos que necesitan búsqueda.
+        """
+        if self.estado is None or "holdout" not in self.estado:
+            raise RuntimeError(f"No hay estado (o es anterior al holdout) en "
+                               f"{self.ruta_estado}: ejecuta inicializar()")
+        t0 = time.perf_counter()
+        est = self.estado
+        nuevas, cabecera, offset, ultimo_ts = self._leer_nuevas()
+        informe = {"filas": len(nuevas), "deriva": {}, "modelos": [], "busqueda": []}
+        if len(nuevas) == 0:
+            est.update(cabecera=cabecera, offset=offset)
+            self.guardar()
+            informe["segundos"] = time.perf_counter() - t0
+            return informe
+
+        # 1) Deriva frente al histórico (antes de añadir el lote)
+        stats = est["estadisticas"]
+        if len(nuevas) >= MIN_FILAS_CONTROL:
+            informe["deriva"] = {col: psi(getattr(stats, attr), nuevas[col])
+                                 for col, attr in COLUMNAS_PSI.items()}
+
+        # 2) Limpieza incremental
+        stats.actualizar(nuevas)
+        limpieza = stats.limpieza()
+        lote = limpieza.transform(nuevas)
+        anadir_limpio(lote, csv_path=self.csv_limpio, parquet_path=self.parquet_limpio)
+        joblib.dump(limpieza, self.limpieza_path)
+        categorias_nuevas = {c: sorted(set(lote[c].dropna()) - est["categorias"][c])
+                             for c in CAT_COLS}
+        categorias_nuevas = {c: v for c, v in categorias_nuevas.items() if v}
+        informe["categorias_nuevas"] = categorias_nuevas
+        deriva = (bool(categorias_nuevas) or
+                  any(v > self.umbral_psi for v in informe["deriva"].values()))
+
+        # 3) Modelos
+        X_lote, y_lote = separar_xy(lote)
+        n_hist = min(len(est["muestra"]), HISTORIA_POR_LOTE * len(lote))
+        historia = est["muestra"].sample(n_hist, random_state=np.random.default_rng(
+            [RANDOM_STATE, offset]))
+        X_mezcla, y_mezcla = separar_xy(concatenar_limpio([lote[FEATURES + [TARGET]], historia]))
+        X_ventana, y_ventana = separar_xy(concatenar_limpio([est["muestra"],
+                                                             lote[FEATURES + [TARGET]]]))
+        n_historia = est["n_historia"] + len(lote)
+
+        for nombre in self.modelos:
+            t_modelo = time.perf_counter()
+            fila = {"Modelo": nombre, "Acción": "búsqueda completa",
+                    "MAE lote antes": np.nan, "MAE lote después": np.nan,
+                    "MAE holdout": np.nan}
+            referencia = est["referencias"].get(nombre)
+            pipe = joblib.load(self._ruta_modelo(nombre))
+            if not categorias_nuevas:
+                fila["MAE lote antes"] = mean_absolute_error(y_lote, pipe.predict(X_lote))
+            degradado = (referencia is not None and len(lote) >= MIN_FILAS_CONTROL and
+                         fila["MAE lote antes"] > referencia * (1 + self.umbral_degradacion))
+
+            if deriva or degradado:
+                informe["busqueda"].append(nombre)
+            else:
+                fila["Acción"] = actualizar_modelo(pipe, X_mezcla, y_mezcla, len(lote),
+                                                   n_historia, X_ventana, y_ventana)
+                fila["MAE lote después"] = mean_absolute_error(y_lote, pipe.predict(X_lote))
+                joblib.dump(pipe, self._ruta_modelo(nombre))
+                directorio = os.path.join(self.artefactos_dir, nombre)
+                try:
+                    metricas = leer_manifiesto(directorio)["metricas"]
+                except FileNotFoundError:
+                    metricas = {}
+                # Las test_* de la búsqueda ya no describen el modelo: se
+                # recalculan en el mismo holdout, que no ha visto
+                metricas.update(self._metricas_holdout(pipe), filas_split=est["filas_split"])
+                metricas["incremental"] = {"filas_historia": n_historia,
+                                           "ultimo_lote": len(lote),
+                                           "accion": fila["Acción"]}
+                est["referencias"][nombre] = metricas["test_mae"]
+                fila["MAE holdout"] = metricas["test_mae"]
+                exportar_artefacto(pipe, directorio, X_mezcla, y_mezcla, metricas=metricas)
+            fila["segundos"] = time.perf_counter() - t_modelo
+            informe["modelos"].append(fila)
+
+        # 4) Estado
+        self._actualizar_muestra(lote[FEATURES + [TARGET]])
+        for c in CAT_COLS:
+            est["categorias"][c] |= set(lote[c].dropna())
+        est.update(cabecera=cabecera, offset=offset, n_historia=n_historia,
+                   ultimo_ts=max(est["ultimo_ts"], ultimo_ts))
+        self.guardar()
+        informe["segundos"] = time.perf_counter() - t0
+        return informe
+
+
+# ------------------------------------------------------------------
+# Punto de entrada
+# ------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reentrenamiento incremental")
+    parser.add_argument("--init", action="store_true",
+                        help="crea el estado a partir de data.csv y clean_data actuales")
+    parser.add_argument("--modelos", nargs="+", metavar="NOMBRE",
+                        choices=[cfg["nombre"] for cfg in MODELOS],
+                        help="modelos a mantener (por defecto: los *_best.pkl existentes)")
+    parser.add_argument("--sin-busqueda", action="store_true",
+                        help="no lanza la búsqueda completa aunque se supere un umbral")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+
+    modelos = args.modelos or [cfg["nombre"] for cfg in MODELOS
+                               if os.path.exists(os.path.join(MODELOS_DIR,
+                                                              f"{cfg['nombre']}_best.pkl"))]
+    reentrenador = ReentrenadorIncremental(modelos)
+    if args.init or reentrenador.estado is None:
+        reentrenador.inicializar()
+        print(f"✔ Estado inicial: {reentrenador.estado['n_historia']} filas, "
+              f"último Timestamp {reentrenador.estado['ultimo_ts']}")
+        return
+
+    informe = reentrenador.actualizar()
+    print(f"▶ {informe['filas']} filas nuevas procesadas en {informe['segundos']:.2f} s")
+    if informe["deriva"]:
+        print("  PSI: " + ", ".join(f"{c} {v:.3f}" for c, v in informe["deriva"].items()))
+    if informe.get("categorias_nuevas"):
+        print(f"  Categorías nuevas: {informe['categorias_nuevas']}")
+    if informe["modelos"]:
+        print(pd.DataFrame(informe["modelos"]).round(3).to_string(index=False))
+
+    if informe["busqueda"] and not args.sin_busqueda:
+        from entrenamiento import main as entrenar_main
+        print(f"\n⚠️  Umbral superado: búsqueda completa para {informe['busqueda']}")
+        entrenar_main(["--modelos", *informe["busqueda"],
+                       "--filas-split", str(reentrenador.estado["filas_split"])])
+        reentrenador.refrescar_referencias()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# --------------------  SERVICIO LOCAL DE INFERENCIA  ---------------------
+# Servidor HTTP (solo biblioteca estándar, funciona sin red externa) que
+# carga una vez un pipeline de modelos/*_best.pkl y puntúa respuestas de
+# la encuesta a medida que llegan.
+#
+# Las peticiones concurrentes se agrupan en micro-lotes: un hilo recoge
+# filas de la cola hasta llenar max_batch o agotar max_espera_ms y hace
+# una sola llamada a predict() por lote.
+#
+# Endpoints:
+#   POST /predict   {"filas": [{<FEATURES>}, ...]}  o una sola fila {<FEATURES>}
+#                   -> {"predicciones": [...]}
+#   GET  /metricas  latencia p50/p99 (ms) de las últimas peticiones,
+#                   throughput (filas/s desde el arranque), tamaño
+#                   medio de lote, nº de peticiones y filas
+#   GET  /salud     modelo cargado y columnas esperadas
+#
+# Las filas se validan antes de encolarlas y los errores del cliente son
+# 400: columnas que faltan, numéricas nulas o no numéricas, y categorías
+# que el encoder del pipeline no conoce (OneHotEncoder sin
+# handle_unknown). Solo 'Hours_cat' admite null (0 h/día, como en etapa1).
+#
+# Uso (desde scripts/):
+#   python servicio_inferencia.py --modelo ../modelos/SVR_best.pkl --port 8000
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+
+from esquema import FEATURES, NUM_COLS, FREQ_COLS, ORD_COLS, CAT_COLS
+
+MODEL_PATH = "../modelos/SVR_best.pkl"
+VENTANA_METRICAS = 10_000          # últimas peticiones usadas para p50/p99
+
+
+NUMERICAS = NUM_COLS + FREQ_COLS
+TEXTO     = [c for c in FEATURES if c not in NUMERICAS]
+ADMITEN_NULL = list(ORD_COLS)      # Hours_cat es NaN cuando Hours per day = 0
+
+
+def _es_nulo(valor):
+    return valor is None or (isinstance(valor, float) and np.isnan(valor))
+
+
+def niveles_conocidos(modelo):
+    """
+    {columna: valores válidos} para las ordinales (las del esquema) y las
+    nominales (las categorías que aprendió el encoder del pipeline). Si el
+    modelo no es un Pipeline con ColumnTransformer, solo las ordinales.
+    """
+    niveles = {c: set(v) for c, v in ORD_COLS.items()}
+    prep = modelo[:-1][-1] if isinstance(modelo, Pipeline) and len(modelo) > 1 else None
+    if not isinstance(prep, ColumnTransformer):
+        return niveles
+    for _, transformador, columnas in prep.transformers_:
+        ultimo = transformador.steps[-1][1] if isinstance(transformador, Pipeline) else transformador
+        if not hasattr(ultimo, "categories_") or isinstance(columnas, str):
+            continue
+        for c, categorias in zip(columnas, ultimo.categories_):
+            if c in CAT_COLS:
+                niveles[c] = {v for v in categorias if not _es_nulo(v)}
+    return niveles
+
+
+def validar_filas(filas, niveles=None):
+    """
+    Comprueba filas JSON (dicts) contra el esquema: lanza ValueError si
+    falta alguna columna, si una numérica es null o no es un número, si una
+    columna que no admite null lo trae o si un valor de texto no está en
+    'niveles' ({columna: valores válidos}, ver niveles_conocidos).
+    """
+    if not isinstance(filas, list) or not all(isinstance(f, dict) for f in filas):
+        raise ValueError("se esperaba una fila (objeto JSON) o {\"filas\": [...]}")
+    faltan = sorted({c for fila in filas for c in FEATURES if c not in fila})
+    if faltan:
+        raise ValueError(f"faltan columnas del esquema: {faltan}")
+    nulas = sorted({c for fila in filas for c in FEATURES
+                    if c not in ADMITEN_NULL and _es_nulo(fila[c])})
+    if nulas:
+        raise ValueError(f"columnas con valores nulos: {nulas}")
+    malas = sorted({c for fila in filas for c in NUMERICAS
+                    if isinstance(fila[c], bool) or not isinstance(fila[c], (int, float))})
+    if malas:
+        raise ValueError(f"columnas numéricas con valores no numéricos: {malas}")
+    desconocidas = {}
+    for c, validos in (niveles or {}).items():
+        valores = {fila[c] for fila in filas if not _es_nulo(fila[c])}
+        fuera = sorted(map(str, {v for v in valores if v not in validos}))
+        if fuera:
+            desconocidas[c] = fuera
+    if desconocidas:
+        raise ValueError(f"categorías desconocidas para el modelo: {desconocidas}")
+
+
+def filas_a_dataframe(filas):
+    """
+    Convierte filas ya validadas en el DataFrame de FEATURES que espera el
+    pipeline. Las columnas extra se ignoran y null pasa a NaN (las de texto
+    se mantienen como object aunque el lote solo traiga nulos). Se construye
+    columna a columna con numpy: un DataFrame por lote, no por petición.
+    """
+    num = np.array([[f[c] for c in NUMERICAS] for f in filas], dtype=float)
+    txt = np.array([[np.nan if f[c] is None else f[c] for c in TEXTO] for f in filas],
+                   dtype=object).reshape(len(filas), len(TEXTO))
+    columnas = {c: num[:, i] for i, c in enumerate(NUMERICAS)}
+    columnas.update({c: txt[:, i] for i, c in enumerate(TEXTO)})
+    return pd.DataFrame(columnas, columns=FEATURES)
+
+
+class MicroBatcher:
+    """
+    Agrupa peticiones concurrentes en llamadas únicas a modelo.predict.
+
+    max_batch    : filas máximas por llamada a predict.
+    max_espera_ms: tiempo máximo que el primer elemento de un lote espera
+                   a que lleguen más filas.
+    """
+
+    def __init__(self, modelo, max_batch=64, max_espera_ms=2.0):
+        self.modelo = modelo
+        self.max_batch = max_batch
+        self.max_espera_ms = max_espera_ms
+        self._cola = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencias = deque(maxlen=VENTANA_METRICAS)
+        self._lotes = deque(maxlen=VENTANA_METRICAS)
+        self.peticiones = 0
+        self.filas = 0
+        self.inicio = time.perf_counter()
+        self._hilo = threading.Thread(target=self._bucle, daemon=True)
+        self._hilo.start()
+
+    # ---------- Interfaz ----------
+    def predecir(self, filas, t0=None):
+        """
+        Encola filas (dicts validados con validar_filas) y bloquea hasta
+        tener sus predicciones. t0 es el instante de llegada de la petición (para
+        que la latencia incluya el parseo); por defecto, ahora.
+        """
+        t0 = time.perf_counter() if t0 is None else t0
+        futuro = Future()
+        self._cola.put((filas, futuro))
+        preds = futuro.result()
+        with self._lock:
+            self._latencias.append(time.perf_counter() - t0)
+            self.peticiones += 1
+            self.filas += len(filas)
+        return preds
+
+    def metricas(self):
+        with self._lock:
+            lat = np.array(self._latencias) * 1000
+            lotes = np.array(self._lotes)
+            transcurrido = time.perf_counter() - self.inicio
+            return {
+                "peticiones":     self.peticiones,
+                "filas":          self.filas,
+                "p50_ms":         float(np.percentile(lat, 50)) if len(lat) else None,
+                "p99_ms":         float(np.percentile(lat, 99)) if len(lat) else None,
+                "throughput_fps": self.filas / transcurrido if transcurrido else 0.0,
+                "lote_medio":     float(lotes.mean()) if len(lotes) else None,
+                "llamadas_predict": len(lotes)
+            }
+
+    # ---------- Hilo de micro-lotes ----------
+    def _bucle(self):
+        while True:
+            pendientes = [self._cola.get()]
+            n = len(pendientes[0][0])
+            limite = time.perf_counter() + self.max_espera_ms / 1000
+            while n < self.max_batch:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    item = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                pendientes.append(item)
+                n += len(item[0])
+            self._procesar(pendientes, n)
+
+    def _procesar(self, pendientes, n):
+        try:
+            X = filas_a_dataframe([f for filas, _ in pendientes for f in filas])
+            preds = np.asarray(self.modelo.predict(X), dtype=float)
+        except Exception:
+            # Una petición defectuosa no debe tumbar el lote: se repite
+            # petición a petición y el error llega solo a la que falla.
+            for filas, futuro in pendientes:
+                try:
+                    X = filas_a_dataframe(filas)
+                    futuro.set_result(np.asarray(self.modelo.predict(X), dtype=float))
+                except Exception as exc:
+                    futuro.set_exception(exc)
+            with self._lock:
+                self._lotes.extend(len(filas) for filas, _ in pendientes)
+            return
+        with self._lock:
+            self._lotes.append(n)
+        inicio = 0
+        for filas, futuro in pendientes:
+            futuro.set_result(preds[inicio:inicio + len(filas)])
+            inicio += len(filas)
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128               # backlog de listen() para muchos clientes
+
+
+def crear_servidor(modelo, host="127.0.0.1", port=8000, max_batch=64,
+                   max_espera_ms=2.0, nombre_modelo=None):
+    """Devuelve (servidor, batcher); el servidor se arranca con serve_forever()."""
+    batcher = MicroBatcher(modelo, max_batch=max_batch, max_espera_ms=max_espera_ms)
+    niveles = niveles_conocidos(modelo)
+
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"          # conexiones keep-alive
+        disable_nagle_algorithm = True         # cabeceras y cuerpo van en dos write()
+
+        def _responder(self, codigo, cuerpo):
+            datos = json.dumps(cuerpo).encode()
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            if self.path == "/metricas":
+                self._responder(200, batcher.metricas())
+            elif self.path == "/salud":
+                self._responder(200, {"modelo": nombre_modelo, "columnas": FEATURES})
+            else:
+                self._responder(404, {"error": f"ruta desconocida: {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._responder(404, {"error": f"ruta desconocida: {self.path}"})
+                return
+            t0 = time.perf_counter()
+            try:
+                largo = int(self.headers.get("Content-Length", 0))
+                cuerpo = json.loads(self.rfile.read(largo))
+                filas = cuerpo["filas"] if "filas" in cuerpo else [cuerpo]
+                if not filas:
+                    raise ValueError("no se recibieron filas")
+                validar_filas(filas, niveles)
+            except (ValueError, TypeError) as exc:
+                self._responder(400, {"error": str(exc)})
+                return
+            try:
+                preds = batcher.predecir(filas, t0)
+            except Exception as exc:
+                self._responder(500, {"error": str(exc)})
+                return
+            self._responder(200, {"predicciones": preds.tolist()})
+
+        def log_message(self, *args):
+            pass                               # sin log por petición
+
+    servidor = _Servidor((host, port), Manejador)
+    return servidor, batcher
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio local de inferencia")
+    parser.add_argument("--modelo", default=MODEL_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-espera-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    modelo = joblib.load(args.modelo)
+    servidor, _ = crear_servidor(modelo, args.host, args.port, args.max_batch,
+                                 args.max_espera_ms, nombre_modelo=args.modelo)
+    print(f"✔ {args.modelo} cargado; escuchando en http://{args.host}:{args.port}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.shutdown()
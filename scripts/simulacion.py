@@ -0,0 +1,95 @@
+# --------------------  MOTOR MONTE CARLO VECTORIZADO  --------------------
+# Usado por etapa4.py. En lugar de muestrear, transformar y predecir en cada
+# iteración, se sortean todos los índices bootstrap de una vez, se predice
+# cada fila única del escenario una sola vez y las estadísticas por
+# iteración se calculan con reducciones de NumPy sobre el eje 1.
+import numpy as np
+import pandas as pd
+from sklearn.utils import check_random_state
+
+COLUMNAS_STATS = ["mean", "median", "p95", "p05", "std"]
+
+
+# --------------------  DEFINICIÓN DE ESCENARIOS  -------------------
+def escenario_baseline(df_in):
+    """Sin cambios: reproduce la distribución original"""
+    return df_in.copy()
+
+def escenario_mas_musica(df_in, incremento=10):
+    """+10 h de música al día (cap a 24 h)"""
+    df_out = df_in.copy()
+    df_out["Hours per day"] = np.clip(df_out["Hours per day"] + incremento, 0, 24)
+    return df_out
+
+def escenario_menos_musica(df_in, limite=0.5):
+    """Limita la escucha a ≤ media hora por día"""
+    df_out = df_in.copy()
+    df_out["Hours per day"] = np.minimum(df_out["Hours per day"], limite)
+    return df_out
+
+def escenario_while_working(df_in):
+    """Establece 'While working' siempre como True"""
+    df_out = df_in.copy()
+    df_out["While working"] = "Yes"
+    return df_out
+
+
+ESCENARIOS = {
+    "Baseline":           escenario_baseline,
+    "+10 h/día":          escenario_mas_musica,
+    "≤0.5 h/día":         escenario_menos_musica,
+    "Mientras trabajando": escenario_while_working
+}
+
+
+# --------------------  MOTOR VECTORIZADO  -------------------------
+def indices_bootstrap(n_filas, n_iter, batch_size, random_state=None):
+    """
+    Matriz (n_iter, batch_size) de índices posicionales con reemplazo.
+    Con la misma semilla produce exactamente los mismos índices que
+    n_iter llamadas sucesivas a df.sample(batch_size, replace=True).
+    """
+    rs = check_random_state(random_state)
+    return rs.choice(n_filas, size=(n_iter, batch_size), replace=True)
+
+
+def predecir_escenario(modelo, df_in, scenario_fn, features, filas=None):
+    """
+    Aplica el escenario a las filas indicadas (todas por defecto) y predice
+    cada una una única vez. Devuelve un vector alineado con df_in: las
+    posiciones no solicitadas quedan en NaN.
+    """
+    if filas is None:
+        filas = np.arange(len(df_in))
+    preds = np.full(len(df_in), np.nan)
+    sample_transformed = scenario_fn(df_in.iloc[filas])
+    X_sim = sample_transformed[features]
+    preds[filas] = modelo.predict(X_sim)
+    return preds
+
+
+def estadisticas_por_iteracion(preds):
+    """Estadísticas de cada fila de una matriz (n_iter, batch_size)."""
+    p05, p95 = np.percentile(preds, [5, 95], axis=1)
+    return pd.DataFrame({
+        "mean": np.mean(preds, axis=1),
+        "median": np.median(preds, axis=1),
+        "p95": p95,
+        "p05": p05,
+        "std": np.std(preds, axis=1)
+    })[COLUMNAS_STATS]
+
+
+def simular_vectorizado(modelo, df_in, scenario_fn, features,
+                        n_iter=500, batch_size=200, random_state=None):
+    """
+    Equivalente vectorizado del bucle Monte Carlo de etapa4:
+       – sortea los n_iter × batch_size índices de una vez,
+       – predice solo las filas únicas que aparecen en el sorteo,
+       – reconstruye cada muestra indexando el vector de predicciones.
+    Para una semilla fija el resultado coincide con el bucle original.
+    """
+    idx = indices_bootstrap(len(df_in), n_iter, batch_size, random_state)
+    filas = np.unique(idx)
+    preds = predecir_escenario(modelo, df_in, scenario_fn, features, filas)
+    return estadisticas_por_iteracion(preds[idx])
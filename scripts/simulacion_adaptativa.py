@@ -0,0 +1,199 @@
+# --------------------  MONTE CARLO ADAPTATIVO CON REDUCCIÓN DE VARIANZA  --
+# Lo que interesa de etapa4 es la diferencia de cada escenario con el
+# Baseline, no cada media por separado. Aquí:
+#   – números aleatorios comunes: todos los escenarios usan las mismas
+#     muestras bootstrap, así que la diferencia por iteración solo recoge el
+#     efecto del escenario (el ruido del sorteo se cancela);
+#   – muestreo estratificado opcional (estratos="Fav genre", "Hours_cat",
+#     ...): cada muestra toma de cada estrato un nº de filas proporcional a
+#     su tamaño (mínimo 1) y todas las estadísticas de la muestra (media,
+#     mediana, p05/p95 y std) se ponderan por estrato, de modo que siguen
+#     estimando las de la población sin la variación entre estratos;
+#   – variables antitéticas opcionales: las filas (de cada estrato) se
+#     ordenan por 'orden' (Anxiety observada, por defecto) y cada muestra
+#     u se empareja con 1 − u, que toma las filas del extremo opuesto;
+#     la unidad independiente pasa a ser la pareja;
+#   – parada adaptativa: se simulan bloques de 'bloque' iteraciones hasta
+#     que el IC (t, nivel) de la diferencia media de cada escenario con la
+#     referencia mide como mucho ancho_objetivo, o hasta max_iter;
+#   – solo se predicen las filas que aparecen por primera vez en cada
+#     bloque (todas las de todos los escenarios en una pasada, con
+#     escenarios_dsl.matriz_escenarios).
+#
+#   resultados, diferencias, info = simular_adaptativo(modelo, df, ESCENARIOS_DSL,
+#                                                      FEATURES, estratos="Fav genre")
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from escenarios_dsl import matriz_escenarios
+from esquema import TARGET
+from simulacion import COLUMNAS_STATS
+
+ANCHO_OBJETIVO = 0.01        # ancho total del IC de cada diferencia
+BLOQUE         = 50          # iteraciones entre comprobaciones
+MIN_ITER       = 100
+MAX_ITER       = 10_000
+
+
+# ------------------------------------------------------------------
+# Muestreo
+# ------------------------------------------------------------------
+def asignacion_estratos(df_in, estratos, batch_size, orden=TARGET):
+    """
+    [(filas del estrato ordenadas por 'orden', nº por muestra)] y pesos de
+    cada posición de la muestra (suman 1). Sin estratos, un único estrato
+    con todas las filas y pesos uniformes. Los NaN de 'estratos' forman su
+    propio estrato.
+    """
+    clave = df_in[orden].to_numpy() if orden is not None else np.zeros(len(df_in))
+    if estratos is None:
+        grupos = [np.arange(len(df_in))]
+    else:
+        codigos = pd.factorize(df_in[estratos], use_na_sentinel=False)[0]
+        grupos = [np.flatnonzero(codigos == c) for c in np.unique(codigos)]
+    if len(grupos) > batch_size:
+        raise ValueError(f"{len(grupos)} estratos en '{estratos}' y muestras de {batch_size} filas")
+
+    tamanos = np.array([len(g) for g in grupos])
+    # Asignación proporcional por restos mayores, con al menos 1 por estrato
+    cuota = batch_size * tamanos / tamanos.sum()
+    asignados = np.maximum(np.floor(cuota).astype(int), 1)
+    sobra = asignados - cuota
+    for i in np.argsort(sobra)[:max(batch_size - asignados.sum(), 0)]:
+        asignados[i] += 1
+    # El mínimo de 1 puede pasarse de batch_size: se quita de uno en uno al
+    # estrato más sobreasignado que aún tenga más de 1
+    while asignados.sum() > batch_size:
+        reducibles = np.flatnonzero(asignados > 1)
+        if len(reducibles) == 0:
+            raise ValueError(f"No caben {len(grupos)} estratos en muestras de {batch_size} filas")
+        asignados[reducibles[np.argmax((asignados - cuota)[reducibles])]] -= 1
+
+    pesos = np.concatenate([np.full(b, t / tamanos.sum() / b)
+                            for t, b in zip(tamanos, asignados)])
+    partes = [(g[np.argsort(clave[g], kind="stable")], b) for g, b in zip(grupos, asignados)]
+    return partes, pesos
+
+
+def sortear_bloque(rng, partes, n_iter, antitetico=False):
+    """
+    Matriz (n_iter, batch_size) de índices posicionales: u uniforme por
+    estrato y posición, índice = filas[floor(u · n_estrato)]. Con
+    antitetico, las iteraciones 2i y 2i+1 usan u y 1 − u.
+    """
+    n_u = n_iter // 2 if antitetico else n_iter
+    bloques = []
+    for filas, b in partes:
+        u = rng.random((n_u, b))
+        if antitetico:
+            u = np.stack([u, 1.0 - u], axis=1).reshape(n_iter, b)
+        bloques.append(filas[np.minimum((u * len(filas)).astype(int), len(filas) - 1)])
+    return np.concatenate(bloques, axis=1)
+
+
+def estadisticas_ponderadas(preds, pesos):
+    """
+    Como simulacion.estadisticas_por_iteracion, con la columna j de preds
+    (n_iter, batch_size) ponderada por pesos[j] (suman 1). Cuantiles por
+    interpolación lineal entre los puntos medios del peso acumulado de los
+    valores ordenados, reescalados a [0, 1]; con pesos iguales coinciden
+    con np.percentile y np.std.
+    """
+    orden = np.argsort(preds, axis=1, kind="stable")
+    ordenadas = np.take_along_axis(preds, orden, axis=1)
+    w = pesos[orden]
+    medio = np.cumsum(w, axis=1) - w / 2
+    medio -= medio[:, :1]
+    posicion = medio / np.maximum(medio[:, -1:], np.finfo(float).tiny)
+
+    def cuantil(q):
+        return np.array([np.interp(q, p, v) for p, v in zip(posicion, ordenadas)])
+
+    media = preds @ pesos
+    return pd.DataFrame({
+        "mean": media,
+        "median": cuantil(0.5),
+        "p95": cuantil(0.95),
+        "p05": cuantil(0.05),
+        "std": np.sqrt((preds - media[:, None]) ** 2 @ pesos)
+    })[COLUMNAS_STATS]
+
+
+# ------------------------------------------------------------------
+# Motor
+# ------------------------------------------------------------------
+def intervalo_diferencias(medias, nombres, referencia, nivel=0.95, antitetico=False):
+    """
+    DataFrame con la diferencia media de cada escenario con la referencia,
+    su IC t y el ancho. medias: (escenarios, iteraciones). Con antitetico
+    la unidad independiente es la pareja de iteraciones.
+    """
+    j_ref = nombres.index(referencia)
+    filas = []
+    for j, nombre in enumerate(nombres):
+        if j == j_ref:
+            continue
+        d = medias[j] - medias[j_ref]
+        if antitetico:
+            d = d.reshape(-1, 2).mean(axis=1)
+        media, se = d.mean(), d.std(ddof=1) / np.sqrt(len(d))
+        t = stats.t.ppf((1 + nivel) / 2, len(d) - 1)
+        filas.append({"Escenario": nombre, "Diferencia": media,
+                      "IC inf": media - t * se, "IC sup": media + t * se,
+                      "Ancho IC": 2 * t * se})
+    return pd.DataFrame(filas)
+
+
+def simular_adaptativo(modelo, df_in, escenarios, features, referencia="Baseline",
+                       batch_size=200, ancho_objetivo=ANCHO_OBJETIVO, nivel=0.95,
+                       estratos=None, antitetico=False, orden=TARGET, bloque=BLOQUE,
+                       min_iter=MIN_ITER, max_iter=MAX_ITER, random_state=None):
+    """
+    Monte Carlo de todos los escenarios ({nombre: Escenario}) con números
+    aleatorios comunes, estratificación/antitéticas opcionales y parada
+    cuando el IC de cada diferencia con 'referencia' mide ≤ ancho_objetivo.
+
+    Devuelve (resultados {nombre: DataFrame de estadísticas por iteración,
+    como simular_barrido, ponderadas por estrato (estadisticas_ponderadas)},
+    diferencias (ver intervalo_diferencias), info con iteraciones, ancho
+    máximo alcanzado, si convergió, filas predichas y segundos).
+    """
+    if referencia not in escenarios:
+        raise ValueError(f"La referencia {referencia!r} no está entre los escenarios")
+    if antitetico and bloque % 2:
+        raise ValueError("Con antitetico, 'bloque' debe ser par")
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(random_state)
+    nombres = list(escenarios)
+    partes, pesos = asignacion_estratos(df_in, estratos, batch_size, orden)
+    preds = np.full((len(nombres), len(df_in)), np.nan)
+
+    por_bloque, medias = [], np.empty((len(nombres), 0))
+    while True:
+        idx = sortear_bloque(rng, partes, bloque, antitetico)
+        nuevas = np.unique(idx)
+        nuevas = nuevas[np.isnan(preds[0, nuevas])]
+        if len(nuevas):
+            X = matriz_escenarios(df_in, escenarios, features, nuevas)
+            preds[:, nuevas] = np.asarray(modelo.predict(X)).reshape(len(nombres), len(nuevas))
+        muestras = preds[:, idx]                        # (escenarios, bloque, batch_size)
+        stats_bloque = [estadisticas_ponderadas(m, pesos) for m in muestras]
+        por_bloque.append(stats_bloque)
+        medias = np.concatenate([medias, [e["mean"].to_numpy() for e in stats_bloque]], axis=1)
+
+        diferencias = intervalo_diferencias(medias, nombres, referencia, nivel, antitetico)
+        ancho = diferencias["Ancho IC"].max() if len(diferencias) else 0.0
+        n_iter = medias.shape[1]
+        if (n_iter >= min_iter and ancho <= ancho_objetivo) or n_iter + bloque > max_iter:
+            break
+
+    resultados = {nombre: pd.concat([b[j] for b in por_bloque], ignore_index=True)
+                  for j, nombre in enumerate(nombres)}
+    info = {"iteraciones": n_iter, "ancho_max": ancho,
+            "convergido": bool(ancho <= ancho_objetivo),
+            "filas_predichas": int(np.isfinite(preds).sum()),
+            "segundos": time.perf_counter() - t0}
+    return resultados, diferencias, info
@@ -0,0 +1,116 @@
+# --------------------  SIMULACIÓN MONTE CARLO EN PARALELO  ---------------
+# Reparte escenarios × shards de iteraciones en un ProcessPoolExecutor.
+#
+#   – El modelo se carga una sola vez por worker (en el initializer), desde
+#     el artefacto compacto con arrays mapeados en memoria si existe (ver
+#     artefacto.py) o desde el pickle; nunca viaja serializado por tarea.
+#   – Los datos también se envían una vez por worker, y cada worker
+#     recuerda por escenario las filas que ya predijo: entre shards solo se
+#     predicen filas nuevas (como simular_vectorizado, que predice cada
+#     fila única una vez).
+#   – Cada shard tiene una semilla propia derivada de
+#     SeedSequence(random_state, spawn_key=(escenario, shard)) y el tamaño
+#     de shard es fijo, así que el resultado es idéntico con cualquier
+#     número de workers (no coincide con simular_vectorizado, que usa un
+#     único flujo aleatorio).
+#   – Cada shard devuelve sus estadísticas por iteración (mean, median,
+#     p95, p05, std) y el nº de predicciones; se concatenan en orden de
+#     shard para formar el mismo DataFrame (n_iter filas) que devuelve
+#     simulacion.simular_vectorizado.
+#
+#   resultados, info = simular_paralelo("../modelos/artefactos/SVR", ESCENARIOS, df)
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from artefacto import cargar_artefacto
+from esquema import FEATURES
+from simulacion import predecir_escenario, estadisticas_por_iteracion
+
+ITER_POR_SHARD = 50
+
+# Estado de cada worker (se rellena una vez en el initializer)
+_WORKER = {}
+
+
+def cargar_modelo(ruta):
+    """Directorio de artefacto -> cargar_artefacto (mmap); fichero -> joblib (mmap)."""
+    if os.path.isdir(ruta):
+        return cargar_artefacto(ruta)
+    return joblib.load(ruta, mmap_mode="r")
+
+
+def _init_worker(ruta_modelo, df):
+    warnings.filterwarnings("ignore")
+    threadpool_limits(1)
+    _WORKER["modelo"] = cargar_modelo(ruta_modelo)
+    _WORKER["df"] = df
+    _WORKER["preds"] = {}
+
+
+def _tarea_shard(nombre, scenario_fn, semilla, n_iter, batch_size):
+    """
+    Simula n_iter iteraciones de un escenario con su propia semilla.
+    Devuelve (estadísticas por iteración, filas nuevas pasadas por el modelo).
+    """
+    df = _WORKER["df"]
+    rng = np.random.default_rng(semilla)
+    idx = rng.integers(len(df), size=(n_iter, batch_size))
+    preds = _WORKER["preds"].setdefault(nombre, np.full(len(df), np.nan))
+    filas = np.unique(idx)
+    nuevas = filas[np.isnan(preds[filas])]
+    if len(nuevas):
+        preds[nuevas] = predecir_escenario(_WORKER["modelo"], df, scenario_fn,
+                                           FEATURES, nuevas)[nuevas]
+    return estadisticas_por_iteracion(preds[idx]), len(nuevas)
+
+
+def semillas_shards(random_state, i_escenario, n_shards):
+    """Semillas deterministas de los shards de un escenario."""
+    return [np.random.SeedSequence(random_state, spawn_key=(i_escenario, s))
+            for s in range(n_shards)]
+
+
+def simular_paralelo(ruta_modelo, escenarios, df, n_iter=500, batch_size=200,
+                     random_state=42, n_workers=None, iter_por_shard=ITER_POR_SHARD):
+    """
+    Ejecuta todos los escenarios ({nombre: función}) en paralelo.
+
+    Devuelve (resultados, info): resultados es {nombre: DataFrame con las
+    estadísticas de cada iteración}; info incluye el nº de workers y de
+    shards, las muestras simuladas (n_iter × batch_size por escenario), las
+    filas pasadas por el modelo, el tiempo de reloj y los throughputs
+    (muestras/s y predicciones del modelo/s).
+    Las funciones de escenario deben ser importables (nivel de módulo).
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    tamanos = [min(iter_por_shard, n_iter - i) for i in range(0, n_iter, iter_por_shard)]
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(ruta_modelo, df)) as pool:
+        futuros = {
+            nombre: [pool.submit(_tarea_shard, nombre, fn, semilla, n, batch_size)
+                     for semilla, n in zip(semillas_shards(random_state, i, len(tamanos)),
+                                           tamanos)]
+            for i, (nombre, fn) in enumerate(escenarios.items())
+        }
+        resultados, filas_modelo = {}, 0
+        for nombre, shards in futuros.items():
+            partes = [f.result() for f in shards]
+            resultados[nombre] = pd.concat([p[0] for p in partes], ignore_index=True)
+            filas_modelo += sum(p[1] for p in partes)
+    segundos = time.perf_counter() - t0
+
+    muestras = len(escenarios) * n_iter * batch_size
+    info = {"workers": n_workers, "shards": len(escenarios) * len(tamanos),
+            "muestras": muestras, "filas_modelo": filas_modelo, "segundos": segundos,
+            "muestras_por_s": muestras / segundos,
+            "predicciones_por_s": filas_modelo / segundos}
+    return resultados, info
@@ -0,0 +1,54 @@
+# --------------------  TESTS: BÚSQUEDA REPARTIDA EN TAREAS  ----------------
+# entrenamiento.entrenar reparte "random" y "halving" en tareas
+# (configuración × fold) y debe elegir lo mismo que la búsqueda secuencial
+# de busqueda.crear_busqueda con la misma semilla.
+#
+# Uso (desde scripts/):  python -m pytest -q test_busqueda.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.model_selection import KFold
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from busqueda import RondasHalving, crear_busqueda
+from config_modelos import N_ITER_RANDOM, RANDOM_STATE
+from entrenamiento import entrenar
+
+CASOS = {
+    "kNN": (KNeighborsRegressor(), {"model__n_neighbors": [3, 5, 7, 9, 11],
+                                    "model__weights": ["uniform", "distance"],
+                                    "model__p": [1, 2]}),
+    "GB": (GradientBoostingRegressor(random_state=RANDOM_STATE),
+           {"model__n_estimators": [16, 32], "model__learning_rate": [0.05, 0.1, 0.3],
+            "model__max_depth": [2, 3]}),
+}
+
+
+def _datos():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(1200, 4)), columns=list("abcd"))
+    y = pd.Series(X["a"] * 2 - X["b"] ** 2 + rng.normal(scale=0.3, size=len(X)))
+    return X, y
+
+
+@pytest.mark.parametrize("estrategia", ["random", "halving"])
+@pytest.mark.parametrize("nombre", list(CASOS))
+def test_igual_que_la_busqueda_secuencial(nombre, estrategia):
+    X, y = _datos()
+    est, grid = CASOS[nombre]
+    cv = KFold(n_splits=3, shuffle=True, random_state=RANDOM_STATE)
+    ref = crear_busqueda(estrategia, Pipeline([("prep", StandardScaler()), ("model", est)]),
+                         grid, cv, n_jobs=1, random_state=RANDOM_STATE,
+                         n_iter=N_ITER_RANDOM).fit(X, y)
+
+    cfg = {"nombre": nombre, "estimator": est, "param_grid": grid}
+    res, = entrenar([cfg], X, y, StandardScaler(), cv, n_workers=2, busqueda=estrategia)
+
+    assert res["params"] == ref.best_params_
+    assert res["cv_mae"] == pytest.approx(-ref.best_score_)
+    if estrategia == "halving":
+        plan = RondasHalving(grid, len(X), 3)
+        assert plan.recursos == ref.n_resources_
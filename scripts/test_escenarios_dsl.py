@@ -0,0 +1,38 @@
+# --------------------  TESTS: ESCENARIOS DECLARATIVOS  ---------------------
+# Un escenario que mueve Hours per day recalcula Hours_cat (limpieza.DERIVADAS),
+# tanto como función (esc(df)) como en la matriz de una sola pasada.
+#
+# Uso (desde scripts/):  python -m pytest -q test_escenarios_dsl.py
+import numpy as np
+import pandas as pd
+
+from escenarios_dsl import Escenario, matriz_escenarios
+from limpieza import categoria_horas
+
+HORAS = [0.5, 2.0, 4.0, 8.0]
+SHIFT = Escenario([{"op": "shift", "col": "Hours per day", "valor": 2.5}], nombre="+2.5 h")
+
+
+def _df():
+    horas = pd.Series(HORAS)
+    return pd.DataFrame({"Hours per day": horas, "Hours_cat": categoria_horas(horas),
+                         "BPM": [100.0] * len(HORAS)})
+
+
+def test_shift_recalcula_hours_cat():
+    df = _df()
+    out = SHIFT(df)
+    assert out["Hours per day"].tolist() == [3.0, 4.5, 6.5, 10.5]
+    assert out["Hours_cat"].tolist() == ["1-3 h", "3-6 h", ">6 h", ">6 h"]
+    assert df["Hours_cat"].tolist() == ["≤1 h", "1-3 h", "3-6 h", ">6 h"]   # sin tocar
+
+
+def test_matriz_escenarios_recalcula_hours_cat():
+    df = _df()
+    base = Escenario([], nombre="Baseline")
+    X = matriz_escenarios(df, {"Baseline": base, "+2.5 h": SHIFT}, list(df.columns),
+                          np.arange(len(df)))
+    n = len(df)
+    assert X["Hours_cat"].iloc[:n].tolist() == ["≤1 h", "1-3 h", "3-6 h", ">6 h"]
+    assert X["Hours_cat"].iloc[n:].tolist() == ["1-3 h", "3-6 h", ">6 h", ">6 h"]
+    assert X["BPM"].tolist() == [100.0] * 2 * n
@@ -0,0 +1,40 @@
+# --------------------  TESTS: kNN APROXIMADO  ------------------------------
+# kneighbors nunca devuelve huecos (índice -1 / distancia inf): si k supera
+# los candidatos que el bosque garantiza por consulta, ValueError como
+# KNeighborsRegressor.
+#
+# Uso (desde scripts/):  python -m pytest -q test_knn_aproximado.py
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsRegressor
+
+from knn_aproximado import KNNAproximado
+
+
+def _datos(n):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n, 3))
+    return X, X[:, 0] + rng.normal(scale=0.1, size=n)
+
+
+def test_vecinos_validos():
+    X, y = _datos(500)
+    knn = KNNAproximado(n_neighbors=5, tam_hoja=16, random_state=0).fit(X, y)
+    dist, ind = knn.kneighbors(X[:50], n_neighbors=knn.min_candidatos_)
+    assert (ind >= 0).all() and np.isfinite(dist).all()
+    assert knn.min_candidatos_ >= 8
+
+
+def test_k_mayor_que_la_hoja():
+    X, y = _datos(500)
+    knn = KNNAproximado(n_neighbors=5, tam_hoja=16, random_state=0).fit(X, y)
+    with pytest.raises(ValueError):
+        knn.kneighbors(X[:5], n_neighbors=knn.min_candidatos_ + 1)
+
+
+def test_train_menor_que_k():
+    X, y = _datos(3)
+    with pytest.raises(ValueError):
+        KNeighborsRegressor(n_neighbors=5).fit(X, y).predict(X)
+    with pytest.raises(ValueError):
+        KNNAproximado(n_neighbors=5, random_state=0).fit(X, y).predict(X)
@@ -0,0 +1,64 @@
+# --------------------  TESTS: LIMPIEZA EN STREAMING  -----------------------
+# La limpieza por bloques reescribe el CSV y el Parquet tipado juntos, así
+# que leer_limpio (que prefiere el Parquet) ve el resultado y no uno viejo.
+#
+# Uso (desde scripts/):  python -m pytest -q test_limpieza_streaming.py
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from almacen import anadir_limpio, guardar_limpio, guardar_limpio_por_bloques, leer_limpio
+from limpieza_streaming import limpiar_csv_streaming
+
+RAW_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "data.csv")
+
+
+def _normalizar(df):
+    return df.astype(str).reset_index(drop=True)
+
+
+def test_reescribe_el_parquet(tmp_path):
+    csv, parquet = str(tmp_path / "clean_data.csv"), str(tmp_path / "clean_data.parquet")
+    raw = pd.read_csv(RAW_PATH)
+    # Export anterior + un lote incremental: ambos deben quedar sustituidos
+    viejo = pd.DataFrame({"Age": [1.0], "Anxiety": [0.0]})
+    guardar_limpio(viejo, csv, parquet)
+    anadir_limpio(viejo, csv, parquet)
+
+    limpieza = limpiar_csv_streaming(RAW_PATH, csv, chunksize=200)
+    esperado = limpieza.transform(raw)
+    leido = leer_limpio(csv_path=csv, parquet_path=parquet)
+
+    pd.testing.assert_frame_equal(_normalizar(leido), _normalizar(esperado))
+    pd.testing.assert_frame_equal(pd.read_csv(csv),
+                                  pd.read_csv(io.StringIO(esperado.to_csv(index=False))))
+    assert leido["Fav genre"].dtype == "category"
+    assert str(leido["Frequency [Rock]"].dtype) == "Int8"
+    assert leido["Timestamp"].dtype == "datetime64[ns]"
+    assert not os.listdir(tmp_path / "clean_data_lotes")
+
+
+def test_bloque_posterior_con_mas_categorias(tmp_path):
+    csv, parquet = str(tmp_path / "c.csv"), str(tmp_path / "c.parquet")
+    bloques = [pd.DataFrame({"g": pd.Categorical(["a", "b"])}),
+               pd.DataFrame({"g": pd.Categorical([f"c{i}" for i in range(300)])})]
+    assert guardar_limpio_por_bloques(iter(bloques), csv, parquet) == 302
+    leido = leer_limpio(csv_path=csv, parquet_path=parquet)
+    assert leido["g"].astype(str).tolist() == ["a", "b"] + [f"c{i}" for i in range(300)]
+
+
+def test_error_no_toca_los_ficheros(tmp_path):
+    csv, parquet = str(tmp_path / "c.csv"), str(tmp_path / "c.parquet")
+    guardar_limpio(pd.DataFrame({"x": [1.0]}), csv, parquet)
+
+    def bloques():
+        yield pd.DataFrame({"x": np.arange(3.0)})
+        raise RuntimeError("bloque corrupto")
+
+    with pytest.raises(RuntimeError):
+        guardar_limpio_por_bloques(bloques(), csv, parquet)
+    assert leer_limpio(csv_path=csv, parquet_path=parquet)["x"].tolist() == [1.0]
+    assert sorted(os.listdir(tmp_path)) == ["c.csv", "c.parquet"]
@@ -0,0 +1,46 @@
+# --------------------  TESTS: CACHE DE ETAPAS  -----------------------------
+# La fecha y los CPU-s del manifest.json de un artefacto no forman parte de
+# la clave de etapa4: re-exportar el mismo modelo no la invalida.
+#
+# Uso (desde scripts/):  python -m pytest -q test_pipeline.py
+import copy
+import json
+
+from pipeline import Hashes
+
+MANIFIESTO = {"creado": "2026-01-01T00:00:00", "modelo": {"sha1": "abc"},
+              "metricas": {"cpu_s": 12.5, "test_mae": 1.8, "filas_split": 100}}
+
+
+def _hash(tmp_path, nombre, obj):
+    directorio = tmp_path / nombre
+    directorio.mkdir()
+    ruta = directorio / "manifest.json"
+    ruta.write_text(json.dumps(obj), encoding="utf-8")
+    return Hashes(ruta=str(tmp_path / "hashes.json")).entrada(str(ruta))
+
+
+def test_manifiesto_ignora_campos_volatiles(tmp_path):
+    base = _hash(tmp_path, "base", MANIFIESTO)
+
+    reexportado = copy.deepcopy(MANIFIESTO)
+    reexportado["creado"] = "2026-10-18T12:00:00"
+    reexportado["metricas"]["cpu_s"] = 99.0
+    assert _hash(tmp_path, "reexportado", reexportado) == base
+
+    otro_split = copy.deepcopy(MANIFIESTO)
+    otro_split["metricas"]["filas_split"] = 90
+    assert _hash(tmp_path, "otro_split", otro_split) != base
+
+    otro_modelo = copy.deepcopy(MANIFIESTO)
+    otro_modelo["modelo"]["sha1"] = "def"
+    assert _hash(tmp_path, "otro_modelo", otro_modelo) != base
+
+
+def test_otros_ficheros_por_contenido(tmp_path):
+    hashes = Hashes(ruta=str(tmp_path / "hashes.json"))
+    ruta = tmp_path / "datos.json"
+    ruta.write_text('{"creado": 1}', encoding="utf-8")
+    antes = hashes.entrada(str(ruta))
+    ruta.write_text('{"creado": 22}', encoding="utf-8")
+    assert hashes.entrada(str(ruta)) != antes
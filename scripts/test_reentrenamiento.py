@@ -0,0 +1,155 @@
+# --------------------  TESTS: REENTRENAMIENTO INCREMENTAL  ----------------
+# Reservoir sample acotado a MUESTRA_MAX y lectura de filas nuevas de
+# data.csv (por offset si el fichero solo ha crecido, por Timestamp si se
+# ha reescrito).
+#
+# Holdout de etapa3 fuera del reservoir y de los reajustes (SVR / kNN sobre
+# una ventana acotada), con las test_* del manifiesto recalculadas en él.
+#
+# Uso (desde scripts/):  python -m pytest -q test_reentrenamiento.py
+import os
+import shutil
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import mean_absolute_error
+
+import reentrenamiento
+from artefacto import leer_manifiesto
+from config_modelos import RANDOM_STATE
+from esquema import FEATURES, cargar_datos, particion_test, separar_xy
+from reentrenamiento import ReentrenadorIncremental
+
+CSV_CABECERA = "Timestamp,Age\n"
+
+
+def _reentrenador(tmp_path, estado):
+    r = ReentrenadorIncremental([], ruta_raw=str(tmp_path / "data.csv"),
+                                ruta_estado=str(tmp_path / "estado.joblib"))
+    r.estado = estado
+    return r
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_muestra_no_supera_maximo(tmp_path, monkeypatch, semilla):
+    monkeypatch.setattr(reentrenamiento, "MUESTRA_MAX", 10)
+    historia = pd.DataFrame({"x": np.arange(7)})
+    r = _reentrenador(tmp_path, {"muestra": historia, "n_historia": len(historia),
+                                 "rng": np.random.default_rng(semilla)})
+
+    # Lote mayor que los 3 huecos libres
+    r._actualizar_muestra(pd.DataFrame({"x": np.arange(100, 120)}))
+    assert len(r.estado["muestra"]) <= 10
+    assert len(r.estado["muestra"]) == 10
+    assert r.estado["muestra"]["x"].is_unique
+
+    r.estado["n_historia"] += 20
+    r._actualizar_muestra(pd.DataFrame({"x": np.arange(200, 205)}))
+    assert len(r.estado["muestra"]) == 10
+
+
+def _escribir(ruta, filas, modo="w"):
+    with open(ruta, modo) as f:
+        if modo == "w":
+            f.write(CSV_CABECERA)
+        f.writelines(f"{ts},{edad}\n" for ts, edad in filas)
+
+
+def _estado_csv(ruta, ultimo_ts):
+    with open(ruta, "rb") as f:
+        cabecera = f.readline()
+    return {"estadisticas": SimpleNamespace(columnas_float=["Age"]), "cabecera": cabecera,
+            "offset": ruta.stat().st_size, "ultimo_ts": pd.Timestamp(ultimo_ts)}
+
+
+def test_anexadas_con_timestamp_empatado_o_anterior(tmp_path):
+    ruta = tmp_path / "data.csv"
+    _escribir(ruta, [("2022-09-01 10:00:00", 20), ("2022-09-01 11:00:00", 21)])
+    r = _reentrenador(tmp_path, _estado_csv(ruta, "2022-09-01 11:00:00"))
+
+    _escribir(ruta, [("2022-09-01 11:00:00", 30), ("2022-09-01 09:00:00", 31),
+                     ("2022-09-01 12:00:00", 32)], modo="a")
+    nuevas, _, offset, ultimo = r._leer_nuevas()
+    assert nuevas["Age"].tolist() == [30, 31, 32]
+    assert offset == ruta.stat().st_size
+    assert ultimo == pd.Timestamp("2022-09-01 12:00:00")
+
+
+def test_fichero_reescrito_filtra_por_timestamp(tmp_path):
+    ruta = tmp_path / "data.csv"
+    _escribir(ruta, [("2022-09-01 10:00:00", 20), ("2022-09-01 11:00:00", 21)])
+    r = _reentrenador(tmp_path, _estado_csv(ruta, "2022-09-01 11:00:00"))
+
+    # Reescrito y más corto que el offset guardado: se relee entero
+    _escribir(ruta, [("2022-09-01 11:00:00", 1), ("2022-09-01 12:00:00", 2)])
+    nuevas, _, _, _ = r._leer_nuevas()
+    assert nuevas["Age"].tolist() == [2]
+
+
+# --------------------  Holdout de etapa3 y ventana de reajuste  ------------
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MODELOS_VENTANA = ["SVR", "kNN"]
+
+
+@pytest.fixture
+def entorno(tmp_path):
+    rutas = {"ruta_raw": tmp_path / "data.csv", "ruta_estado": tmp_path / "estado.joblib",
+             "modelos_dir": tmp_path / "modelos", "artefactos_dir": tmp_path / "artefactos",
+             "csv_limpio": tmp_path / "clean_data.csv",
+             "parquet_limpio": tmp_path / "clean_data.parquet",
+             "limpieza_path": tmp_path / "limpieza.pkl"}
+    shutil.copy(os.path.join(RAIZ, "data", "data.csv"), rutas["ruta_raw"])
+    shutil.copy(os.path.join(RAIZ, "data", "clean_data.csv"), rutas["csv_limpio"])
+    shutil.copy(os.path.join(RAIZ, "data", "clean_data.parquet"), rutas["parquet_limpio"])
+    os.makedirs(rutas["modelos_dir"])
+    for nombre in MODELOS_VENTANA:
+        shutil.copy(os.path.join(RAIZ, "modelos", f"{nombre}_best.pkl"), rutas["modelos_dir"])
+        shutil.copytree(os.path.join(RAIZ, "modelos", "artefactos", nombre),
+                        rutas["artefactos_dir"] / nombre)
+    return {k: str(v) for k, v in rutas.items()}
+
+
+def _reentrenador_real(rutas):
+    return ReentrenadorIncremental(MODELOS_VENTANA, umbral_psi=np.inf,
+                                   umbral_degradacion=np.inf, **rutas)
+
+
+def test_holdout_fuera_del_reservoir_y_de_los_reajustes(entorno):
+    limpio = cargar_datos(csv_path=entorno["csv_limpio"], parquet_path=entorno["parquet_limpio"])
+    X, y = separar_xy(limpio)
+    _, X_test, _, _ = particion_test(X, y, RANDOM_STATE)
+
+    r = _reentrenador_real(entorno).inicializar()
+    est = r.estado
+    pd.testing.assert_frame_equal(est["holdout"][FEATURES], X_test.reset_index(drop=True))
+    assert len(est["muestra"]) == est["n_historia"] == len(limpio) - len(X_test)
+    manifiesto = leer_manifiesto(os.path.join(entorno["artefactos_dir"], "SVR"))
+    assert est["referencias"]["SVR"] == pytest.approx(manifiesto["metricas"]["test_mae"])
+
+    # Lote de 60 respuestas con Timestamps posteriores
+    raw = pd.read_csv(entorno["ruta_raw"])
+    lote = raw.iloc[:60].copy()
+    lote["Timestamp"] = (pd.Timestamp("2023-01-01") + pd.to_timedelta(np.arange(60), unit="min")
+                         ).strftime("%m/%d/%Y %H:%M:%S")
+    lote.to_csv(entorno["ruta_raw"], mode="a", header=False, index=False)
+
+    informe = _reentrenador_real(entorno).actualizar()
+    ventana = len(limpio) - len(X_test) + 60
+    for fila in informe["modelos"]:
+        assert f"ventana ({ventana} filas" in fila["Acción"]
+
+        # test_* recalculadas en el mismo holdout, que sigue siendo el test de etapa3
+        metricas = leer_manifiesto(os.path.join(entorno["artefactos_dir"], fila["Modelo"]))["metricas"]
+        assert metricas["filas_split"] == len(limpio)
+        pipe = joblib.load(os.path.join(entorno["modelos_dir"], f"{fila['Modelo']}_best.pkl"))
+        assert metricas["test_mae"] == pytest.approx(
+            mean_absolute_error(y.loc[X_test.index], pipe.predict(X_test)))
+        assert fila["MAE holdout"] == pytest.approx(metricas["test_mae"])
+
+    crecido = cargar_datos(csv_path=entorno["csv_limpio"], parquet_path=entorno["parquet_limpio"])
+    assert len(crecido) == len(limpio) + 60
+    _, X_test_crecido, _, _ = particion_test(*separar_xy(crecido), RANDOM_STATE, len(limpio))
+    assert (X_test_crecido.index == X_test.index).all()
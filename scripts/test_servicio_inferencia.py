@@ -0,0 +1,83 @@
+# --------------------  TESTS: SERVICIO DE INFERENCIA  ---------------------
+# Errores del cliente (null en una numérica, categoría que el encoder no
+# conoce) -> 400 antes de llegar a predict; una fila válida -> 200.
+#
+# Uso (desde scripts/):  python -m pytest -q test_servicio_inferencia.py
+import http.client
+import json
+import math
+import os
+import threading
+
+import joblib
+import pytest
+
+from esquema import FEATURES, cargar_datos
+from servicio_inferencia import crear_servidor, niveles_conocidos, validar_filas
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MODEL_PATH = os.path.join(RAIZ, "modelos", "SVR_best.pkl")
+
+
+@pytest.fixture(scope="module")
+def modelo():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def fila():
+    df = cargar_datos(csv_path=os.path.join(RAIZ, "data", "clean_data.csv"),
+                      parquet_path=os.path.join(RAIZ, "data", "clean_data.parquet"))
+    registro = df[FEATURES].iloc[0].to_dict()
+    return {c: (None if isinstance(v, float) and math.isnan(v) else
+                v.item() if hasattr(v, "item") else v) for c, v in registro.items()}
+
+
+@pytest.fixture(scope="module")
+def servidor(modelo):
+    srv, _ = crear_servidor(modelo, port=0)
+    hilo = threading.Thread(target=srv.serve_forever, daemon=True)
+    hilo.start()
+    yield srv.server_address[1]
+    srv.shutdown()
+
+
+def _post(puerto, cuerpo):
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+    conexion.request("POST", "/predict", json.dumps(cuerpo),
+                     {"Content-Type": "application/json"})
+    respuesta = conexion.getresponse()
+    datos = json.loads(respuesta.read())
+    conexion.close()
+    return respuesta.status, datos
+
+
+def test_fila_valida(servidor, fila):
+    estado, datos = _post(servidor, fila)
+    assert estado == 200
+    assert len(datos["predicciones"]) == 1
+
+
+def test_numerica_nula_es_400(servidor, fila):
+    estado, datos = _post(servidor, {"filas": [fila, dict(fila, BPM=None)]})
+    assert estado == 400
+    assert "BPM" in datos["error"]
+
+
+def test_categoria_desconocida_es_400(servidor, fila):
+    estado, datos = _post(servidor, dict(fila, **{"Fav genre": "Polka"}))
+    assert estado == 400
+    assert "Polka" in datos["error"]
+
+
+def test_nominal_nula_es_400(servidor, fila):
+    estado, _ = _post(servidor, dict(fila, **{"While working": None}))
+    assert estado == 400
+
+
+def test_niveles_del_encoder(modelo, fila):
+    niveles = niveles_conocidos(modelo)
+    assert fila["Fav genre"] in niveles["Fav genre"]
+    validar_filas([dict(fila, Hours_cat=None)], niveles)      # 0 h/día: válido
+    with pytest.raises(ValueError):
+        validar_filas([dict(fila, Hours_cat="20 h")], niveles)
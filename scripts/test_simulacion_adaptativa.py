@@ -0,0 +1,56 @@
+# --------------------  TESTS: MONTE CARLO ADAPTATIVO  ----------------------
+# Asignación por estratos que cabe siempre en batch_size (mínimo 1 por
+# estrato) y estadísticas ponderadas que, con pesos iguales, coinciden con
+# las de simulacion.estadisticas_por_iteracion.
+#
+# Uso (desde scripts/):  python -m pytest -q test_simulacion_adaptativa.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulacion import estadisticas_por_iteracion
+from simulacion_adaptativa import asignacion_estratos, estadisticas_ponderadas
+
+
+def _df(tamanos):
+    estrato = np.repeat(np.arange(len(tamanos)), tamanos)
+    return pd.DataFrame({"estrato": estrato, "y": np.arange(len(estrato), dtype=float)})
+
+
+@pytest.mark.parametrize("tamanos, batch_size", [
+    ([1000] + [1] * 9, 10),         # 9 estratos diminutos: el mínimo de 1 se pasa en 8
+    ([500, 400] + [1] * 30, 40),
+    ([3, 3, 3], 3),
+    ([10, 7, 5, 1], 200),
+])
+def test_asignacion_cabe_en_la_muestra(tamanos, batch_size):
+    partes, pesos = asignacion_estratos(_df(tamanos), "estrato", batch_size, orden="y")
+    asignados = np.array([b for _, b in partes])
+    assert asignados.sum() == batch_size
+    assert (asignados >= 1).all()
+    assert len(pesos) == batch_size
+    assert np.isclose(pesos.sum(), 1)
+
+
+def test_mas_estratos_que_filas_por_muestra():
+    with pytest.raises(ValueError):
+        asignacion_estratos(_df([5] * 4), "estrato", 3, orden="y")
+
+
+def test_estadisticas_con_pesos_iguales():
+    preds = np.random.default_rng(0).normal(size=(20, 37))
+    ponderadas = estadisticas_ponderadas(preds, np.full(37, 1 / 37))
+    pd.testing.assert_frame_equal(ponderadas, estadisticas_por_iteracion(preds))
+
+
+def test_estadisticas_ponderadas_por_estrato():
+    # Estrato de ceros con el 90 % del peso y estrato de dieces con el 10 %:
+    # sin pesos la mediana sería 5
+    preds = np.array([[0.0, 10.0, 0.0, 10.0, 0.0, 10.0]])
+    pesos = np.array([0.3, 0.1 / 3] * 3)
+    e = estadisticas_ponderadas(preds, pesos).iloc[0]
+    assert e["mean"] == pytest.approx(1.0)
+    assert e["median"] == pytest.approx(0.0)
+    assert e["p05"] == pytest.approx(0.0)
+    assert e["p95"] == pytest.approx(10.0)
+    assert e["std"] == pytest.approx(3.0)